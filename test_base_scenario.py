@@ -413,13 +413,13 @@ operator = Operator(virtual_power_plant=vpp, net=net, target_data=None)
 
 # %% run base_scenario without operation strategies
 
-net_dict = operator.run_base_scenario(baseload)
+result_store = operator.run_base_scenario(baseload)
 
 # %% extract results from powerflow
 
-results = operator.extract_results(net_dict)
+results = operator.extract_results(result_store)
 single_result = operator.extract_single_result(
-    net_dict, res="ext_grid", value="p_mw"
+    result_store, res="ext_grid", value="p_mw"
 )
 
 # %% plot results of powerflow and storage values
@@ -13,6 +13,8 @@ from vpplib.user_profile import UserProfile
 from vpplib.environment import Environment
 from vpplib.battery_electric_vehicle import BatteryElectricVehicle
 import matplotlib.pyplot as plt
+import numpy as np
+import random
 
 identifier = "bev_1"
 start = "2015-06-01 00:00:00"
@@ -75,3 +77,121 @@ test_value_for_timestamp(bev, timestamp_str)
 
 test_observations_for_timestamp(bev, timestamp_int)
 test_observations_for_timestamp(bev, timestamp_str)
+
+
+# The time series of a week are compared with the former loops over the
+# timesteps, which picked the trip times with random.randrange at midnight
+# and compared the hour strings with them.
+def reference_at_home(bev, seed):
+
+    random.seed(seed)
+    user_profile = bev.user_profile
+    lst = []
+    for timestamp in bev.timeseries.index:
+        hour = str(timestamp).split()[1]
+        if (hour == "00:00:00") & (timestamp.weekday() < 5):
+            departure = user_profile.week_trip_start[
+                random.randrange(0, (len(user_profile.week_trip_start) - 1), 1)
+            ]
+            arrival = user_profile.week_trip_end[
+                random.randrange(0, (len(user_profile.week_trip_end) - 1), 1)
+            ]
+        elif (hour == "00:00:00") & (timestamp.weekday() >= 5):
+            departure = user_profile.weekend_trip_start[
+                random.randrange(
+                    0, (len(user_profile.weekend_trip_start) - 1), 1
+                )
+            ]
+            arrival = user_profile.weekend_trip_end[
+                random.randrange(
+                    0, (len(user_profile.weekend_trip_end) - 1), 1
+                )
+            ]
+
+        if (hour > arrival) | (hour < departure):
+            lst.append(1.0)
+        else:
+            lst.append(0.0)
+
+    return np.array(lst)
+
+
+def reference_charge(bev, at_home):
+
+    hours = bev.environment.timebase / 60
+    battery_charge = bev.battery_max
+    lst_battery = []
+    lst_charger = []
+    for home in at_home:
+        charger = 0
+        if (home == 0) & (battery_charge > bev.battery_min):
+            battery_charge = max(
+                battery_charge - bev.battery_usage * hours, bev.battery_min
+            )
+        elif (home == 1) and (
+            battery_charge > bev.battery_max * bev.load_degradation_begin
+        ):
+            degradation = bev.load_degradation_begin
+            charger = bev.charging_power * (
+                1
+                - (battery_charge / bev.battery_max - degradation)
+                / (1 - degradation)
+            )
+            battery_charge += charger * bev.charge_efficiency * hours
+            if battery_charge > bev.battery_max:
+                charger = bev.charging_power - (
+                    battery_charge - bev.battery_max
+                )
+                battery_charge = bev.battery_max
+        elif (home == 1) & (battery_charge < bev.battery_max):
+            battery_charge += (
+                bev.charging_power * bev.charge_efficiency * hours
+            )
+            charger = bev.charging_power
+            if battery_charge > bev.battery_max:
+                charger = bev.charging_power - (
+                    battery_charge - bev.battery_max
+                )
+                battery_charge = bev.battery_max
+        lst_battery.append(battery_charge)
+        lst_charger.append(charger)
+
+    return np.array(lst_battery), np.array(lst_charger)
+
+
+week = BatteryElectricVehicle(
+    unit="kW",
+    identifier=None,
+    environment=Environment(
+        start="2015-06-01 00:00:00", end="2015-06-07 23:45:00", timebase=15
+    ),
+    user_profile=UserProfile(identifier=identifier),
+    battery_max=battery_max,
+    battery_min=battery_min,
+    battery_usage=battery_usage,
+    charging_power=charging_power,
+    load_degradation_begin=load_degradiation_begin,
+    charge_efficiency=charge_efficiency,
+)
+random.seed(2)
+week.prepare_time_series()
+
+at_home = reference_at_home(week, 2)
+car_capacity, car_charger = reference_charge(week, at_home)
+assert (week.timeseries.at_home.values == at_home).all()
+assert np.allclose(week.timeseries.car_capacity.values, car_capacity)
+assert np.allclose(week.timeseries.car_charger.values, car_charger)
+
+# every vehicle of the fleet is charged like a single vehicle
+index, at_home, car_capacity, car_charger = week.get_fleet_time_series(
+    5, seed=0, jit=False
+)
+assert at_home.shape == car_charger.shape == (5, len(week.timeseries))
+assert (index == week.timeseries.index).all()
+for vehicle in range(5):
+    capacity, charger = reference_charge(week, at_home[vehicle] * 1.0)
+    assert np.allclose(car_capacity[vehicle], capacity)
+    assert np.allclose(car_charger[vehicle], charger)
+
+_, _, _, car_charger_jit = week.get_fleet_time_series(5, seed=0, jit=True)
+assert np.allclose(car_charger_jit, car_charger)
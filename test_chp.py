@@ -119,4 +119,60 @@ chp.timeseries.el_demand.iloc[0:96].plot(
 )
 plt.show()
 
-#testing
\ No newline at end of file
+#testing
+# %% simulate the heat-led operation for the whole horizon at once
+
+tes_horizon = ThermalEnergyStorage(
+    environment=environment,
+    user_profile=user_profile,
+    unit="kWh",
+    mass=mass_of_storage,
+    hysteresis=hysteresis,
+    target_temperature=target_temperature,
+    min_temperature=min_temperature,
+    cp=cp,
+    thermal_energy_loss_per_day=thermal_energy_loss_per_day,
+)
+
+chp_horizon = CombinedHeatAndPower(
+    unit="kW",
+    identifier="chp2",
+    environment=environment,
+    user_profile=user_profile,
+    el_power=el_power,
+    th_power=th_power,
+    overall_efficiency=overall_efficiency,
+    ramp_up_time=ramp_up_time,
+    ramp_down_time=ramp_down_time,
+    min_runtime=min_runtime,
+    min_stop_time=min_stop_time,
+)
+
+chp_horizon.prepare_time_series(tes_horizon)
+
+assert (
+    chp_horizon.timeseries.el_demand.loc[start:end].astype(float)
+    == chp.timeseries.el_demand.astype(float)
+).all()
+
+chp_horizon.timeseries.el_demand.plot(
+    figsize=figsize, title="Yearly View of Electrical Generation"
+)
+plt.show()
+
+# value_for_timestamp and values_for_range return the same values, both
+# from the current state of the chp: el_power * limit while it is running
+index = chp.timeseries.loc[start:end].index
+values = chp.values_for_range(start, end)
+assert (values == [chp.value_for_timestamp(i) for i in index]).all()
+chp.is_running = True
+chp.limit_power_to(0.5)
+assert (chp.values_for_range(start, end) == chp.el_power * 0.5).all()
+assert chp.value_for_timestamp(start) == chp.el_power * 0.5
+chp.is_running = False
+assert (chp.values_for_range(start, end) == 0.0).all()
+chp.limit_power_to(1.0)
+
+# a replaced column is not hidden by the cached values
+chp_horizon.timeseries["el_demand"] = 0.0
+assert (chp_horizon.get_values() == 0.0).all()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the ElectricalEnergyStorageFleet is compared with the
+operation of each ElectricalEnergyStorage timestep by timestep.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from vpplib.environment import Environment
+from vpplib.electrical_energy_storage import (
+    ElectricalEnergyStorage,
+    ElectricalEnergyStorageFleet,
+)
+
+environment = Environment(
+    timebase=15, start="2015-06-01 00:00:00", end="2015-06-02 23:45:00"
+)
+index = pd.date_range(environment.start, environment.end, freq="15 min")
+
+parameters = [
+    # capacity, efficiencies, max_power, max_c
+    (4, 0.98, 0.98, 4, 1),
+    (10, 0.95, 0.9, 5, 0.5),
+    (2, 0.9, 0.95, 3, 1.2),
+]
+residual_load = np.random.default_rng(0).uniform(
+    -6, 6, (len(parameters), len(index))
+)
+
+
+def make_storages():
+
+    return [
+        ElectricalEnergyStorage(
+            capacity=capacity,
+            charge_efficiency=charge_efficiency,
+            discharge_efficiency=discharge_efficiency,
+            max_power=max_power,
+            max_c=max_c,
+            unit="kW",
+            environment=environment,
+        )
+        for (
+            capacity,
+            charge_efficiency,
+            discharge_efficiency,
+            max_power,
+            max_c,
+        ) in parameters
+    ]
+
+
+# reference: operate_storage of every storage and timestep
+state_of_charge = np.empty(residual_load.shape)
+res_load = np.empty(residual_load.shape)
+for m, storage in enumerate(make_storages()):
+    for t in range(len(index)):
+        state_of_charge[m, t], res_load[m, t] = storage.operate_storage(
+            residual_load[m, t]
+        )
+
+# all storages timestep by timestep
+fleet = ElectricalEnergyStorageFleet.from_storages(make_storages())
+for t in range(len(index)):
+    soc, load = fleet.operate_storage(residual_load[:, t])
+    assert np.allclose(soc, state_of_charge[:, t]), t
+    assert np.allclose(load, res_load[:, t]), t
+
+# the whole horizon at once
+for jit in (False, True):
+    fleet = ElectricalEnergyStorageFleet.from_storages(make_storages())
+    soc, load = fleet.prepare_time_series(residual_load, jit=jit)
+    assert np.allclose(soc, state_of_charge), jit
+    assert np.allclose(load, res_load), jit
+    assert np.allclose(fleet.state_of_charge, state_of_charge[:, -1]), jit
+
+# a single storage runs as a fleet of one
+storage = make_storages()[1]
+storage.residual_load = pd.Series(residual_load[1], index=index)
+storage.prepare_time_series()
+assert np.allclose(storage.timeseries.state_of_charge, state_of_charge[1])
+assert np.allclose(storage.timeseries.residual_load, res_load[1])
+assert np.isclose(storage.state_of_charge, state_of_charge[1, -1])
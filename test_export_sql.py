@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the export of the virtual power plant to a sql database is
+tested. The export of the whole period is compared with the export of two
+chunks, which are appended one after another.
+
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import pandas as pd
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.virtual_power_plant import VirtualPowerPlant
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-02 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+
+vpp = VirtualPowerPlant("export")
+for identifier in ("bus1_bev", "bus2_bev"):
+    user_profile = UserProfile(identifier=identifier)
+    user_profile.bus = identifier.split("_")[0]
+    bev = BatteryElectricVehicle(
+        unit="kW",
+        identifier=identifier,
+        environment=environment,
+        user_profile=user_profile,
+        battery_max=16,
+        battery_min=0,
+        battery_usage=1,
+        charging_power=11,
+        load_degradation_begin=0.8,
+        charge_efficiency=0.98,
+    )
+    bev.prepare_time_series()
+    vpp.add_component(bev)
+
+index = vpp.components["bus1_bev"].timeseries.index
+directory = tempfile.mkdtemp()
+
+
+def read_tables(name):
+
+    conn = sqlite3.connect(os.path.join(directory, name + ".sqlite"))
+    try:
+        return (
+            pd.read_sql("SELECT * FROM component_values ORDER BY name", conn),
+            pd.read_sql("SELECT * FROM timeseries ORDER BY name, time", conn),
+        )
+    finally:
+        conn.close()
+
+
+random.seed(1)
+vpp.export_components_to_sql(name="whole", directory=directory)
+
+random.seed(1)
+vpp.export_components_to_sql(
+    name="chunks", directory=directory, index=index[:100]
+)
+vpp.export_components_to_sql(
+    name="chunks", directory=directory, append=True, index=index[100:]
+)
+
+component_values, timeseries = read_tables("whole")
+component_values_chunks, timeseries_chunks = read_tables("chunks")
+
+assert len(component_values_chunks) == len(vpp.components)
+assert component_values_chunks.equals(component_values)
+assert len(timeseries) == len(index) * len(vpp.components)
+assert timeseries_chunks.equals(timeseries)
+
+# existing tables are only dropped with replace=True
+try:
+    vpp.export_components_to_sql(name="whole", directory=directory)
+except sqlite3.OperationalError:
+    pass
+else:
+    raise AssertionError("The existing tables have been replaced!")
+assert read_tables("whole")[1].equals(timeseries)
+
+vpp.export_components_to_sql(
+    name="whole", directory=directory, index=index[:100], replace=True
+)
+assert len(read_tables("whole")[1]) == 100 * len(vpp.components)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the export of the component timeseries is compared with
+the former export, which collected one row per timestep and component with
+value_for_timestamp. The long and the wide format are checked, as well as
+the chunked export to a csv file.
+
+"""
+
+import os
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.photovoltaic import Photovoltaic
+from vpplib.virtual_power_plant import VirtualPowerPlant
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-02 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+
+random.seed(1)
+vpp = VirtualPowerPlant("export")
+for identifier in ("bus1_bev", "bus2_bev"):
+    bev = BatteryElectricVehicle(
+        unit="kW",
+        identifier=identifier,
+        environment=environment,
+        user_profile=UserProfile(identifier=identifier),
+        battery_max=16,
+        battery_min=0,
+        battery_usage=1,
+        charging_power=11,
+        load_degradation_begin=0.8,
+        charge_efficiency=0.98,
+    )
+    bev.prepare_time_series()
+    vpp.add_component(bev)
+
+environment.get_pv_data(file="./input/pv/dwd_pv_data_2015.csv")
+pv = Photovoltaic(
+    unit="kW",
+    identifier="bus3_pv",
+    environment=environment,
+    user_profile=UserProfile(
+        identifier="bus3", latitude=50.941357, longitude=6.958307
+    ),
+    module_lib="SandiaMod",
+    module="Canadian_Solar_CS5P_220M___2009_",
+    inverter_lib="cecinverter",
+    inverter="ABB__MICRO_0_25_I_OUTD_US_208__208V_",
+    surface_tilt=20,
+    surface_azimuth=200,
+    modules_per_string=2,
+    strings_per_inverter=2,
+    temp_lib="sapm",
+    temp_model="open_rack_glass_glass",
+)
+pv.prepare_time_series()
+vpp.add_component(pv)
+
+index = vpp.components["bus1_bev"].timeseries.index
+
+# reference: one row per timestep and component
+rows_list = list()
+for idx in index:
+    for component in vpp.components.keys():
+        if "_pv" in component:
+            rows_list.append(
+                {
+                    "time": str(idx),
+                    "name": component,
+                    "feed_in": (
+                        vpp.components[component].value_for_timestamp(
+                            str(idx)
+                        )
+                        * -1
+                    ),
+                }
+            )
+        elif "_bev" in component:
+            rows_list.append(
+                {
+                    "time": str(idx),
+                    "name": component,
+                    "feed_in": float(
+                        vpp.components[component].timeseries["at_home"][idx]
+                    ),
+                }
+            )
+
+reference = pd.DataFrame(
+    rows_list, columns=("time", "name", "cop", "feed_in", "th_energy")
+)
+
+df_timeseries, no_timeseries_lst = vpp.export_component_timeseries()
+assert no_timeseries_lst == []
+assert list(df_timeseries.columns) == list(reference.columns)
+assert (df_timeseries[["time", "name"]] == reference[["time", "name"]]).all(
+    axis=None
+)
+assert np.allclose(
+    df_timeseries[["cop", "feed_in", "th_energy"]].values.astype(float),
+    reference[["cop", "feed_in", "th_energy"]].values.astype(float),
+    equal_nan=True,
+)
+
+# wide format: one row per timestep
+df_wide, _ = vpp.export_component_timeseries(wide=True)
+assert (df_wide.index == index).all()
+for column in ("cop", "feed_in", "th_energy"):
+    wide = reference.pivot(index="time", columns="name", values=column)
+    for name in wide.columns:
+        if name + "_" + column in df_wide.columns:
+            assert np.allclose(
+                df_wide[name + "_" + column].values,
+                wide[name].values.astype(float),
+            ), (name, column)
+        else:
+            assert wide[name].isna().all(), (name, column)
+
+# the csv file is written in chunks
+file = os.path.join(tempfile.mkdtemp(), "timeseries.csv")
+vpp.export_component_timeseries_to_csv(file, chunk_size=50)
+df_csv = pd.read_csv(file)
+assert len(df_csv) == len(reference)
+assert np.allclose(
+    df_csv[["cop", "feed_in", "th_energy"]].values,
+    df_timeseries[["cop", "feed_in", "th_energy"]].values.astype(float),
+    equal_nan=True,
+)
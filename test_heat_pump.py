@@ -111,6 +111,32 @@ def test_observations_for_timestamp(hp, timestamp):
 test_get_cop(hp)
 test_prepare_timeseries(hp)
 
+# the cached COP series equals the polynomial of the temperatures, heatpumps
+# with other coefficients get their own series
+temperature = environment.mean_temp_hours.temperature.values
+assert (hp.get_cop().cop.values == hp.calculate_cop(temperature)).all()
+assert hp.get_cop() is hp.get_cop()
+
+hp_other = HeatPump(
+    identifier="hp2",
+    unit="kW",
+    environment=environment,
+    user_profile=user_profile,
+    el_power=el_power,
+    th_power=th_power,
+    heat_pump_type=heat_pump_type,
+    heat_sys_temp=heat_sys_temp,
+    ramp_up_time=ramp_up_time,
+    ramp_down_time=ramp_down_time,
+    min_runtime=min_runtime,
+    min_stop_time=min_stop_time,
+)
+hp_other.cop_coefficients = {"Air": (7.0, -0.1, 0.0005)}
+assert not hp_other.get_cop().equals(hp.cop)
+assert (
+    hp_other.cop.cop.values == hp_other.calculate_cop(temperature)
+).all()
+
 test_value_for_timestamp(hp, timestamp_int)
 test_observations_for_timestamp(hp, timestamp_int)
 
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the chunked base scenario of the Operator is compared with
+the base scenario of the whole period. The chunk size is not a multiple of
+the timesteps per day, so the electric vehicle needs to carry its battery
+charge and the trip times of the current day across the chunk boundaries.
+
+"""
+
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.virtual_power_plant import VirtualPowerPlant
+from vpplib.operator import Operator
+from vpplib.result_store import ResultStore
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-04 23:45:00"
+chunk_size = 100
+
+
+def make_operator():
+
+    environment = Environment(timebase=15, start=start, end=end, year="2015")
+    user_profile = UserProfile(identifier="bus4")
+
+    bev = BatteryElectricVehicle(
+        unit="kW",
+        identifier="bus4_BEV",
+        environment=environment,
+        user_profile=user_profile,
+        battery_max=16,
+        battery_min=0,
+        battery_usage=1,
+        charging_power=11,
+        load_degradation_begin=0.8,
+        charge_efficiency=0.98,
+    )
+
+    vpp = VirtualPowerPlant("chunked")
+    vpp.add_component(bev)
+
+    net = pn.panda_four_load_branch()
+    net.load["name"] = net.bus.name[net.load.bus].values + "_baseload"
+    net.load["type"] = "baseload"
+    pp.create_load(
+        net,
+        bus=net.bus.index[net.bus.name == "bus4"][0],
+        p_mw=0,
+        name="bus4_BEV",
+    )
+
+    return Operator(vpp, net, None, environment=environment), bev
+
+
+index = pd.date_range(start, end, freq="15 min")
+baseload = pd.DataFrame(
+    {
+        str(bus): np.random.default_rng(bus).uniform(500, 3000, len(index))
+        for bus in pn.panda_four_load_branch().bus.index
+    },
+    index=index,
+)
+
+random.seed(1)
+operator, bev = make_operator()
+bev.prepare_time_series()
+results = operator.run_base_scenario(baseload, index=index)
+charger = bev.timeseries.car_charger.copy()
+
+random.seed(1)
+operator, bev = make_operator()
+paths = operator.run_base_scenario_chunked(
+    baseload, tempfile.mkdtemp(), chunk_size=chunk_size
+)
+results_chunked = ResultStore.concatenate(paths)
+
+assert len(paths) == int(np.ceil(len(index) / chunk_size))
+assert (results_chunked.index == results.index).all()
+for res, columns in results.arrays.items():
+    for column, values in columns.items():
+        assert np.allclose(
+            values, results_chunked.arrays[res][column], equal_nan=True
+        ), (res, column)
+
+# the last chunk of the vehicle equals the end of the whole period
+assert (
+    bev.timeseries.car_charger.values
+    == charger.loc[bev.timeseries.index].values
+).all()
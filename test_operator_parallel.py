@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the parallel simbench scenario of the Operator is compared
+with the serial simbench scenario. The timesteps are split into two chunks,
+which are simulated in separate processes.
+
+"""
+
+import copy
+import random
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.virtual_power_plant import VirtualPowerPlant
+from vpplib.operator import Operator
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-02 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+user_profile = UserProfile(identifier="bus4")
+
+bev = BatteryElectricVehicle(
+    unit="kW",
+    identifier="bus4_BEV",
+    environment=environment,
+    user_profile=user_profile,
+    battery_max=16,
+    battery_min=0,
+    battery_usage=1,
+    charging_power=11,
+    load_degradation_begin=0.8,
+    charge_efficiency=0.98,
+)
+random.seed(1)
+bev.prepare_time_series()
+
+vpp = VirtualPowerPlant("parallel")
+vpp.add_component(bev)
+
+net = pn.panda_four_load_branch()
+pp.create_load(
+    net, bus=net.bus.index[net.bus.name == "bus4"][0], p_mw=0, name="bus4_BEV"
+)
+
+# absolute profiles of the loads of the net for the whole year
+year = pd.date_range("2015", periods=35040, freq="15 min")
+rng = np.random.default_rng(0)
+profiles = {
+    ("load", "p_mw"): pd.DataFrame(
+        rng.uniform(0.0005, 0.003, (len(year), len(net.load))),
+        columns=net.load.index,
+    ),
+    ("load", "q_mvar"): pd.DataFrame(
+        rng.uniform(0, 0.001, (len(year), len(net.load))),
+        columns=net.load.index,
+    ),
+}
+
+operator = Operator(vpp, copy.deepcopy(net), None)
+results = operator.run_simbench_scenario(profiles)
+
+for batch in (False, True):
+    operator = Operator(vpp, copy.deepcopy(net), None)
+    results_parallel = operator.run_simbench_scenario(
+        profiles, batch=batch, parallel=True, processes=2
+    )
+
+    assert operator.solved_steps == len(results.index)
+    assert (results_parallel.index == results.index).all()
+    for res, columns in results.arrays.items():
+        for column, values in columns.items():
+            assert np.allclose(
+                results_parallel.arrays[res][column],
+                values,
+                atol=1e-6,
+                equal_nan=True,
+            ), (batch, res, column)
+
+# storages depend on the previous timesteps
+vpp.buses_with_storage = ["bus5"]
+try:
+    operator.run_simbench_scenario(profiles, parallel=True)
+except ValueError as error:
+    assert "storages" in str(error)
+else:
+    raise AssertionError("The storages have not been rejected!")
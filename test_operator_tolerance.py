@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the base scenario of the Operator, which skips the power
+flows of timesteps with unchanged injections, is compared with the base
+scenario, which solves every timestep. The baseload only changes every
+hour, so three of four power flows can be skipped, while the electric
+vehicle is not charging.
+
+"""
+
+import random
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.virtual_power_plant import VirtualPowerPlant
+from vpplib.operator import Operator
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-02 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+
+random.seed(1)
+bev = BatteryElectricVehicle(
+    unit="kW",
+    identifier="bus4_BEV",
+    environment=environment,
+    user_profile=UserProfile(identifier="bus4"),
+    battery_max=16,
+    battery_min=0,
+    battery_usage=1,
+    charging_power=11,
+    load_degradation_begin=0.8,
+    charge_efficiency=0.98,
+)
+bev.prepare_time_series()
+
+vpp = VirtualPowerPlant("tolerance")
+vpp.add_component(bev)
+
+net = pn.panda_four_load_branch()
+net.load["name"] = net.bus.name[net.load.bus].values + "_baseload"
+net.load["type"] = "baseload"
+pp.create_load(
+    net, bus=net.bus.index[net.bus.name == "bus4"][0], p_mw=0, name="bus4_BEV"
+)
+
+# hourly baseload in W
+index = pd.date_range(start, end, freq="15 min")
+baseload = pd.DataFrame(
+    {
+        str(bus): np.repeat(
+            np.random.default_rng(bus).uniform(500, 3000, len(index) // 4), 4
+        )
+        for bus in net.bus.index
+    },
+    index=index,
+)
+
+operator = Operator(vpp, net, None, environment=environment)
+results = operator.run_base_scenario(baseload)
+assert operator.solved_steps == len(index)
+assert operator.skipped_steps == 0
+
+for batch in (False, True):
+    results_skipped = operator.run_base_scenario(
+        baseload, batch=batch, tolerance=1e-9
+    )
+    charging = (bev.timeseries.car_charger.values != 0).sum()
+    assert operator.skipped_steps > 0
+    assert operator.skipped_steps <= len(index) - len(index) // 4
+    assert operator.solved_steps + operator.skipped_steps == len(index)
+    assert operator.solved_steps <= len(index) // 4 + charging
+
+    for res, columns in results.arrays.items():
+        for column, values in columns.items():
+            assert np.allclose(
+                results_skipped.arrays[res][column],
+                values,
+                atol=1e-6,
+                equal_nan=True,
+            ), (batch, res, column)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the tables of the PhaseTimer are tested. The component
+types are part of the phase "component values" and must not be counted
+twice.
+
+"""
+
+import time
+from vpplib.phase_timer import PhaseTimer
+
+timer = PhaseTimer()
+for step in range(3):
+    timer.step(step)
+    with timer.phase("component values"):
+        with timer.phase("component: Photovoltaic"):
+            time.sleep(0.001)
+        with timer.phase("component: HeatPump"):
+            time.sleep(0.001)
+    with timer.phase("power flow"):
+        time.sleep(0.002)
+
+step_times = timer.get_step_times()
+nested = timer.get_step_times(nested=True)
+summary = timer.summary()
+
+assert list(step_times.columns) == ["component values", "power flow"]
+assert list(nested.columns) == [
+    "component: HeatPump",
+    "component: Photovoltaic",
+]
+assert (nested.sum(axis=1) <= step_times["component values"]).all()
+assert abs(
+    step_times.values.sum()
+    - summary.total_s[["component values", "power flow"]].sum()
+) < 1e-12
+assert abs(summary.share_percent[step_times.columns].sum() - 100) < 1e-9
+assert PhaseTimer(enabled=False).get_step_times().empty
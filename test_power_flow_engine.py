@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the PowerFlowEngine is compared with a complete
+pandapower.runpp of every timestep, with and without recycling the internal
+ppc of the first power flow.
+
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.result_store import ResultStore
+from vpplib.power_flow_engine import PowerFlowEngine
+
+index = pd.date_range("2015-06-01", periods=96, freq="15 min")
+
+net = pn.panda_four_load_branch()
+p_mw = net.load.p_mw.values.copy()
+q_mvar = net.load.q_mvar.values.copy()
+scaling = np.random.default_rng(0).uniform(0.2, 1.5, (len(index), len(p_mw)))
+
+
+def assign(net, step):
+
+    net.load["p_mw"] = p_mw * scaling[step]
+    net.load["q_mvar"] = q_mvar * scaling[step]
+
+
+# reference: one complete power flow per timestep
+reference = ResultStore(index)
+reference_net = copy.deepcopy(net)
+for step in range(len(index)):
+    assign(reference_net, step)
+    pp.runpp(reference_net)
+    reference.record(step, reference_net)
+
+for recycle in (True, False):
+    engine_net = copy.deepcopy(net)
+    engine = PowerFlowEngine(engine_net, index, recycle=recycle)
+    for step in range(len(index)):
+        assign(engine_net, step)
+        engine.run(step)
+
+    for res, columns in reference.arrays.items():
+        for column, values in columns.items():
+            assert np.allclose(
+                engine.results.arrays[res][column],
+                values,
+                atol=1e-6,
+                equal_nan=True,
+            ), (recycle, res, column)
+
+    # the last timestep is still in the result tables of the net
+    assert np.allclose(
+        engine.results.get_result("bus", "vm_pu").iloc[-1].values,
+        engine_net.res_bus.vm_pu.values,
+    )
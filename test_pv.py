@@ -14,6 +14,7 @@ import matplotlib.pyplot as plt
 from vpplib.environment import Environment
 from vpplib.user_profile import UserProfile
 from vpplib.photovoltaic import Photovoltaic
+from vpplib import model_cache
 
 
 latitude = 50.941357
@@ -77,3 +78,37 @@ test_value_for_timestamp(pv, timestamp_str)
 
 observations_for_timestamp(pv, timestamp_int)
 observations_for_timestamp(pv, timestamp_str)
+
+
+# an identical system gets the cached ac power, also as results of its own
+# ModelChain; the result equals an uncached model run
+def make_pv():
+
+    return Photovoltaic(
+        unit="kW",
+        identifier=identifier,
+        environment=environment,
+        user_profile=user_profile,
+        module_lib="SandiaMod",
+        module="Canadian_Solar_CS5P_220M___2009_",
+        inverter_lib="cecinverter",
+        inverter="ABB__MICRO_0_25_I_OUTD_US_208__208V_",
+        surface_tilt=20,
+        surface_azimuth=200,
+        modules_per_string=2,
+        strings_per_inverter=2,
+        temp_lib='sapm',
+        temp_model='open_rack_glass_glass'
+    )
+
+
+pv_cached = make_pv()
+pv_cached.prepare_time_series()
+assert pv_cached.timeseries.equals(pv.timeseries)
+assert pv_cached.modelchain.results.ac.equals(pv.modelchain.results.ac)
+
+model_cache.enabled = False
+pv_uncached = make_pv()
+pv_uncached.prepare_time_series()
+model_cache.enabled = True
+assert pv_uncached.timeseries.equals(pv.timeseries)
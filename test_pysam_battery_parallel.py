@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the parallel simulation of many PySAM BatteryStateful
+configurations with run_battery_stateful_parallel is compared with one
+PySAMBatteryStateful per configuration, which is operated timestep by
+timestep.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from vpplib.environment import Environment
+from vpplib.electrical_energy_storage import (
+    PySAMBatteryStateful,
+    run_battery_stateful_parallel,
+)
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-01 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+index = pd.date_range(start, end, freq=environment.time_freq)
+
+nominal_energies = [10, 20, 40]
+battery_configs = [
+    PySAMBatteryStateful.get_battery_config(nominal_energy)
+    for nominal_energy in nominal_energies
+]
+
+# input power in kW, one row per battery
+residual_load = np.random.default_rng(0).uniform(
+    -5, 5, (len(nominal_energies), len(index))
+)
+
+# reference: operate_storage of every battery and timestep
+state_of_charge = np.empty(residual_load.shape)
+power = np.empty(residual_load.shape)
+for row, nominal_energy in enumerate(nominal_energies):
+    storage = PySAMBatteryStateful(environment=environment, unit="kW")
+    storage.init_battery_stateful(nominal_energy)
+    for step, load in enumerate(residual_load[row]):
+        state_of_charge[row, step], power[row, step] = (
+            storage.operate_storage(load)
+        )
+
+soc_parallel, power_parallel = run_battery_stateful_parallel(
+    battery_configs, residual_load, processes=2
+)
+assert np.allclose(soc_parallel, state_of_charge)
+assert np.allclose(power_parallel, power)
+
+# the same load for all batteries
+soc_parallel, power_parallel = run_battery_stateful_parallel(
+    battery_configs, residual_load[0], processes=2
+)
+storage = PySAMBatteryStateful(environment=environment, unit="kW")
+storage.init_battery_stateful(nominal_energies[-1])
+storage.residual_load = pd.Series(residual_load[0], index=index)
+storage.prepare_time_series()
+assert np.allclose(soc_parallel[-1], storage.timeseries.state_of_charge)
+assert np.allclose(power_parallel[-1], storage.timeseries.ac_power)
+
+try:
+    run_battery_stateful_parallel(battery_configs, residual_load[:2])
+except ValueError as error:
+    assert "one row per battery" in str(error)
+else:
+    raise AssertionError("The shape of the residual load is not checked!")
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+Compare the cached and pickled reference data with the parsed csv files.
+
+"""
+
+import tempfile
+import pandas as pd
+from vpplib import reference_data
+
+file = "./input/thermal/dwd_temp_days_2015.csv"
+
+csv = pd.read_csv(file, index_col="time")
+
+reference_data.directory = tempfile.mkdtemp()
+reference_data.clear_cache()
+
+# the first call writes the pickle, the second one reads it
+for _ in range(2):
+    df = reference_data.read_csv(file, index_col="time", binary=True)
+    assert df.equals(csv)
+    reference_data.clear_cache()
+
+df = reference_data.read_csv(file, index_col="time")
+assert df.equals(csv)
+
+# every caller gets its own writeable copy
+df.iloc[0, 0] = -100
+assert reference_data.read_csv(file, index_col="time").equals(csv)
+
+# the pickles need an explicitly chosen directory
+reference_data.directory = None
+try:
+    reference_data.read_csv(file, index_col="time", binary=True)
+except ValueError:
+    pass
+else:
+    raise AssertionError("binary=True without directory is not rejected")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the ResultStore is compared with the former net_dict, which
+kept a copy of the result tables of every timestep. The results are saved,
+loaded and concatenated from two halves.
+
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.environment import Environment
+from vpplib.virtual_power_plant import VirtualPowerPlant
+from vpplib.operator import Operator
+from vpplib.result_store import ResultStore
+
+index = pd.date_range("2015-06-01", periods=48, freq="15 min")
+
+net = pn.panda_four_load_branch()
+net.trafo["name"] = "trafo1"
+net.load["name"] = net.bus.name[net.load.bus].values + "_baseload"
+pp.create_sgen(
+    net, bus=net.bus.index[net.bus.name == "bus4"][0], p_mw=0, name="bus4_PV"
+)
+pp.create_storage(
+    net,
+    bus=net.bus.index[net.bus.name == "bus5"][0],
+    p_mw=0,
+    max_e_mwh=1,
+    name="bus5_storage",
+)
+p_mw = net.load.p_mw.values.copy()
+scaling = np.random.default_rng(0).uniform(0.2, 1.5, (len(index), len(p_mw)))
+
+operator = Operator(
+    VirtualPowerPlant("results"), net, None, environment=Environment()
+)
+
+results = ResultStore(index)
+halves = [ResultStore(index[:24]), ResultStore(index[24:])]
+net_dict = {}
+for step, timestamp in enumerate(index):
+    net.load["p_mw"] = p_mw * scaling[step]
+    net.sgen["p_mw"] = 0.01 * scaling[step, 0]
+    net.storage["p_mw"] = 0.005 * scaling[step, 1]
+    pp.runpp(net)
+    results.record(step, net)
+    halves[step // 24].record(step % 24, net)
+    net_dict[timestamp] = {
+        "res_" + element: net["res_" + element].copy()
+        for element in ResultStore.elements
+    }
+
+# access by timestamp like the net_dict
+for timestamp in index[[0, 17, -1]]:
+    for res, table in net_dict[timestamp].items():
+        assert np.allclose(
+            results[timestamp][res].values,
+            table.select_dtypes(include="number").values,
+            equal_nan=True,
+        ), (timestamp, res)
+
+extracted = operator.extract_results(results)
+reference = operator.extract_results(net_dict)
+for key, frame in reference.items():
+    assert np.allclose(
+        extracted[key].values, frame.values.astype(float), equal_nan=True
+    ), key
+    if key != "ext_grid":
+        assert (extracted[key].index == frame.index).all(), key
+        assert list(extracted[key].columns) == list(frame.columns), key
+
+assert operator.extract_single_result(results, "bus", "vm_pu").equals(
+    extracted["bus_vm_pu"]
+)
+
+# save, load and concatenate the two halves
+directory = tempfile.mkdtemp()
+paths = []
+for i, half in enumerate(halves):
+    paths.append(os.path.join(directory, str(i)))
+    half.save(paths[-1])
+
+loaded = ResultStore.load(paths[0])
+assert (loaded.index == halves[0].index).all()
+assert list(loaded.names["load"]) == list(results.names["load"])
+
+concatenated = ResultStore.concatenate(paths)
+assert (concatenated.index == index).all()
+for res, columns in results.arrays.items():
+    for column, values in columns.items():
+        assert np.array_equal(
+            concatenated.arrays[res][column], values, equal_nan=True
+        ), (res, column)
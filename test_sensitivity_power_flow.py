@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the SensitivityPowerFlow is compared with a
+pandapower.runpp of every timestep.
+
+"""
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.result_store import ResultStore
+from vpplib.sensitivity_power_flow import SensitivityPowerFlow
+
+index = pd.date_range("2015-06-01", periods=96, freq="15 min")
+
+net = pn.panda_four_load_branch()
+p_mw = net.load.p_mw.values.copy()
+q_mvar = net.load.q_mvar.values.copy()
+scaling = np.random.default_rng(0).uniform(0.2, 1.5, (len(index), len(p_mw)))
+
+
+def assign(step):
+
+    net.load["p_mw"] = p_mw * scaling[step]
+    net.load["q_mvar"] = q_mvar * scaling[step]
+
+
+# reference: one power flow per timestep
+reference = ResultStore(index)
+for step in range(len(index)):
+    assign(step)
+    pp.runpp(net)
+    reference.record(step, net)
+
+
+def run_engine(**kwargs):
+
+    engine = SensitivityPowerFlow(net, index, **kwargs)
+    for step in range(len(index)):
+        assign(step)
+        engine.record_injections(step)
+
+    return engine, engine.run()
+
+
+# all timesteps estimated
+engine, results = run_engine(voltage_margin=-10, loading_margin=-1e9)
+assert engine.estimated_steps == len(index)
+
+# the injections of the net are restored after the run, instead of the
+# mean injections of the linearization
+assert np.allclose(net.load.p_mw.values, p_mw * scaling[-1])
+assert np.allclose(net.load.q_mvar.values, q_mvar * scaling[-1])
+
+error = np.abs(
+    results.arrays["res_bus"]["vm_pu"] - reference.arrays["res_bus"]["vm_pu"]
+)
+assert error.max() < 1e-4
+assert (error <= engine.error_bounds["bus_vm_pu"]).all()
+assert (
+    np.abs(
+        results.arrays["res_line"]["loading_percent"]
+        - reference.arrays["res_line"]["loading_percent"]
+    ).max()
+    < 0.1
+)
+
+# all timesteps close to a limit are solved with pandapower.runpp
+engine, results = run_engine(voltage_margin=1)
+assert engine.solved_steps == len(index)
+for res in ("res_bus", "res_line"):
+    for column, values in reference.arrays[res].items():
+        assert np.allclose(
+            results.arrays[res][column], values, equal_nan=True
+        ), (res, column)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the simulation of the whole period with
+ElectricalEnergyStorageSimses.prepare_time_series is compared with the
+former simulation, which called operate_storage for every timestep.
+
+"""
+
+import datetime
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from vpplib.environment import Environment
+from vpplib.electrical_energy_storage import (
+    ElectricalEnergyStorageSimses,
+    get_epoch_seconds,
+)
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-01 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+index = pd.date_range(start, end, freq=environment.time_freq)
+
+# residual load in kW, negative values charge the storage
+residual_load = pd.Series(
+    np.random.default_rng(0).uniform(-3, 3, len(index)), index=index
+)
+
+
+def make_storage(identifier):
+
+    storage = ElectricalEnergyStorageSimses(
+        max_power=4,
+        capacity=4,
+        soc_start=0.5,
+        soc_min=0.1,
+        soc_max=0.9,
+        identifier=identifier,
+        result_path=tempfile.mkdtemp(),
+        environment=environment,
+        unit="kW",
+        do_analysis=False,
+        export_data=False,
+    )
+    storage.residual_load = residual_load
+
+    return storage
+
+
+assert (
+    get_epoch_seconds(index)
+    == [
+        time.mktime(
+            datetime.datetime.strptime(
+                str(timestep), "%Y-%m-%d %H:%M:%S"
+            ).timetuple()
+        )
+        for timestep in index
+    ]
+).all()
+
+storage = make_storage("bulk")
+try:
+    storage.prepare_time_series()
+finally:
+    storage.simses.close()
+
+reference = make_storage("steps")
+try:
+    state_of_charge = []
+    ac_power = []
+    for timestep in index:
+        soc, ac = reference.operate_storage(
+            timestep, reference.residual_load[timestep]
+        )
+        state_of_charge.append(soc)
+        ac_power.append(ac)
+finally:
+    reference.simses.close()
+
+assert (storage.timeseries.index == index).all()
+assert np.allclose(storage.timeseries.state_of_charge, state_of_charge)
+assert np.allclose(storage.timeseries.ac_power, ac_power)
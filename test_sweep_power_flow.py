@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the SweepPowerFlow is compared with a pandapower.runpp of
+every timestep on a radial net. A meshed net is rejected.
+
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.result_store import ResultStore
+from vpplib.sweep_power_flow import SweepPowerFlow
+
+index = pd.date_range("2015-06-01", periods=96, freq="15 min")
+
+net = pn.panda_four_load_branch()
+p_mw = net.load.p_mw.values.copy()
+q_mvar = net.load.q_mvar.values.copy()
+scaling = np.random.default_rng(0).uniform(0.2, 1.5, (len(index), len(p_mw)))
+
+
+def assign(net, step):
+
+    net.load["p_mw"] = p_mw * scaling[step]
+    net.load["q_mvar"] = q_mvar * scaling[step]
+
+
+def run_sweep(net):
+
+    engine = SweepPowerFlow(net, index)
+    for step in range(len(index)):
+        assign(net, step)
+        engine.record_injections(step)
+
+    return engine, engine.run()
+
+
+# reference: one power flow per timestep
+reference = ResultStore(index)
+for step in range(len(index)):
+    assign(net, step)
+    pp.runpp(net)
+    reference.record(step, net)
+
+engine, results = run_sweep(copy.deepcopy(net))
+assert engine.converged.all()
+assert engine.solved_steps == 0
+for res, columns in reference.arrays.items():
+    for column, values in columns.items():
+        if values.size == 0:
+            continue
+        assert np.allclose(
+            results.arrays[res][column], values, atol=1e-4, equal_nan=True
+        ), (res, column)
+
+# a line from bus3 to the end of the feeder closes a ring
+meshed = copy.deepcopy(net)
+pp.create_line_from_parameters(
+    meshed,
+    from_bus=meshed.bus.index[meshed.bus.name == "bus3"][0],
+    to_bus=meshed.bus.index[meshed.bus.name == "bus6"][0],
+    length_km=0.1,
+    r_ohm_per_km=0.2,
+    x_ohm_per_km=0.08,
+    c_nf_per_km=0,
+    max_i_ka=0.2,
+)
+
+try:
+    run_sweep(meshed)
+except ValueError as error:
+    assert "radial" in str(error)
+else:
+    raise AssertionError("The meshed net has not been rejected!")
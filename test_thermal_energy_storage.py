@@ -114,3 +114,45 @@ hp.timeseries.el_demand.iloc[0:96].plot(
     figsize=figsize, title="Electrical Loadshape Daily View"
 )
 plt.show()
+
+# %% operate the storage for the whole horizon at once
+
+tes_horizon = ThermalEnergyStorage(
+    environment=environment,
+    user_profile=user_profile,
+    unit="kWh",
+    cp=cp,
+    mass=mass_of_storage,
+    hysteresis=hysteresis,
+    target_temperature=target_temperature,
+    min_temperature=min_temperature,
+    thermal_energy_loss_per_day=thermal_energy_loss_per_day,
+)
+
+hp_horizon = HeatPump(
+    identifier="hp2",
+    unit="kW",
+    environment=environment,
+    user_profile=user_profile,
+    el_power=el_power,
+    th_power=th_power,
+    ramp_up_time=ramp_up_time,
+    ramp_down_time=ramp_down_time,
+    min_runtime=min_runtime,
+    min_stop_time=min_stop_time,
+    heat_pump_type=heat_pump_type,
+    heat_sys_temp=heat_sys_temp,
+)
+
+tes_horizon.operate_storage_horizon(
+    tes.user_profile.thermal_energy_demand.loc[start:end].index, hp_horizon
+)
+
+assert (
+    tes_horizon.timeseries.temperature.astype(float)
+    == tes.timeseries.temperature.astype(float)
+).all()
+assert (
+    hp_horizon.timeseries.el_demand.astype(float)
+    == hp.timeseries.el_demand.astype(float)
+).all()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the assignment of the component values and baseloads with
+the TopologyIndex is compared with the former assignment by the names of
+the elements and pandapower.get_connected_elements.
+
+"""
+
+import copy
+import numpy as np
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.topology_index import TopologyIndex
+
+net = pn.panda_four_load_branch()
+for bus in net.bus.index:
+    net.load.loc[net.load.bus == bus, "name"] = net.bus.name[bus] + "_baseload"
+    net.load.loc[net.load.bus == bus, "type"] = "baseload"
+
+for name in ("bus3", "bus4", "bus5", "bus6"):
+    pp.create_sgen(
+        net,
+        bus=net.bus.index[net.bus.name == name][0],
+        p_mw=0,
+        name=name + "_PV",
+        type="PV",
+    )
+pp.create_load(
+    net, bus=net.bus.index[net.bus.name == "bus4"][0], p_mw=0, name="bus4_HP"
+)
+pp.create_storage(
+    net,
+    bus=net.bus.index[net.bus.name == "bus5"][0],
+    p_mw=0,
+    max_e_mwh=4,
+    name="bus5_storage",
+)
+
+# a component without element in the net is ignored
+components = [
+    "bus3_PV", "bus4_HP", "bus4_PV", "bus5_PV", "bus6_PV", "bus2_CHP"
+]
+rng = np.random.default_rng(0)
+values = rng.uniform(0, 5, len(components))
+baseload = {str(bus): rng.uniform(500, 3000) for bus in net.bus.index}
+
+# reference: assignment by the names of the elements
+reference = copy.deepcopy(net)
+for component, value in zip(components, values):
+    # kW to MW; negative due to generation
+    reference.sgen.loc[reference.sgen.name == component, "p_mw"] = (
+        value / -1000
+    )
+    reference.load.loc[reference.load.name == component, "p_mw"] = value / 1000
+for row in reference.load.index[reference.load.type == "baseload"]:
+    reference.load.loc[row, "p_mw"] = (
+        baseload[str(reference.load.bus[row])] / 1000000
+    )
+    reference.load.loc[row, "q_mvar"] = 0
+
+topology = TopologyIndex(net, components)
+topology.assign_values(values)
+topology.assign_baseload(
+    np.array([baseload[bus] for bus in topology.baseload_buses]) / 1000000
+)
+
+for element in ("load", "sgen", "storage"):
+    for column in ("p_mw", "q_mvar"):
+        assert np.allclose(
+            net[element][column].values.astype(float),
+            reference[element][column].values.astype(float),
+        ), (element, column)
+
+# the elements at the buses with storage
+assert len(topology.storage_buses) == 1
+bus, storage, storage_row, load_rows, sgen_rows = topology.storage_buses[0]
+assert storage == "bus5_storage"
+assert net.storage.index[storage_row] in pp.get_connected_elements(
+    net, "storage", bus
+)
+assert set(net.load.index[load_rows]) == set(
+    pp.get_connected_elements(net, "load", bus)
+)
+assert set(net.sgen.index[sgen_rows]) == set(
+    pp.get_connected_elements(net, "sgen", bus)
+)
+
+injections = topology.get_injections()
+topology.assign_values(values * 2)
+assert not np.allclose(topology.get_injections(), injections)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the thermal energy demand of many households, calculated
+at once with get_thermal_energy_demand_profiles, is compared with the
+thermal energy demand of a separate UserProfile for each household.
+
+"""
+
+import numpy as np
+
+from vpplib.user_profile import UserProfile
+
+households = [
+    ("DE_HEF33", 12500),
+    ("DE_HEF34", 8000),
+    ("DE_HMF33", 30000),
+    ("DE_GKO34", 20000),
+]
+
+user_profile = UserProfile()
+profiles = user_profile.get_thermal_energy_demand_profiles(
+    [building_type for building_type, _ in households],
+    [yearly for _, yearly in households],
+)
+profiles_hourly = user_profile.get_thermal_energy_demand_profiles(
+    [building_type for building_type, _ in households],
+    [yearly for _, yearly in households],
+    freq="H",
+)
+
+assert profiles.shape == (len(households), 35040)
+assert profiles_hourly.shape == (len(households), 8760)
+
+for i, (building_type, yearly) in enumerate(households):
+    household = UserProfile(
+        thermal_energy_demand_yearly=yearly, building_type=building_type
+    )
+    household.get_thermal_energy_demand()
+
+    assert np.allclose(
+        profiles[i], household.thermal_energy_demand.values.ravel()
+    ), building_type
+    assert np.allclose(
+        profiles_hourly[i],
+        np.asarray(household.thermal_energy_demand_hourly).ravel(),
+    ), building_type
+
+# a single building type is used for all households
+assert np.allclose(
+    user_profile.get_thermal_energy_demand_profiles("DE_HEF33", [12500])[0],
+    profiles[0],
+)
+
+# a missing temperature is reported instead of falling into the warmest bin
+user_profile.mean_temp_days = user_profile.mean_temp_days.copy()
+user_profile.mean_temp_days.iloc[10, 0] = np.nan
+try:
+    user_profile.get_thermal_energy_demand_profiles("DE_HEF33", [12500])
+except ValueError as error:
+    assert "temperature is missing" in str(error)
+else:
+    raise AssertionError("The missing temperature has not been reported!")
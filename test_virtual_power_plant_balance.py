@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+In this testfile the balances of the VirtualPowerPlant, which are sums
+over the power matrix of the components, are compared with the sums of
+value_for_timestamp of every component and timestep, in total as well as
+per bus and feeder of a net, and after a limit change and the operation of
+a storage.
+
+"""
+
+import random
+import numpy as np
+import pandas as pd
+import pandapower as pp
+import pandapower.networks as pn
+
+from vpplib.environment import Environment
+from vpplib.user_profile import UserProfile
+from vpplib.battery_electric_vehicle import BatteryElectricVehicle
+from vpplib.combined_heat_and_power import CombinedHeatAndPower
+from vpplib.electrical_energy_storage import ElectricalEnergyStorage
+from vpplib.virtual_power_plant import VirtualPowerPlant
+from vpplib.operator import Operator
+from vpplib.topology_index import TopologyIndex
+
+start = "2015-06-01 00:00:00"
+end = "2015-06-02 23:45:00"
+
+environment = Environment(timebase=15, start=start, end=end, year="2015")
+
+random.seed(1)
+vpp = VirtualPowerPlant("balance")
+for identifier in ("bus3_BEV", "bus4_BEV", "bus6_BEV"):
+    bev = BatteryElectricVehicle(
+        unit="kW",
+        identifier=identifier,
+        environment=environment,
+        user_profile=UserProfile(identifier=identifier),
+        battery_max=16,
+        battery_min=0,
+        battery_usage=1,
+        charging_power=11,
+        load_degradation_begin=0.8,
+        charge_efficiency=0.98,
+    )
+    bev.prepare_time_series()
+    vpp.add_component(bev)
+
+vpp.build_power_matrix()
+index = vpp.power_index
+
+
+def reference_balance():
+
+    return np.array(
+        [
+            sum(
+                component.value_for_timestamp(str(timestamp))
+                for component in vpp.components.values()
+            )
+            for timestamp in index
+        ]
+    )
+
+
+def balance_at_timestamps():
+
+    return np.array(
+        [vpp.balance_at_timestamp(str(timestamp)) for timestamp in index]
+    )
+
+
+assert np.allclose(vpp.balance_for_range().values, reference_balance())
+assert np.allclose(balance_at_timestamps(), reference_balance())
+assert np.allclose(
+    vpp.balance_for_range(start="2015-06-01 12:00:00", end=100).values,
+    reference_balance()[48:101],
+)
+
+# a changed component needs to be updated in the power matrix
+vpp.components["bus4_BEV"].limit = 0.5
+vpp.update_component("bus4_BEV")
+assert np.allclose(vpp.balance_for_range().values, reference_balance())
+assert np.allclose(balance_at_timestamps(), reference_balance())
+
+# the balance per bus and feeder equals the sum of the components at the
+# buses, the bus of bus6_BEV is only known from its user profile
+net = pn.panda_four_load_branch()
+bus_of = {
+    identifier: net.bus.index[net.bus.name == identifier.split("_")[0]][0]
+    for identifier in vpp.components.keys()
+}
+for identifier in ("bus3_BEV", "bus4_BEV"):
+    pp.create_load(net, bus=bus_of[identifier], p_mw=0, name=identifier)
+vpp.components["bus6_BEV"].user_profile.bus = bus_of["bus6_BEV"]
+
+vpp.build_incidence_matrix(net)
+balance_by_bus = vpp.balance_by_bus()
+assert list(balance_by_bus.columns) == list(net.bus.index)
+
+reference = pd.DataFrame(0.0, index=index, columns=net.bus.index)
+for identifier, component in vpp.components.items():
+    reference[bus_of[identifier]] += [
+        component.value_for_timestamp(str(timestamp)) for timestamp in index
+    ]
+assert np.allclose(balance_by_bus.values, reference.values)
+
+feeders = vpp.get_feeders()
+balance_by_feeder = vpp.balance_by_feeder()
+for feeder in balance_by_feeder.columns:
+    assert np.allclose(
+        balance_by_feeder[feeder].values,
+        reference[feeders.index[feeders == feeder]].sum(axis=1).values,
+    ), feeder
+assert np.allclose(
+    balance_by_feeder.sum(axis=1).values, reference.sum(axis=1).values
+)
+
+# operate_storages of the Operator updates the power matrix
+storage = ElectricalEnergyStorage(
+    capacity=10,
+    charge_efficiency=0.98,
+    discharge_efficiency=0.98,
+    max_power=4,
+    max_c=1,
+    unit="kW",
+    identifier="bus5_storage",
+    environment=environment,
+)
+storage.timeseries = pd.DataFrame(
+    0.0, index=index, columns=["state_of_charge", "residual_load"]
+)
+vpp.add_component(storage)
+
+net = pn.panda_four_load_branch()
+pp.create_storage(net, bus=4, p_mw=0, max_e_mwh=0.01, name="bus5_storage")
+net.load.p_mw = 10.0
+operator = Operator(virtual_power_plant=vpp, net=net, target_data=None)
+operator.operate_storages(
+    TopologyIndex(net, vpp.components.keys()), index[10]
+)
+
+assert storage.timeseries.residual_load.iloc[10] != 0
+assert np.isclose(
+    vpp.balance_at_timestamp(index[10]),
+    sum(
+        component.value_for_timestamp(index[10])
+        for component in vpp.components.values()
+    ),
+)
+assert np.allclose(balance_at_timestamps(), reference_balance())
+
+# the value of a chp depends on its state, limit_component and
+# update_component after a ramp update the power matrix
+user_profile = UserProfile(identifier="bus3_CHP")
+user_profile.thermal_energy_demand = pd.DataFrame(
+    {"thermal_energy_demand": 0.0}, index=index
+)
+chp = CombinedHeatAndPower(
+    unit="kW",
+    identifier="bus3_CHP",
+    environment=environment,
+    user_profile=user_profile,
+    el_power=6,
+    th_power=10,
+    overall_efficiency=0.8,
+    ramp_up_time=1 / 15,
+    ramp_down_time=1 / 15,
+    min_runtime=1,
+    min_stop_time=2,
+)
+vpp.add_component(chp)
+assert np.allclose(balance_at_timestamps(), reference_balance())
+
+assert chp.ramp_up(index[-1])
+vpp.update_component("bus3_CHP")
+assert np.allclose(balance_at_timestamps(), reference_balance())
+
+vpp.limit_component("bus3_CHP", 0.5)
+assert np.allclose(balance_at_timestamps(), reference_balance())
+assert np.allclose(vpp.balance_for_range().values, reference_balance())
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+Compare the weather data of the binary weather store with the csv files.
+
+"""
+
+import tempfile
+from vpplib.environment import Environment
+from vpplib import weather_store
+
+start = "2015-03-01 00:00:00"
+end = "2015-03-07 23:45:00"
+
+directory = tempfile.mkdtemp()
+weather_store.convert_input(directory)
+
+csv = Environment(start=start, end=end)
+csv.get_pv_data()
+csv.get_wind_data()
+csv.get_mean_temp_days()
+csv.get_mean_temp_hours()
+
+store = Environment(start=start, end=end)
+store.get_weather_from_store(directory)
+
+assert store.pv_data.equals(csv.pv_data)
+assert store.wind_data.equals(csv.wind_data)
+assert store.mean_temp_days.equals(csv.mean_temp_days)
+assert store.mean_temp_hours.equals(csv.mean_temp_hours)
+
+# only the period start:end is read
+store.get_weather_from_store(directory, start=start, end=end)
+assert store.pv_data.equals(csv.pv_data.loc[start:end])
+assert store.wind_data.equals(csv.wind_data.loc[start:end])
@@ -13,6 +13,7 @@ import matplotlib.pyplot as plt
 
 from vpplib.environment import Environment
 from vpplib.wind_power import WindPower
+from vpplib import model_cache
 
 # For Debugging uncomment:
 # import logging
@@ -99,3 +100,58 @@ test_value_for_timestamp(wind, timestamp_str)
 
 observations_for_timestamp(wind, timestamp_int)
 observations_for_timestamp(wind, timestamp_str)
+
+
+# an identical turbine gets the cached power output, but its own
+# WindTurbine and ModelChain; the result equals an uncached model run
+def make_wind():
+
+    return WindPower(
+        unit="kW",
+        identifier=None,
+        environment=environment,
+        user_profile=None,
+        turbine_type=turbine_type,
+        hub_height=hub_height,
+        rotor_diameter=rotor_diameter,
+        fetch_curve=fetch_curve,
+        data_source=data_source,
+        wind_speed_model=wind_speed_model,
+        density_model=density_model,
+        temperature_model=temperature_model,
+        power_output_model=power_output_model,
+        density_correction=density_correction,
+        obstacle_height=obstacle_height,
+        hellman_exp=hellman_exp,
+    )
+
+
+# a cache hit neither builds the WindTurbine nor the ModelChain, they are
+# built when they are accessed
+calls = []
+wind_cached = make_wind()
+get_wind_turbine = wind_cached.get_wind_turbine
+
+
+def count_get_wind_turbine():
+
+    calls.append(1)
+    return get_wind_turbine()
+
+
+wind_cached.get_wind_turbine = count_get_wind_turbine
+wind_cached.prepare_time_series()
+assert len(calls) == 0
+assert wind_cached.timeseries.equals(wind.timeseries)
+assert wind_cached.ModelChain.power_output.equals(
+    wind.ModelChain.power_output
+)
+assert len(calls) == 1
+assert wind_cached.ModelChain is not wind.ModelChain
+assert wind_cached.wind_turbine is not wind.wind_turbine
+
+model_cache.enabled = False
+wind_uncached = make_wind()
+wind_uncached.prepare_time_series()
+model_cache.enabled = True
+assert wind_uncached.timeseries.equals(wind.timeseries)
@@ -4,6 +4,7 @@ from .combined_heat_and_power import CombinedHeatAndPower
 from .component import Component
 from .electrical_energy_storage import ElectricalEnergyStorage
 from .electrical_energy_storage import ElectricalEnergyStorageSimses
+from .electrical_energy_storage import ElectricalEnergyStorageFleet
 from .environment import Environment
 from .heat_pump import HeatPump
 from .operator import Operator
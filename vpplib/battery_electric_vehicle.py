@@ -7,11 +7,115 @@ class.
 
 """
 from .component import Component
+from .kernels import get_kernel
 
+import numpy as np
 import pandas as pd
 import random
 
 
+def charge_kernel(
+    at_home,
+    battery_max,
+    battery_min,
+    battery_usage,
+    charging_power,
+    charge_efficiency,
+    load_degradation_begin,
+    initial_charge,
+    timebase,
+):
+
+    """
+    Info
+    ----
+    Charging logic of BatteryElectricVehicle.charge for a fleet of vehicles.
+    Only works on numpy arrays, so it can be compiled with numba.njit.
+
+    Parameters
+    ----------
+    at_home: numpy.ndarray
+        shape (vehicles, timesteps), 1 or True if the car is at home
+
+    battery_max, battery_min, battery_usage, charging_power,
+    charge_efficiency, load_degradation_begin: numpy.ndarray
+        parameters of each vehicle, shape (vehicles,)
+
+    initial_charge: numpy.ndarray
+        battery charge of each vehicle before the first timestep,
+        shape (vehicles,)
+
+    timebase: float
+        length of a timestep in minutes
+
+    Returns
+    -------
+    car_capacity, car_charger: numpy.ndarray
+        shape (vehicles, timesteps)
+
+    """
+
+    n_vehicles, n_steps = at_home.shape
+    car_capacity = np.empty((n_vehicles, n_steps))
+    car_charger = np.zeros((n_vehicles, n_steps))
+    hours = timebase / 60
+
+    for v in range(n_vehicles):
+
+        # initial state of charge at the first timestep
+        battery_charge = initial_charge[v]
+
+        for t in range(n_steps):
+            if (at_home[v, t] == 0) and (battery_charge > battery_min[v]):
+                # if car is not at home discharge battery with X kW
+                battery_charge = battery_charge - battery_usage[v] * hours
+
+                if battery_charge < battery_min[v]:
+                    battery_charge = battery_min[v]
+
+            # Function to apply the load_degradation to the load profile
+            elif (at_home[v, t] == 1) and (
+                battery_charge > battery_max[v] * load_degradation_begin[v]
+            ):
+                degraded_charging_power = charging_power[v] * (
+                    1
+                    - (
+                        battery_charge / battery_max[v]
+                        - load_degradation_begin[v]
+                    )
+                    / (1 - load_degradation_begin[v])
+                )
+
+                battery_charge = battery_charge + (
+                    degraded_charging_power * charge_efficiency[v] * hours
+                )
+                car_charger[v, t] = degraded_charging_power
+
+                if battery_charge > battery_max[v]:
+                    car_charger[v, t] = charging_power[v] - (
+                        battery_charge - battery_max[v]
+                    )
+                    battery_charge = battery_max[v]
+
+            # If car is at home, charge with charging power.
+            elif (at_home[v, t] == 1) and (battery_charge < battery_max[v]):
+                battery_charge = battery_charge + (
+                    charging_power[v] * charge_efficiency[v] * hours
+                )
+                car_charger[v, t] = charging_power[v]
+
+                # If battery would be overcharged, charge only with kWh left
+                if battery_charge > battery_max[v]:
+                    car_charger[v, t] = charging_power[v] - (
+                        battery_charge - battery_max[v]
+                    )
+                    battery_charge = battery_max[v]
+
+            car_capacity[v, t] = battery_charge
+
+    return car_capacity, car_charger
+
+
 class BatteryElectricVehicle(Component):
     def __init__(
         self,
@@ -98,9 +202,21 @@ class BatteryElectricVehicle(Component):
         limit: float
             value between 0 and 1 to limit the nominal power
 
+        initial_charge: float
+            battery charge in kWh at the beginning of the time series.
+            None: the battery is fully charged (battery_max)
+
+        initial_trips: tuple
+            (day, trip choices) of the last day of the previous time series,
+            set by carry_state. If the next time series starts on this
+            day, the day keeps its departure and arrival times.
+
         """
 
         self.limit = 1
+        self.initial_charge = None
+        self.initial_trips = None
+        self.last_trips = None
         self.date = []
         self.hour = []
         self.weekday = []
@@ -158,10 +274,25 @@ class BatteryElectricVehicle(Component):
 
         return self.timeseries
 
+    def carry_state(self):
+
+        """
+        Info
+        ----
+        Start the next time series with the battery charge at the end of
+        the current one, e.g. when the period is simulated in chunks. If
+        the next time series starts on the last day of the current one,
+        this day keeps its trip times.
+
+        """
+
+        self.initial_charge = self.timeseries.car_capacity.iloc[-1]
+        self.initial_trips = self.last_trips
+
     # =========================================================================
     # Controlling functions
     # =========================================================================
-    def charge(self):
+    def charge(self, jit=False):
 
         """
         Info
@@ -171,19 +302,8 @@ class BatteryElectricVehicle(Component):
 
         Parameters
         ----------
-        battery_charge: float
-            temporary parameter to store the current state of charge of the
-            vehicle during one timestep
-
-        lst_battery: list
-            temporary list to store the value of battery_charge at the end of
-            each timestep. Gets saved to self.timeseries.car_capacity at the
-            end of the function
-
-        lst_charger: list
-            temporary list to store the power demand of the charging station
-            for each timestep. Gets saved to self.timeseries.car_charger at
-            the end of the function.
+        jit: boolean
+            compile the charging loop (charge_kernel) with numba
 
         Notes
         -----
@@ -196,83 +316,42 @@ class BatteryElectricVehicle(Component):
 
         """
 
-        # initial state of charge at the first timestep
-        battery_charge = self.battery_max
-        lst_battery = []
-        lst_charger = []
-
-        for i, at_home in self.at_home.iterrows():
-            if (at_home.item() == 0) & (battery_charge > self.battery_min):
-                # if car is not at home discharge battery with X kW
-                battery_charge = battery_charge - self.battery_usage * (
-                    self.environment.timebase / 60
-                )
-
-                if battery_charge < self.battery_min:
-                    battery_charge = self.battery_min
-
-                lst_battery.append(battery_charge)
-                # if car is not at home, chargers energy consumption is 0
-                lst_charger.append(0)
-
-            # Function to apply the load_degradation to the load profile
-            elif (at_home.item() == 1) and (
-                battery_charge > self.battery_max * self.load_degradation_begin
-            ):
-                degraded_charging_power = self.charging_power * (
-                    1
-                    - (
-                        battery_charge / self.battery_max
-                        - self.load_degradation_begin
-                    )
-                    / (1 - self.load_degradation_begin)
-                )
-
-                battery_charge = battery_charge + (
-                    degraded_charging_power
-                    * self.charge_efficiency
-                    * (self.environment.timebase / 60)
-                )
-                charger = degraded_charging_power
-
-                if battery_charge > self.battery_max:
-                    charger = self.charging_power - (
-                        battery_charge - self.battery_max
-                    )
-                    battery_charge = self.battery_max
+        car_capacity, car_charger = get_kernel(charge_kernel, jit)(
+            self.at_home.values.T.astype(float),
+            *self.get_vehicle_parameters(1),
+            self.environment.timebase,
+        )
 
-                lst_battery.append(battery_charge)
-                lst_charger.append(charger)
+        self.timeseries["car_capacity"] = car_capacity[0]
+        self.timeseries.car_charger = car_charger[0]
 
-            # If car is at home, charge with charging power.
-            # If timescale is hours charging power results in kWh
-            elif (at_home.item() == 1) & (battery_charge < self.battery_max):
-                battery_charge = battery_charge + (
-                    self.charging_power
-                    * self.charge_efficiency
-                    * (self.environment.timebase / 60)
-                )
-                charger = self.charging_power
-
-                # If battery would be overcharged, charge only with kWh left
-                if battery_charge > self.battery_max:
-                    charger = self.charging_power - (
-                        battery_charge - self.battery_max
-                    )
-                    battery_charge = self.battery_max
+    def get_vehicle_parameters(self, n_vehicles):
 
-                lst_battery.append(battery_charge)
-                lst_charger.append(charger)
+        """
+        Info
+        ----
+        Return the parameters and the initial charge of the vehicle as
+        arrays for charge_kernel.
 
-            # If battery is full and car is at home,
-            # charger consumes no power and current state of charge of batter
-            # is returned
-            else:
-                lst_battery.append(battery_charge)
-                lst_charger.append(0)
+        """
 
-        self.timeseries["car_capacity"] = lst_battery
-        self.timeseries.car_charger = lst_charger
+        if self.initial_charge is None:
+            initial_charge = self.battery_max
+        else:
+            initial_charge = self.initial_charge
+
+        return tuple(
+            np.full(n_vehicles, value, dtype=float)
+            for value in (
+                self.battery_max,
+                self.battery_min,
+                self.battery_usage,
+                self.charging_power,
+                self.charge_efficiency,
+                self.load_degradation_begin,
+                initial_charge,
+            )
+        )
 
     # In[Separate date and hours]:
 
@@ -331,13 +410,7 @@ class BatteryElectricVehicle(Component):
         are attributes of the UserProfile class:
             work_start, work_end, weekend_trip_start, weekend_trip_end.
 
-        If the car is at home add 1 to the list. If not add 0 to the list
-
-        Parameters
-        ----------
-        lst: list
-            temporary list to store the at_home value after each timestep.
-            The list gets saved to self.at_home at the end of the function.
+        self.at_home is 1.0 if the car is at home and 0.0 if not.
 
         Notes
         -----
@@ -362,82 +435,172 @@ class BatteryElectricVehicle(Component):
         ):
             self.user_profile.get_trip_times()
 
-        lst = []
+        self.at_home = pd.DataFrame(
+            {"at home": self.get_at_home(self.timeseries.index)[0] * 1.0}
+        )
+        self.at_home.index = self.timeseries.index
 
-        for hour, weekday in zip(self.hour, self.weekday):
-            if (hour == "00:00:00") & (weekday < 5):
-                departure = self.user_profile.week_trip_start[
-                    random.randrange(
-                        0, (len(self.user_profile.week_trip_start) - 1), 1
-                    )
-                ]
+    def get_at_home(self, index, n_vehicles=1, rng=None):
 
-                arrival = self.user_profile.week_trip_end[
-                    random.randrange(
-                        0, (len(self.user_profile.week_trip_end) - 1), 1
-                    )
-                ]
+        """
+        Info
+        ----
+        Determine the times when the cars are at home with array operations.
+        Departure and arrival are drawn once per day from the trip times of
+        the UserProfile and compared to the time of day as seconds.
 
-            elif (hour == "00:00:00") & (weekday >= 5):
-                departure = self.user_profile.weekend_trip_start[
-                    random.randrange(
-                        0, (len(self.user_profile.weekend_trip_start) - 1), 1
-                    )
-                ]
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps
+
+        n_vehicles: int
+            number of vehicles with the same trip times
+
+        rng: numpy.random.Generator
+            random number generator for the trip times. If None, the trip
+            times are drawn with random.randrange in the order of
+            set_at_home for one vehicle, so random.seed() reproduces the
+            same profile. The trip times of the first day are taken from
+            self.initial_trips, if it belongs to this day (see carry_state).
+
+        Returns
+        -------
+        at_home: numpy.ndarray
+            boolean array of shape (vehicles, timesteps), True if the car is
+            at home
+
+        """
 
-                arrival = self.user_profile.weekend_trip_end[
-                    random.randrange(
-                        0, (len(self.user_profile.weekend_trip_end) - 1), 1
+        # day of each timestep and time of day in seconds
+        days, day = np.unique(index.normalize(), return_inverse=True)
+        time_of_day = (index - index.normalize()).total_seconds().values
+        is_weekend = pd.DatetimeIndex(days).weekday.values >= 5
+
+        trips = [
+            pd.to_timedelta(trip_times).total_seconds().values
+            for trip_times in (
+                self.user_profile.week_trip_start,
+                self.user_profile.week_trip_end,
+                self.user_profile.weekend_trip_start,
+                self.user_profile.weekend_trip_end,
+            )
+        ]
+
+        if rng is None:
+            choice = np.zeros((4, 1, len(days)), dtype=int)
+            for d, weekend in enumerate(is_weekend):
+                if (
+                    d == 0
+                    and self.initial_trips is not None
+                    and self.initial_trips[0] == days[0]
+                ):
+                    # the day began in the previous time series
+                    choice[:, 0, 0] = self.initial_trips[1]
+                    continue
+                for i in (2, 3) if weekend else (0, 1):
+                    choice[i, 0, d] = random.randrange(
+                        0, (len(trips[i]) - 1), 1
                     )
+            self.last_trips = (days[-1], choice[:, 0, -1].copy())
+        else:
+            choice = np.array(
+                [
+                    rng.integers(0, len(trip) - 1, (n_vehicles, len(days)))
+                    for trip in trips
                 ]
+            )
 
-            if (hour > arrival) | (hour < departure):
-                lst.append(1.0)
-            else:
-                lst.append(0.0)
+        departure = np.where(
+            is_weekend, trips[2][choice[2]], trips[0][choice[0]]
+        )
+        arrival = np.where(
+            is_weekend, trips[3][choice[3]], trips[1][choice[1]]
+        )
 
-        self.at_home = pd.DataFrame({"at home": lst})
-        self.at_home.index = self.timeseries.index
+        # compare day by day to avoid temporary (vehicles, timesteps) arrays
+        at_home = np.empty((departure.shape[0], len(index)), dtype=bool)
+        bounds = np.searchsorted(day, np.arange(len(days) + 1))
+        for d in range(len(days)):
+            steps = slice(bounds[d], bounds[d + 1])
+            at_home[:, steps] = (
+                time_of_day[steps] > arrival[:, d, np.newaxis]
+            ) | (time_of_day[steps] < departure[:, d, np.newaxis])
 
-    # =========================================================================
-    # Balancing Functions
-    # =========================================================================
+        return at_home
 
-    # Override balancing function from super class.
-    def value_for_timestamp(self, timestamp):
+    def get_fleet_time_series(self, n_vehicles, seed=None, jit=False):
 
         """
         Info
         ----
-        This function takes a timestamp as the parameter and returns the
-        corresponding power demand for that timestamp.
-        A positiv result represents a load.
-        A negative result represents a generation.
+        Create the time series of n_vehicles vehicles with the parameters
+        and trip times of this vehicle at once. Each vehicle gets its own
+        random departure and arrival times.
 
         Parameters
         ----------
-        timestamp: datetime64[ns]
-            value of the time of ramp down
+        n_vehicles: int
+            number of vehicles
+
+        seed: int
+            seed of the random trip times
+
+        jit: boolean
+            compile the charging loop (charge_kernel) with numba
 
         Returns
         -------
-        power value for timestamp
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the columns
+
+        at_home, car_capacity, car_charger: numpy.ndarray
+            shape (vehicles, timesteps)
 
         """
 
-        if type(timestamp) == int:
+        if (
+            len(self.user_profile.week_trip_start) == 0
+            or len(self.user_profile.week_trip_end) == 0
+            or len(self.user_profile.weekend_trip_start) == 0
+            or len(self.user_profile.weekend_trip_end) == 0
+        ):
+            self.user_profile.get_trip_times()
 
-            return self.timeseries["car_charger"].iloc[timestamp] * self.limit
+        index = pd.date_range(
+            start=self.environment.start,
+            end=self.environment.end,
+            freq=self.environment.time_freq,
+            name="Time",
+        )
 
-        elif type(timestamp) == str:
+        at_home = self.get_at_home(
+            index, n_vehicles, rng=np.random.default_rng(seed)
+        )
+        car_capacity, car_charger = get_kernel(charge_kernel, jit)(
+            at_home,
+            *self.get_vehicle_parameters(n_vehicles),
+            self.environment.timebase,
+        )
 
-            return self.timeseries["car_charger"].loc[timestamp] * self.limit
+        return index, at_home, car_capacity, car_charger
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string. "
-                + "Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+    # =========================================================================
+    # Balancing Functions
+    # =========================================================================
+
+    # Values of the balancing functions of the super class.
+    def get_value_series(self):
+
+        """
+        Info
+        ----
+        Return the power drawn by the charger in kW for
+        value_for_timestamp. A positiv value represents a load.
+
+        """
+
+        return self.timeseries["car_charger"]
 
     def observations_for_timestamp(self, timestamp):
 
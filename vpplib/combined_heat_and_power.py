@@ -7,6 +7,7 @@ This file contains the basic functionalities of the CombinedHeatAndPower class.
 """
 
 from .component import Component
+import numpy as np
 import pandas as pd
 
 
@@ -131,7 +132,7 @@ class CombinedHeatAndPower(Component):
         self.last_ramp_down = self.user_profile.thermal_energy_demand.index[0]
         self.limit = 1.0
 
-    def prepare_time_series(self):
+    def prepare_time_series(self, thermal_energy_storage=None, jit=False):
 
         """
         Info
@@ -140,6 +141,20 @@ class CombinedHeatAndPower(Component):
         CombinedHeatAndPower class. For this time series no specific operation
         stategy is implemented.
 
+        If a thermal_energy_storage is given, the heat-led operation of the
+        chp with the storage is simulated for the whole index of the
+        thermal energy demand with
+        ThermalEnergyStorage.operate_storage_horizon. The timeseries of the
+        storage is reset to the same index.
+
+        Parameters
+        ----------
+        thermal_energy_storage: vpplib.thermal_energy_storage.ThermalEnergyStorage
+            storage, which is loaded by the chp
+
+        jit: boolean
+            compile the state machine of the storage with numba
+
         Returns
         -------
         self.timeseries
@@ -151,6 +166,14 @@ class CombinedHeatAndPower(Component):
             index=self.user_profile.thermal_energy_demand.index,
         )
 
+        if thermal_energy_storage is not None:
+            thermal_energy_storage.timeseries = pd.DataFrame(
+                columns=["temperature"], index=self.timeseries.index
+            )
+            thermal_energy_storage.operate_storage_horizon(
+                self.timeseries.index, self, jit=jit
+            )
+
         return self.timeseries
 
     def reset_time_series(self):
@@ -428,6 +451,66 @@ class CombinedHeatAndPower(Component):
 
         return self.timeseries
 
+    def get_observations_for_horizon(self, index):
+
+        """
+        Info
+        ----
+        Return the values of observations_for_timestamp for all timestamps
+        of index as arrays, once for a running and once for a stopped chp.
+        Like observations_for_timestamp, the values only depend on el_power
+        and th_power, self.timeseries is not read.
+
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the horizon
+
+        Returns
+        -------
+        observations_running, observations_stopped: dict
+            {"thermal_energy_output", "el_demand": numpy.ndarray}
+
+        """
+
+        observations_running = {
+            "thermal_energy_output": np.full(len(index), float(self.th_power)),
+            "el_demand": np.full(len(index), float(self.el_power * -1)),
+        }
+        observations_stopped = {
+            "thermal_energy_output": np.zeros(len(index)),
+            "el_demand": np.zeros(len(index)),
+        }
+
+        return observations_running, observations_stopped
+
+    def log_observations_for_horizon(self, observations, index):
+
+        """
+        Info
+        ----
+        Write the arrays returned by get_observations_for_horizon to
+        self.timeseries at index in one assignment per column.
+
+        Parameters
+        ----------
+        observations: dict
+            {"thermal_energy_output", "el_demand": numpy.ndarray}
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the observations
+
+        Returns
+        -------
+        self.timeseries
+
+        """
+
+        for key, values in observations.items():
+            self.timeseries.loc[index, key] = values
+
+        return self.timeseries
+
     def value_for_timestamp(self, timestamp):
 
         """
@@ -438,10 +521,13 @@ class CombinedHeatAndPower(Component):
         A positiv result represents a load.
         A negative result represents a generation.
 
+        The value depends on the current state of the chp, not on the
+        timestamp: el_power * limit while the chp is running, else 0.
+
         Parameters
         ----------
-        timestamp: datetime64[ns]
-            value of the time of ramp down
+        timestamp: int, string or pandas.Timestamp
+            position or time of the value
 
         Returns
         -------
@@ -458,3 +544,41 @@ class CombinedHeatAndPower(Component):
 
             # Return zero
             return 0.0
+
+    def get_value_series(self):
+
+        """
+        Info
+        ----
+        Return the logged electrical demand in kW. It is negative while the
+        chp is running.
+
+        """
+
+        return self.timeseries.el_demand
+
+    def values_for_range(self, start=None, end=None):
+
+        """
+        Info
+        ----
+        Return the values of value_for_timestamp for all timesteps from
+        start to end (both included). Like value_for_timestamp, they depend
+        on the current state of the chp, so they are the same for all
+        timesteps.
+
+        Parameters
+        ----------
+        start, end: int, string or pandas.Timestamp
+            first and last timestep. None: beginning/end of the timeseries
+
+        Returns
+        -------
+        values: numpy.ndarray
+
+        """
+
+        return np.full(
+            len(super().values_for_range(start, end)),
+            float(self.value_for_timestamp(start)),
+        )
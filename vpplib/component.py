@@ -7,9 +7,20 @@ This is the mother class of all VPPx classes
 
 """
 
+import datetime as dt
+import functools
+import numpy as np
+import pandas as pd
+
 
 class Component(object):
 
+    # default of components, whose power can not be limited
+    limit = 1
+
+    # (series, values, index, int64 index) of get_values()
+    _value_cache = None
+
     def __init__(self,
                  unit=None,
                  environment=None,
@@ -63,30 +74,167 @@ class Component(object):
         A positiv result represents a load.
         A negative result represents a generation.
 
-        This abstract function needs to be implemented by child classes.
+        The timestamp is resolved to a position in the timeseries, the value
+        is taken from the cached array of get_values() and multiplied by the
+        limit of the component. Child classes implement get_value_series().
 
         Parameters
         ----------
-        ...
+        timestamp: int, string or pandas.Timestamp
+            position or time of the value. Stringformat: YYYY-MM-DD hh:mm:ss
 
-        Attributes
-        ----------
-        ...
+        Returns
+        -------
+        value for the timestamp
 
-        Notes
-        -----
-        ...
+        """
+        return self.get_values()[self.get_position(timestamp)] * self.limit
 
-        References
+    def values_for_range(self, start=None, end=None):
+        """
+        Info
+        ----
+        Return the values of value_for_timestamp for all timesteps from
+        start to end (both included) at once.
+
+        Parameters
         ----------
-        ...
+        start, end: int, string or pandas.Timestamp
+            first and last timestep. None: beginning/end of the timeseries
 
         Returns
         -------
-        ...
+        values: numpy.ndarray
+
+        """
+
+        values = self.get_values()
+        first = 0 if start is None else self.get_position(start)
+        last = len(values) - 1 if end is None else self.get_position(end)
+
+        return np.array(values[first:last + 1], dtype=float) * self.limit
 
+    def get_value_series(self):
         """
-        return self.timeseries.loc[timestamp].item()
+        Info
+        ----
+        Return the Series of self.timeseries, which holds the values of
+        value_for_timestamp before the limit is applied. By default this is
+        the timeseries itself or its only column.
+
+        Child classes with more columns need to override this function.
+
+        """
+
+        if isinstance(self.timeseries, pd.DataFrame):
+            if self.timeseries.shape[1] != 1:
+                raise NotImplementedError(
+                    "get_value_series needs to be implemented by child "
+                    + "classes with more than one column!"
+                )
+            return self.timeseries[self.timeseries.columns[0]]
+
+        return self.timeseries
+
+    def get_values(self):
+        """
+        Info
+        ----
+        Return the values of get_value_series() as numpy array. The array is
+        a view on the timeseries and cached as long as get_value_series()
+        returns the same Series with the same index, so values written to
+        the timeseries in place, e.g. with timeseries.at[], are included.
+        A replaced timeseries, column or index leads to a new Series and
+        the cache is renewed.
+
+        """
+
+        series = self.get_value_series()
+
+        if (
+            self._value_cache is None
+            or self._value_cache[0] is not series
+            or self._value_cache[2] is not series.index
+        ):
+            # int64 nanoseconds of a sorted DatetimeIndex without time zone
+            # for the binary search in get_position()
+            nanoseconds = None
+            if (
+                isinstance(series.index, pd.DatetimeIndex)
+                and series.index.tz is None
+                and series.index.is_monotonic_increasing
+            ):
+                nanoseconds = series.index.values.astype(
+                    "datetime64[ns]"
+                ).view("int64")
+            self._value_cache = (
+                series, series.values, series.index, nanoseconds
+            )
+
+        return self._value_cache[1]
+
+    def get_position(self, timestamp):
+        """
+        Info
+        ----
+        Return the position of a timestamp in the cached values of
+        get_values(). Integer positions are returned unchanged.
+
+        """
+
+        if isinstance(timestamp, (int, np.integer)):
+            return timestamp
+
+        if isinstance(timestamp, str):
+            timestamp = parse_timestamp(timestamp)
+        elif isinstance(timestamp, (dt.datetime, np.datetime64)):
+            timestamp = pd.Timestamp(timestamp)
+        else:
+            raise ValueError(
+                "timestamp needs to be of type int, string or "
+                + "pandas.Timestamp. Stringformat: YYYY-MM-DD hh:mm:ss"
+            )
+
+        self.get_values()
+        index, nanoseconds = self._value_cache[2:]
+
+        if nanoseconds is not None and timestamp.tz is None:
+            position = nanoseconds.searchsorted(timestamp.value)
+            if (
+                position < len(nanoseconds)
+                and nanoseconds[position] == timestamp.value
+            ):
+                return position
+            raise KeyError(timestamp)
+
+        return index.get_loc(timestamp)
+
+    def reset_value_cache(self):
+        """
+        Info
+        ----
+        Remove the cached values of get_values(). A replaced timeseries or
+        column is detected by get_values() itself, this only releases the
+        reference to the values.
+
+        """
+
+        self._value_cache = None
+
+    def carry_state(self):
+        """
+        Info
+        ----
+        Keep the internal state at the end of the current timeseries as
+        initial state of the next call of prepare_time_series(), e.g. when
+        the Operator simulates a long period in chunks.
+
+        Components without a state between timesteps do nothing. Child
+        classes with such a state need to override this function.
+
+        """
+
+        pass
 
     def observations_for_timestamp(self, timestamp):
         """
@@ -176,3 +324,17 @@ class Component(object):
         self.timeseries = None
 
         return self.timeseries
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def parse_timestamp(timestamp):
+
+    """
+    Info
+    ----
+    Return the pandas.Timestamp of a string. The results are cached, since
+    the same timestamps are parsed for every component.
+
+    """
+
+    return pd.Timestamp(timestamp)
@@ -7,9 +7,14 @@ This file contains the basic functionalities of the ElectricalEnergyStorage clas
 """
 
 from .component import Component
+from .kernels import get_kernel
+import numpy as np
 import pandas as pd
 import datetime as dt
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from configparser import ConfigParser
 from simses.main import SimSES
 import PySAM.BatteryStateful as battery
@@ -85,21 +90,27 @@ class ElectricalEnergyStorage(Component):
         self.residual_load = None
         self.timeseries = None
 
-    def prepare_time_series(self):
-
-        soc_lst = []
-        res_load_lst = []
-        for residual_load in self.residual_load:
+    def prepare_time_series(self, jit=False):
 
-            soc, res_load = self.operate_storage(residual_load=residual_load)
-            soc_lst.append(soc)
-            res_load_lst.append(res_load)
+        fleet = ElectricalEnergyStorageFleet(
+            capacity=self.capacity,
+            charge_efficiency=self.charge_efficiency,
+            discharge_efficiency=self.discharge_efficiency,
+            max_power=self.max_power,
+            max_c=self.max_c,
+            environment=self.environment,
+            state_of_charge=self.state_of_charge,
+        )
+        soc, res_load = fleet.prepare_time_series(
+            np.asarray(self.residual_load, dtype=float)[np.newaxis], jit=jit
+        )
+        self.state_of_charge = fleet.state_of_charge[0]
 
         # save state of charge and residual load
         self.timeseries = pd.DataFrame(
-            data=soc_lst, columns=["state_of_charge"]
+            data=soc[0], columns=["state_of_charge"]
         )
-        self.timeseries["residual_load"] = pd.DataFrame(data=res_load_lst)
+        self.timeseries["residual_load"] = res_load[0]
 
         self.timeseries.index = self.residual_load.index
 
@@ -356,22 +367,321 @@ class ElectricalEnergyStorage(Component):
     # Balancing Functions
     # ===================================================================================
 
-    # Override balancing function from super class.
-    def value_for_timestamp(self, timestamp):
+    # Values of the balancing functions of the super class.
+    def get_value_series(self):
 
-        if type(timestamp) == int:
+        """
+        Info
+        ----
+        Return the residual load in kW for value_for_timestamp.
 
-            return self.timeseries["residual_load"].iloc[timestamp]
+        """
 
-        elif type(timestamp) == str:
+        return self.timeseries["residual_load"]
 
-            return self.timeseries["residual_load"].loc[timestamp]
 
-        else:
+def operate_storage_kernel(
+    residual_load,
+    state_of_charge,
+    capacity,
+    charge_efficiency,
+    discharge_efficiency,
+    max_power,
+    max_c,
+    timebase,
+):
+
+    """
+    Info
+    ----
+    ElectricalEnergyStorage.operate_storage for M storages and T timesteps.
+    Only works on numpy arrays, so it can be compiled with numba.njit.
+
+    Parameters
+    ----------
+    residual_load: numpy.ndarray
+        shape (M, T)
+
+    state_of_charge, capacity, charge_efficiency, discharge_efficiency,
+    max_power, max_c: numpy.ndarray
+        shape (M,). state_of_charge is changed in place.
+
+    timebase: float
+        length of a timestep in minutes
+
+    Returns
+    -------
+    soc, res_load: numpy.ndarray
+        shape (M, T)
+
+    """
+
+    n_storages, n_steps = residual_load.shape
+    soc = np.empty((n_storages, n_steps))
+    res_load = np.empty((n_storages, n_steps))
+    hours = timebase / 60
+
+    for m in range(n_storages):
+        state = state_of_charge[m]
+
+        for t in range(n_steps):
+            charge = residual_load[m, t]
+
+            power = charge / hours
+            if power > max_power[m] * max_c[m]:
+                charge = (max_power[m] * max_c[m]) * hours
+
+            if residual_load[m, t] >= 0:
+                # discharge
+                if state > 0:
+                    state -= charge * discharge_efficiency[m] * hours
+
+                    # do not discharge below 0 kWh
+                    if state < 0:
+                        charge = state / discharge_efficiency[m] / hours * -1
+                        state = 0.0
+
+                    else:
+                        charge = 0.0
+
+            elif residual_load[m, t] < 0:
+                # charge
+                if state < capacity[m]:
+                    state += charge * charge_efficiency[m] * hours * -1
+
+                    # do not overcharge the storage
+                    if state > capacity[m]:
+                        charge = (
+                            (capacity[m] - state) / charge_efficiency[m] / hours
+                        )
+                        state = capacity[m]
+
+                    else:
+                        charge = 0.0
+
+            soc[m, t] = state
+            res_load[m, t] = charge
+
+        state_of_charge[m] = state
+
+    return soc, res_load
+
+
+class ElectricalEnergyStorageFleet(object):
+    def __init__(
+        self,
+        capacity,
+        charge_efficiency,
+        discharge_efficiency,
+        max_power,
+        max_c,
+        environment,
+        state_of_charge=0,
+    ):
+        """
+        Info
+        ----
+        The class "ElectricalEnergyStorageFleet" simulates M storages with the
+        operation strategy of ElectricalEnergyStorage at once. The parameters
+        and states of charge are kept as arrays of length M.
+
+        Parameters
+        ----------
+
+        capacity [kWh]
+        charge_efficiency [-] (between 0 and 1)
+        discharge_efficiency [-] (between 0 and 1)
+        max_power [kW]
+        max_c [-] (between 0.5 and 1.2)
+        state_of_charge [kWh]
+            scalars (same value for all storages) or arrays of length M
+
+        environment: vpplib.environment.Environment
+            environment with the timebase of the simulation
+
+        Attributes
+        ----------
+
+        n_storages: int
+            number of storages M
+
+        """
+
+        (
+            self.capacity,
+            self.charge_efficiency,
+            self.discharge_efficiency,
+            self.max_power,
+            self.max_c,
+            self.state_of_charge,
+        ) = (
+            np.array(values, dtype=float)
+            for values in np.broadcast_arrays(
+                *np.atleast_1d(
+                    capacity,
+                    charge_efficiency,
+                    discharge_efficiency,
+                    max_power,
+                    max_c,
+                    state_of_charge,
+                )
+            )
+        )
+        self.environment = environment
+        self.n_storages = len(self.capacity)
+
+    @classmethod
+    def from_storages(cls, storages):
+
+        """
+        Info
+        ----
+        Create a fleet from a list of ElectricalEnergyStorage objects with
+        the same environment.
+
+        """
+
+        return cls(
+            capacity=[storage.capacity for storage in storages],
+            charge_efficiency=[
+                storage.charge_efficiency for storage in storages
+            ],
+            discharge_efficiency=[
+                storage.discharge_efficiency for storage in storages
+            ],
+            max_power=[storage.max_power for storage in storages],
+            max_c=[storage.max_c for storage in storages],
+            environment=storages[0].environment,
+            state_of_charge=[storage.state_of_charge for storage in storages],
+        )
+
+    def operate_storage(self, residual_load):
+
+        """
+        Info
+        ----
+        Operate all storages for one timestep with array operations.
+
+        Parameters
+        ----------
+
+        residual_load: numpy.ndarray
+            residual load of each storage, shape (M,)
+
+        Returns
+        -------
+
+        state_of_charge, res_load: numpy.ndarray
+            shape (M,)
+
+        """
+
+        residual_load = np.asarray(residual_load, dtype=float)
+        hours = self.environment.timebase / 60
+        max_charge = self.max_power * self.max_c
+
+        charge = np.where(
+            residual_load / hours > max_charge,
+            max_charge * hours,
+            residual_load,
+        )
+
+        # discharge
+        soc_discharged = (
+            self.state_of_charge
+            - charge * self.discharge_efficiency * hours
+        )
+        discharging = (residual_load >= 0) & (self.state_of_charge > 0)
+        empty = discharging & (soc_discharged < 0)
+
+        # charge
+        soc_charged = (
+            self.state_of_charge + charge * self.charge_efficiency * hours * -1
+        )
+        charging = (residual_load < 0) & (self.state_of_charge < self.capacity)
+        full = charging & (soc_charged > self.capacity)
+
+        res_load = np.select(
+            [
+                empty,
+                discharging,
+                full,
+                charging,
+            ],
+            [
+                soc_discharged / self.discharge_efficiency / hours * -1,
+                0.0,
+                (self.capacity - soc_charged) / self.charge_efficiency / hours,
+                0.0,
+            ],
+            charge,
+        )
+        self.state_of_charge = np.select(
+            [empty, discharging, full, charging],
+            [0.0, soc_discharged, self.capacity, soc_charged],
+            self.state_of_charge,
+        )
+
+        return self.state_of_charge.copy(), res_load
+
+    def prepare_time_series(self, residual_load, jit=False):
+
+        """
+        Info
+        ----
+        Operate all storages for the whole horizon. Every storage is
+        simulated in one loop over all timesteps (operate_storage_kernel).
+
+        Parameters
+        ----------
+
+        residual_load: numpy.ndarray
+            shape (M, T)
+
+        jit: boolean
+            compile the loop with numba
+
+        Returns
+        -------
+
+        state_of_charge, residual_load: numpy.ndarray
+            shape (M, T)
+
+        """
+
+        residual_load = np.ascontiguousarray(residual_load, dtype=float)
+        if residual_load.shape[0] != self.n_storages:
             raise ValueError(
-                "timestamp needs to be of type int or string. Stringformat: YYYY-MM-DD hh:mm:ss"
+                "residual_load needs the shape (number of storages, "
+                + "number of timesteps)"
             )
 
+        return get_kernel(operate_storage_kernel, jit)(
+            residual_load,
+            self.state_of_charge,
+            self.capacity,
+            self.charge_efficiency,
+            self.discharge_efficiency,
+            self.max_power,
+            self.max_c,
+            float(self.environment.timebase),
+        )
+
+
+def get_epoch_seconds(index):
+    """
+    Info
+    ----
+    Return the seconds since the epoch of all timestamps of a DatetimeIndex
+    without time zone. Like time.mktime, the timestamps are interpreted in
+    the local time zone.
+
+    """
+
+    return np.array(
+        [time.mktime(timestamp.timetuple()) for timestamp in index]
+    )
+
 
 class ElectricalEnergyStorageSimses(Component):
     """.
@@ -409,6 +719,12 @@ class ElectricalEnergyStorageSimses(Component):
         DESCRIPTION. The default is None.
     cost : TYPE, optional
         DESCRIPTION. The default is None.
+    do_analysis : bool, optional
+        run the SimSES analysis of the results, when the SimSES instance
+        is closed. The default is True.
+    export_data : bool, optional
+        export the states of every simulation step to the result_path.
+        The default is True.
 
     Raises
     ------
@@ -428,7 +744,9 @@ class ElectricalEnergyStorageSimses(Component):
                  environment=None,
                  user_profile=None,
                  unit=None,
-                 cost=None
+                 cost=None,
+                 do_analysis: bool = True,
+                 export_data: bool = True
                  ):
 
         self.max_power = max_power
@@ -473,6 +791,8 @@ class ElectricalEnergyStorageSimses(Component):
                                    )
         self.simulation_config.set('GENERAL', 'END',
                                    self.environment.end)
+        self.simulation_config.set('GENERAL', 'EXPORT_DATA',
+                                   str(export_data))
         self.simulation_config.add_section('STORAGE_SYSTEM')
 
         self.simulation_config.set(
@@ -505,11 +825,15 @@ class ElectricalEnergyStorageSimses(Component):
         self.simulation_config.set(
             'BATTERY', 'START_SOH', str(1.0))  # self.soh_start
 
+        # SimSES only creates the result directory for the data export,
+        # but always writes its system parameters to it
+        os.makedirs(os.path.join(result_path, simulation_name), exist_ok=True)
+
         self.simses: SimSES = SimSES(
             str(result_path + '\\').replace('\\', '/'),
             simulation_name,
             do_simulation=True,
-            do_analysis=True,
+            do_analysis=do_analysis,
             simulation_config=self.simulation_config)
 
     def operate_storage(self, timestep, load):
@@ -528,18 +852,13 @@ class ElectricalEnergyStorageSimses(Component):
             DESCRIPTION.
 
         """
-        try:
-            self.simses.run_one_simulation_step(
+        self.simulation_step(
             time.mktime(
                 dt.datetime.strptime(str(timestep),
                                      "%Y-%m-%d %H:%M:%S").timetuple()
             ),
             (load * -1000)
-              )
-        except ZeroDivisionError:
-            # Handle the division by zero error here
-            ac = 0.001  # Set AC power to a default value
-            # if possible one could also set  state of charge to a default value
+        )
         return (self.simses.state.soc,
                 (self.simses.state.get(
                     self.simses.state.AC_POWER_DELIVERED) / 1000))
@@ -547,58 +866,81 @@ class ElectricalEnergyStorageSimses(Component):
     def prepare_time_series(self):
         """.
 
+        Info
+        ----
+        Run the simulation for the residual load of the whole environment
+        period. The epoch seconds of all timesteps are computed at once and
+        the results are written to preallocated arrays.
+
         Returns
         -------
-        TYPE
-            DESCRIPTION.
+        timeseries : pandas.core.frame.DataFrame
+            state_of_charge and ac_power in kW of every timestep
 
         """
-        soc_lst = list()
-        ac_lst = list()
+        index = pd.date_range(start=self.environment.start,
+                              end=self.environment.end,
+                              freq=self.environment.time_freq)
 
-        for timestep in pd.date_range(start=self.environment.start,
-                                      end=self.environment.end,
-                                      freq=self.environment.time_freq):
+        epoch_seconds = get_epoch_seconds(index)
+        # kW to W; SimSES expects a positive power for charging
+        power = (np.asarray(self.residual_load.loc[index], dtype=float)
+                 * -1000).tolist()
 
-            soc, ac = self.operate_storage(
-                timestep,
-                self.residual_load[timestep]
-            )
+        soc = np.empty(len(index))
+        ac_power = np.empty(len(index))
 
-            soc_lst.append(soc)
-            ac_lst.append(ac)
+        for step in range(len(index)):
+            self.simulation_step(epoch_seconds[step], power[step])
+            soc[step] = self.simses.state.soc
+            ac_power[step] = self.simses.state.get(
+                self.simses.state.AC_POWER_DELIVERED) / 1000
 
         self.timeseries = pd.DataFrame(
-            {"state_of_charge": soc_lst,
-             "ac_power": ac_lst},
-            index=pd.date_range(start=self.environment.start,
-                                end=self.environment.end,
-                                freq=self.environment.time_freq)
+            {"state_of_charge": soc,
+             "ac_power": ac_power},
+            index=index
         )
 
         return self.timeseries
 
+    def simulation_step(self, epoch_seconds, power):
+        """.
+
+        Info
+        ----
+        Run one simulation step of SimSES.
+
+        Parameters
+        ----------
+        epoch_seconds : float
+            timestamp of the step in seconds since the epoch
+        power : float
+            power in W, positive for charging
+
+        """
+        try:
+            self.simses.run_one_simulation_step(epoch_seconds, power)
+        except ZeroDivisionError:
+            # the state of the failed step is kept
+            pass
+
     def reset_time_series(self):
 
         self.timeseries = None
 
         return self.timeseries
 
-    def value_for_timestamp(self, timestamp):
+    def get_value_series(self):
 
-        if type(timestamp) == int:
-
-            return self.timeseries["ac_power"].iloc[timestamp]
-
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the AC power in kW for value_for_timestamp.
 
-            return self.timeseries["ac_power"].loc[timestamp]
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string."
-                + " Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries["ac_power"]
 
     def observations_for_timestamp(self, timestamp):
         """.
@@ -723,7 +1065,37 @@ class PySAMBatteryStateful(Component):
                             C_rate=0.200, Vcut=2,
                             initial_SOC=50.0, maximum_SOC=95.0, minimum_SOC=5.0):
 
-        self.battery_config = {
+        self.battery_config = self.get_battery_config(
+            nominal_energy,
+            nominal_voltage=nominal_voltage,
+            Vnom_default=Vnom_default, resistance=resistance,
+            Vfull=Vfull, Vexp=Vexp, Vnom=Vnom,
+            Qfull=Qfull, Qexp=Qexp, Qnom=Qnom,
+            C_rate=C_rate, Vcut=Vcut,
+            initial_SOC=initial_SOC, maximum_SOC=maximum_SOC,
+            minimum_SOC=minimum_SOC)
+
+        self.battery_stateful = new_battery_stateful(self.battery_config)
+
+        return self.battery_stateful, self.battery_config
+
+    @staticmethod
+    def get_battery_config(nominal_energy,
+                           nominal_voltage=500,
+                           Vnom_default=3.600, resistance=0.0001,
+                           Vfull=4.100, Vexp=4.050, Vnom=3.400,
+                           Qfull=2.250, Qexp=0.040, Qnom=2.000,
+                           C_rate=0.200, Vcut=2,
+                           initial_SOC=50.0, maximum_SOC=95.0, minimum_SOC=5.0):
+        """.
+
+        Info
+        ----
+        Return the configuration of a PySAM BatteryStateful model, e.g. to
+        pass a list of configurations to run_battery_stateful_parallel().
+
+        """
+        battery_config = {
             # Control using current (0) or power (1) [0/1]
             "control_mode": 1,
             # Power at which to run battery [kW]
@@ -866,16 +1238,8 @@ class PySAMBatteryStateful(Component):
             # Required: True if replacement_option=2
             # "replacement_schedule_percent": 0
             }
-        
-        self.battery_stateful = battery.new()
 
-        for k, v in self.battery_config.items():
-            self.battery_stateful.value(k, v)
-
-        self.battery_stateful.setup()  # Setup parameters in simulation
-        self.battery_stateful.execute()
-        
-        return self.battery_stateful, self.battery_config
+        return battery_config
     
     def operate_storage(self, load):
         """.
@@ -906,26 +1270,23 @@ class PySAMBatteryStateful(Component):
             DESCRIPTION.
 
         """
-        soc_lst = list()
-        ac_lst = list()
-
-        for timestep in pd.date_range(start=self.environment.start,
-                                      end=self.environment.end,
-                                      freq=self.environment.time_freq):
-
-            soc, ac = self.operate_storage(
-                self.residual_load[timestep]
-            )
-
-            soc_lst.append(soc)
-            ac_lst.append(ac)
+        index = pd.date_range(start=self.environment.start,
+                              end=self.environment.end,
+                              freq=self.environment.time_freq)
+
+        soc = np.empty(len(index))
+        ac_power = np.empty(len(index))
+        operate_battery_stateful(
+            self.battery_stateful,
+            np.asarray(self.residual_load.loc[index], dtype=float),
+            soc,
+            ac_power
+        )
 
         self.timeseries = pd.DataFrame(
-            {"state_of_charge": soc_lst,
-             "ac_power": ac_lst},
-            index=pd.date_range(start=self.environment.start,
-                                end=self.environment.end,
-                                freq=self.environment.time_freq)
+            {"state_of_charge": soc,
+             "ac_power": ac_power},
+            index=index
         )
 
         return self.timeseries
@@ -936,21 +1297,16 @@ class PySAMBatteryStateful(Component):
 
         return self.timeseries
 
-    def value_for_timestamp(self, timestamp):
-
-        if type(timestamp) == int:
+    def get_value_series(self):
 
-            return self.timeseries["ac_power"].iloc[timestamp]
-
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the AC power in kW for value_for_timestamp.
 
-            return self.timeseries["ac_power"].loc[timestamp]
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string."
-                + " Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries["ac_power"]
 
     def observations_for_timestamp(self, timestamp):
         """.
@@ -1010,4 +1366,180 @@ class PySAMBatteryStateful(Component):
             "capacity": self.battery_stateful.StatePack.Q,
         }
 
-        return observations
\ No newline at end of file
+        return observations
+
+
+def new_battery_stateful(battery_config):
+    """
+    Info
+    ----
+    Return a PySAM BatteryStateful model, which is set up with the given
+    configuration (see PySAMBatteryStateful.get_battery_config).
+
+    """
+
+    battery_stateful = battery.new()
+
+    for k, v in battery_config.items():
+        battery_stateful.value(k, v)
+
+    battery_stateful.setup()  # Setup parameters in simulation
+    battery_stateful.execute()
+
+    return battery_stateful
+
+
+def operate_battery_stateful(battery_stateful, residual_load, soc, power):
+    """
+    Info
+    ----
+    Run a PySAM BatteryStateful model for all timesteps of residual_load.
+    The state of charge and the power of every timestep are written to the
+    arrays soc and power.
+
+    Parameters
+    ----------
+    battery_stateful: PySAM.BatteryStateful.BatteryStateful
+        set up model, which keeps its state between the timesteps
+
+    residual_load: numpy.ndarray
+        input power of every timestep in kW
+
+    soc, power: numpy.ndarray
+        output arrays with the length of residual_load
+
+    """
+
+    controls = battery_stateful.Controls
+    state = battery_stateful.StatePack
+    execute = battery_stateful.execute
+
+    for step, load in enumerate(residual_load.tolist()):
+        controls.input_power = load
+        execute()
+        soc[step] = state.SOC
+        power[step] = state.P
+
+
+def run_battery_stateful_parallel(battery_configs, residual_load,
+                                  processes=None):
+    """
+    Info
+    ----
+    Simulate one PySAM BatteryStateful model per configuration in a pool of
+    worker processes, e.g. for degradation studies over many battery
+    variants. Every worker sets up one model per configuration and runs it
+    over all timesteps. The residual load and the results are exchanged via
+    shared memory, so only the configurations are pickled.
+
+    Parameters
+    ----------
+    battery_configs: list
+        configurations of the batteries, see
+        PySAMBatteryStateful.get_battery_config
+
+    residual_load: numpy.ndarray
+        input power in kW, either of shape (timesteps,) for the same load of
+        all batteries or (batteries, timesteps)
+
+    processes: int
+        number of worker processes. Default: os.cpu_count()
+
+    Returns
+    -------
+    soc, power: numpy.ndarray
+        state of charge and power of shape (batteries, timesteps)
+
+    """
+
+    residual_load = np.asarray(residual_load, dtype=float)
+    n_batteries = len(battery_configs)
+    if residual_load.ndim == 2 and residual_load.shape[0] != n_batteries:
+        raise ValueError(
+            "residual_load needs one row per battery configuration!"
+        )
+    n_steps = residual_load.shape[-1]
+
+    if processes is None:
+        processes = os.cpu_count()
+
+    chunks = [
+        chunk
+        for chunk in np.array_split(np.arange(n_batteries), processes)
+        if len(chunk) > 0
+    ]
+
+    load_memory = shared_memory.SharedMemory(
+        create=True, size=max(residual_load.nbytes, 1)
+    )
+    result_memory = shared_memory.SharedMemory(
+        create=True, size=max(2 * n_batteries * n_steps * 8, 1)
+    )
+    try:
+        np.ndarray(
+            residual_load.shape, dtype=float, buffer=load_memory.buf
+        )[:] = residual_load
+
+        tasks = [
+            (
+                load_memory.name,
+                residual_load.shape,
+                result_memory.name,
+                (2, n_batteries, n_steps),
+                chunk,
+                [battery_configs[i] for i in chunk],
+            )
+            for chunk in chunks
+        ]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            # raise the exceptions of the workers
+            list(executor.map(_run_battery_stateful_chunk, tasks))
+
+        results = np.array(
+            np.ndarray(
+                (2, n_batteries, n_steps), dtype=float,
+                buffer=result_memory.buf
+            )
+        )
+    finally:
+        load_memory.close()
+        load_memory.unlink()
+        result_memory.close()
+        result_memory.unlink()
+
+    return results[0], results[1]
+
+
+def _run_battery_stateful_chunk(task):
+
+    """
+    Info
+    ----
+    Worker function of run_battery_stateful_parallel. It needs to be
+    defined on module level to be picklable.
+
+    """
+
+    load_name, load_shape, result_name, result_shape, chunk, configs = task
+
+    load_memory = shared_memory.SharedMemory(name=load_name)
+    result_memory = shared_memory.SharedMemory(name=result_name)
+    try:
+        residual_load = np.ndarray(
+            load_shape, dtype=float, buffer=load_memory.buf
+        )
+        results = np.ndarray(
+            result_shape, dtype=float, buffer=result_memory.buf
+        )
+        for row, battery_config in zip(chunk, configs):
+            operate_battery_stateful(
+                new_battery_stateful(battery_config),
+                residual_load[row] if residual_load.ndim == 2
+                else residual_load,
+                results[0, row],
+                results[1, row],
+            )
+        del residual_load, results
+    finally:
+        load_memory.close()
+        result_memory.close()
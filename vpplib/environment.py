@@ -13,6 +13,9 @@ TODO: Add regulatory influences e. g. photovoltaik maximum power at the grid con
 import pandas as pd
 import os
 
+from . import reference_data
+from . import weather_store
+
 class Environment(object):
     def __init__(
         self,
@@ -72,13 +75,17 @@ class Environment(object):
         self.pv_data = pv_data
         self.wind_data = wind_data
 
+        # {attribute: (DataFrame, source)} of the data read from files
+        self.sources = {}
+
     def get_pv_data(
         self, file=os.path.join(os.path.dirname(__file__),"../input/pv/dwd_pv_data_2015.csv")
         # self, file="./input/pv/dwd_pv_data_2015.csv"
         ):
 
-        self.pv_data = pd.read_csv(file, index_col="time")
-        self.pv_data.index = pd.to_datetime(self.pv_data.index)
+        self.pv_data = reference_data.read_csv(
+            file, index_col="time", parse_index=True
+        )
 
         return self.pv_data
 
@@ -87,7 +94,7 @@ class Environment(object):
         # self, file="./input/thermal/dwd_temp_days_2015.csv"
     ):
 
-        self.mean_temp_days = pd.read_csv(file, index_col="time")
+        self.mean_temp_days = reference_data.read_csv(file, index_col="time")
 
         return self.mean_temp_days
 
@@ -96,10 +103,43 @@ class Environment(object):
         # self, file="./input/thermal/dwd_temp_hours_2015.csv"
     ):
 
-        self.mean_temp_hours = pd.read_csv(file, index_col="time")
+        self.mean_temp_hours = reference_data.read_csv(
+            file, index_col="time"
+        )
+
+        path = os.path.abspath(file)
+        self.sources["mean_temp_hours"] = (
+            self.mean_temp_hours,
+            ("csv", path, os.path.getmtime(path), None, None),
+        )
 
         return self.mean_temp_hours
 
+    def get_source(self, attribute):
+
+        """
+        Info
+        ----
+        Return the source of the data of an attribute, e.g.
+        "mean_temp_hours", as hashable tuple
+        (kind, path, mtime, start, end) with kind "csv" or "store".
+        Components use the source as key to share results, which only
+        depend on the data, like the COP series of HeatPump.get_cop.
+
+        Returns
+        -------
+        source: tuple
+            None, if the data was not read from a file or the attribute
+            was assigned another DataFrame afterwards
+
+        """
+
+        source = self.sources.get(attribute)
+        if source is None or source[0] is not getattr(self, attribute):
+            return None
+
+        return source[1]
+
     def get_wind_data(
         self, file=os.path.join(os.path.dirname(__file__),"../input/wind/dwd_wind_data_2015.csv"), utc=False
         # self, file="./input/wind/dwd_wind_data_2015.csv", utc=False
@@ -136,18 +176,16 @@ class Environment(object):
         """
 
         if utc == True:
-            df = pd.read_csv(
-                file,
-                index_col=0,
-                header=[0, 1],
-                date_parser=lambda idx: pd.to_datetime(idx, utc=True),
+            df = reference_data.read_csv(
+                file, index_col=0, header=[0, 1], utc=True
             )
-            # change type of index to datetime and set time zone
-            df.index = pd.to_datetime(df.index).tz_convert(self.timezone)
+            # set time zone
+            df.index = df.index.tz_convert(self.timezone)
 
         else:
-            df = pd.read_csv(file, index_col=0, header=[0, 1])
-            df.index = pd.to_datetime(df.index)
+            df = reference_data.read_csv(
+                file, index_col=0, header=[0, 1], parse_index=True
+            )
 
         # change type of height from str to int by resetting columns
         l0 = [_[0] for _ in df.columns]
@@ -156,3 +194,131 @@ class Environment(object):
         self.wind_data = df
 
         return self.wind_data
+
+    def get_weather_from_store(
+        self, directory="./input/binary", start=None, end=None
+    ):
+
+        """
+        Info
+        ----
+        Load the weather data from the binary format of
+        vpplib.weather_store. The arrays are memory-mapped, only the period
+        start:end is read from disk. Use weather_store.convert_input() to
+        convert the csv files in ./input. The DataFrames have the same
+        index types as those of the get_* functions, which read the csv
+        files.
+
+        Parameters
+        ----------
+        directory: string
+            directory with the datasets pv, wind, mean_temp_days and
+            mean_temp_hours. Missing datasets are skipped.
+
+        start, end: string
+            period to load, e.g. self.start and self.end.
+            None: load the whole dataset. Note that the COP series of
+            HeatPump.get_cop only covers the loaded period.
+
+        Returns
+        -------
+        self.pv_data, self.wind_data, self.mean_temp_days, self.mean_temp_hours
+
+        """
+
+        datasets = {
+            "pv": "pv_data",
+            "wind": "wind_data",
+            "mean_temp_days": "mean_temp_days",
+            "mean_temp_hours": "mean_temp_hours",
+        }
+
+        for dataset, attribute in datasets.items():
+            path = os.path.join(directory, dataset)
+            if os.path.isdir(path):
+                setattr(
+                    self,
+                    attribute,
+                    weather_store.read_dataset(path, start=start, end=end),
+                )
+                path = os.path.abspath(path)
+                self.sources[attribute] = (
+                    getattr(self, attribute),
+                    (
+                        "store",
+                        path,
+                        os.path.getmtime(os.path.join(path, "meta.json")),
+                        start,
+                        end,
+                    ),
+                )
+
+        return (
+            self.pv_data,
+            self.wind_data,
+            self.mean_temp_days,
+            self.mean_temp_hours,
+        )
+
+    def iter_chunks(self, chunk_size, directory=None):
+
+        """
+        Info
+        ----
+        Split the period self.start:self.end into chunks of chunk_size
+        timesteps and yield them one after another. While a chunk is
+        processed, self.start and self.end are set to its first and last
+        timestep, so prepare_time_series() of the components only creates
+        the time series of the chunk. The period is restored afterwards.
+
+        Parameters
+        ----------
+        chunk_size: int
+            number of timesteps per chunk
+
+        directory: string
+            directory with the datasets of vpplib.weather_store. If given,
+            the pv and wind data of each chunk are read from the
+            memory-mapped datasets, so only the weather of one chunk is
+            held in memory. None: self.pv_data and self.wind_data are used.
+
+        Yields
+        ------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps of the chunk
+
+        """
+
+        index = pd.date_range(
+            start=self.start, end=self.end, freq=self.time_freq
+        )
+
+        start, end = self.start, self.end
+        pv_data, wind_data = self.pv_data, self.wind_data
+
+        try:
+            for first in range(0, len(index), chunk_size):
+                chunk = index[first : first + chunk_size]
+                self.start = chunk[0].strftime("%Y-%m-%d %H:%M:%S")
+                self.end = chunk[-1].strftime("%Y-%m-%d %H:%M:%S")
+
+                if directory is not None:
+                    for dataset, attribute in (
+                        ("pv", "pv_data"),
+                        ("wind", "wind_data"),
+                    ):
+                        path = os.path.join(directory, dataset)
+                        if os.path.isdir(path):
+                            setattr(
+                                self,
+                                attribute,
+                                weather_store.read_dataset(
+                                    path, start=self.start, end=self.end
+                                ),
+                            )
+
+                yield chunk
+
+        finally:
+            self.start, self.end = start, end
+            self.pv_data, self.wind_data = pv_data, wind_data
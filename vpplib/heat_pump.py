@@ -6,11 +6,23 @@ This file contains the basic functionalities of the HeatPump class.
 
 """
 
+import functools
+import numpy as np
 import pandas as pd
 from .component import Component
+from . import reference_data
+from . import weather_store
 
 
 class HeatPump(Component):
+
+    # coefficients (a, b, c) of cop = a + b * dT + c * dT ** 2
+    # with dT = heat_sys_temp - outside temperature
+    cop_coefficients = {
+        "Air": (6.81, -0.121, 0.00063),
+        "Ground": (8.77, -0.15, 0.000734),
+    }
+
     def __init__(
         self,
         heat_pump_type,
@@ -99,17 +111,25 @@ class HeatPump(Component):
 
         self.is_running = False
 
-    def get_cop(self):
+    def get_cop(self, mean_temp=None):
 
         """
         Info
         ----
-        Calculate COP of heatpump according to heatpump type
+        Calculate COP of heatpump according to heatpump type.
+        If the temperatures of environment.mean_temp_hours were read from a
+        file, the COP series is cached: heatpumps with the same
+        coefficients, heat_sys_temp and file share one read-only DataFrame
+        (see get_shared_cop). Other temperatures are calculated for each
+        heatpump. The index are the timestamps of the temperatures.
         
         Parameters
         ----------
         
-        ...
+        mean_temp: pandas.core.frame.DataFrame
+            temperatures with column "temperature" in any resolution, e.g.
+            user_profile.mean_temp_quarter_hours.
+            Default: hourly temperatures of environment.mean_temp_hours
         	
         Attributes
         ----------
@@ -132,42 +152,55 @@ class HeatPump(Component):
         ...
         
         """
-        if len(self.environment.mean_temp_hours) == 0:
-            self.environment.get_mean_temp_hours()
+        if self.heat_pump_type not in self.cop_coefficients:
+            raise ValueError("Heatpump type is not defined!")
 
-        cop_lst = []
+        coefficients = tuple(self.cop_coefficients[self.heat_pump_type])
 
-        if self.heat_pump_type == "Air":
-            for i, tmp in self.environment.mean_temp_hours.iterrows():
-                cop = (
-                    6.81
-                    - 0.121 * (self.heat_sys_temp - tmp)
-                    + 0.00063 * (self.heat_sys_temp - tmp) ** 2
-                )
-                cop_lst.append(cop)
-
-        elif self.heat_pump_type == "Ground":
-            for i, tmp in self.environment.mean_temp_hours.iterrows():
-                cop = (
-                    8.77
-                    - 0.15 * (self.heat_sys_temp - tmp)
-                    + 0.000734 * (self.heat_sys_temp - tmp) ** 2
+        if mean_temp is None:
+            if len(self.environment.mean_temp_hours) == 0:
+                self.environment.get_mean_temp_hours()
+
+            source = self.environment.get_source("mean_temp_hours")
+            if source is not None:
+                self.cop = get_shared_cop(
+                    coefficients, self.heat_sys_temp, source
                 )
-                cop_lst.append(cop)
+                return self.cop
 
-        else:
-            raise ValueError("Heatpump type is not defined!")
+            mean_temp = self.environment.mean_temp_hours
 
-        self.cop = pd.DataFrame(
-            data=cop_lst,
-            index=pd.date_range(
-                self.environment.year, periods=8760, freq="H", name="time"
-            ),
-        )
-        self.cop.columns = ["cop"]
+        self.cop = cop_frame(coefficients, self.heat_sys_temp, mean_temp)
 
         return self.cop
 
+    def calculate_cop(self, temperature):
+
+        """
+        Info
+        ----
+        Evaluate the COP polynomial of the heatpump type for a temperature
+        or an array of temperatures.
+
+        Parameters
+        ----------
+
+        temperature: float or numpy.ndarray
+            outside temperature in °C
+
+        Returns
+        -------
+
+        cop: float or numpy.ndarray
+
+        """
+
+        return cop_polynomial(
+            self.cop_coefficients[self.heat_pump_type],
+            self.heat_sys_temp,
+            temperature,
+        )
+
     def get_current_cop(self, tmp):
 
         """
@@ -202,25 +235,11 @@ class HeatPump(Component):
         
         """
 
-        if self.heat_pump_type == "Air":
-            cop = (
-                6.81
-                - 0.121 * (self.heat_sys_temp - tmp)
-                + 0.00063 * (self.heat_sys_temp - tmp) ** 2
-            )
-
-        elif self.heat_pump_type == "Ground":
-            cop = (
-                8.77
-                - 0.15 * (self.heat_sys_temp - tmp)
-                + 0.000734 * (self.heat_sys_temp - tmp) ** 2
-            )
-
-        else:
+        if self.heat_pump_type not in self.cop_coefficients:
             print("Heatpump type is not defined")
             return -9999
 
-        return cop
+        return self.calculate_cop(tmp)
 
     # from VPPComponents
     def prepare_time_series(self):
@@ -334,22 +353,17 @@ class HeatPump(Component):
     # Balancing Functions
     # =========================================================================
 
-    # Override balancing function from super class.
-    def value_for_timestamp(self, timestamp):
-
-        if type(timestamp) == int:
-
-            return self.timeseries.el_demand.iloc[timestamp] * self.limit
+    # Values of the balancing functions of the super class.
+    def get_value_series(self):
 
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the electrical demand in kW for value_for_timestamp.
 
-            return self.timeseries.el_demand.loc[timestamp] * self.limit
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string. "
-                + "Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries.el_demand
 
     def observations_for_timestamp(self, timestamp):
 
@@ -478,6 +492,71 @@ class HeatPump(Component):
 
         return self.timeseries
 
+    def get_observations_for_horizon(self, index):
+
+        """
+        Info
+        ----
+        Return the values of observations_for_timestamp for all timestamps
+        of index as arrays, once for a running and once for a stopped heat
+        pump. Timestamps, which already have values in self.timeseries,
+        keep these values like in observations_for_timestamp.
+
+        Parameters
+        ----------
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the horizon
+
+        Returns
+        -------
+
+        observations_running, observations_stopped: dict
+            {"thermal_energy_output", "cop", "el_demand": numpy.ndarray}
+
+        """
+
+        logged = self.timeseries.loc[
+            index, ["thermal_energy_output", "cop", "el_demand"]
+        ].values.astype(float)
+        is_logged = ~np.isnan(logged[:, 0])
+
+        cop = self.calculate_cop(
+            self.user_profile.mean_temp_quarter_hours.temperature.loc[
+                index
+            ].values
+        )
+        el_demand = np.full(len(index), float(self.el_power))
+
+        observations_running = {
+            "thermal_energy_output": np.where(
+                is_logged, logged[:, 0], el_demand * cop
+            ),
+            "cop": np.where(is_logged, logged[:, 1], cop),
+            "el_demand": np.where(is_logged, logged[:, 2], el_demand),
+        }
+        observations_stopped = {
+            "thermal_energy_output": np.where(is_logged, logged[:, 0], 0.0),
+            "cop": np.where(is_logged, logged[:, 1], 0.0),
+            "el_demand": np.where(is_logged, logged[:, 2], 0.0),
+        }
+
+        return observations_running, observations_stopped
+
+    def log_observations_for_horizon(self, observations, index):
+
+        """
+        Info
+        ----
+        Write the arrays of observations to self.timeseries at index.
+
+        """
+
+        for key, values in observations.items():
+            self.timeseries.loc[index, key] = values
+
+        return self.timeseries
+
     #%% ramping functions
 
     def is_valid_ramp_up(self, timestamp):
@@ -620,3 +699,79 @@ class HeatPump(Component):
                 return True
             else:
                 return False
+
+
+def cop_polynomial(coefficients, heat_sys_temp, temperature):
+
+    """
+    Info
+    ----
+    Evaluate cop = a + b * dT + c * dT ** 2 with
+    dT = heat_sys_temp - temperature.
+
+    """
+
+    a, b, c = coefficients
+    delta_temp = heat_sys_temp - temperature
+
+    return a + b * delta_temp + c * delta_temp ** 2
+
+
+def cop_frame(coefficients, heat_sys_temp, mean_temp):
+
+    """
+    Info
+    ----
+    Return the read-only COP DataFrame of the temperatures in mean_temp,
+    with the timestamps of mean_temp as DatetimeIndex.
+
+    """
+
+    cop = np.array(
+        cop_polynomial(
+            coefficients, heat_sys_temp, mean_temp.temperature.values
+        ),
+        dtype=float,
+    )
+    cop.flags.writeable = False
+
+    return pd.DataFrame(
+        {"cop": cop},
+        index=pd.DatetimeIndex(pd.to_datetime(mean_temp.index), name="time"),
+        copy=False,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def get_shared_cop(coefficients, heat_sys_temp, source):
+
+    """
+    Info
+    ----
+    Return the COP DataFrame of the temperatures of a file, which is
+    shared by all heatpumps with the same coefficients and heat_sys_temp.
+    The cache is keyed on the source of the temperatures (see
+    Environment.get_source), a modified file has another mtime and
+    therefore another key. The 32 most recently used series are kept.
+
+    Parameters
+    ----------
+    coefficients: tuple
+        coefficients (a, b, c) of the COP polynomial
+
+    heat_sys_temp: float
+        temperature of the heating system in °C
+
+    source: tuple
+        (kind, path, mtime, start, end) of the temperatures
+
+    """
+
+    kind, path, _, start, end = source
+
+    if kind == "csv":
+        mean_temp = reference_data.read_csv(path, index_col="time")
+    else:
+        mean_temp = weather_store.read_dataset(path, start=start, end=end)
+
+    return cop_frame(coefficients, heat_sys_temp, mean_temp)
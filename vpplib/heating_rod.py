@@ -174,22 +174,21 @@ class HeatingRod(Component):
     # Balancing Functions
     # =========================================================================
 
-    # Override balancing function from super class.
+    def get_value_series(self):
+
+        """
+        Info
+        ----
+        Return the electrical demand in kW for value_for_timestamp.
+
+        """
+
+        return self.timeseries.el_demand
+
     def valueForTimestamp(self, timestamp):
 
-        if type(timestamp) == int:
-            
-            return self.timeseries.el_demand.iloc[timestamp] * self.limit
-        
-        elif type(timestamp) == str:
-            
-            return self.timeseries.el_demand.loc[timestamp] * self.limit
-        
-        else:
-            raise ValueError("timestamp needs to be of type int or string. " +
-                             "Stringformat: YYYY-MM-DD hh:mm:ss")
-        
-    
+        return self.value_for_timestamp(timestamp)
+
     def observationsForTimestamp(self, timestamp):
         
         if type(timestamp) == int:
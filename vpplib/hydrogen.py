@@ -289,21 +289,16 @@ class ElectrolysisSimses(Component):
 
         return self.timeseries
 
-    def value_for_timestamp(self, timestamp):
+    def get_value_series(self):
 
-        if type(timestamp) == int:
-
-            return self.timeseries["ac_power"].iloc[timestamp]
-
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the AC power in kW for value_for_timestamp.
 
-            return self.timeseries["ac_power"].loc[timestamp]
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string."
-                + " Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries["ac_power"]
 
     def observations_for_timestamp(self, timestamp):
         """.
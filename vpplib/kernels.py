@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the compilation of the array kernels, e.g.
+ThermalEnergyStorage.operate_storage_kernel, with numba. The kernels only
+work on numpy arrays and run as plain Python functions, numba is only
+imported with the first call with jit=True.
+
+"""
+
+# {kernel: compiled kernel}, filled by the first call with jit=True
+_compiled = {}
+
+
+def get_kernel(kernel, jit=False):
+
+    """
+    Info
+    ----
+    Return kernel, compiled with numba.njit if jit is True. Every kernel
+    is compiled once per process, the compilation is also cached on disk.
+
+    Parameters
+    ----------
+    kernel: function
+        kernel, which can be compiled with numba.njit
+
+    jit: boolean
+        compile the kernel with numba
+
+    Returns
+    -------
+    kernel: function
+
+    """
+
+    if not jit:
+        return kernel
+
+    if kernel not in _compiled:
+        import numba
+
+        _compiled[kernel] = numba.njit(cache=True)(kernel)
+
+    return _compiled[kernel]
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains a content-addressed cache for the results of expensive
+model runs, e.g. the pvlib and windpowerlib ModelChains of Photovoltaic and
+WindPower. The key of a result is a fingerprint of the model parameters and
+the weather data, so components with identical parameters and weather share
+one model run and a changed input automatically leads to a new key.
+
+The results are kept in memory for the lifetime of the process. Optionally,
+they are stored as pickle files in a directory, so they can be reused by
+other processes and later runs, e.g. model_cache.directory = "./cache".
+The pickle files are loaded with pandas.read_pickle, which can execute
+arbitrary code: only use a directory, which nobody else can write to.
+
+Only the results (e.g. the power output as Series) are cached, not the
+model objects, so every component keeps its own mutable ModelChain.
+
+"""
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+
+# {key: result}
+_cache = {}
+
+# results are only cached if enabled is True
+enabled = True
+
+# directory of the pickle files; None: only cache in memory
+directory = None
+
+
+def fingerprint(*parts):
+
+    """
+    Info
+    ----
+    Return the sha1 hex digest of the given parts. DataFrames and Series are
+    hashed by their values, index and column names, numpy arrays by their
+    bytes and all other objects by their repr, so the parts should be
+    numbers, strings or (nested) containers of them.
+
+    """
+
+    sha1 = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            sha1.update(
+                pd.util.hash_pandas_object(part, index=True).values.tobytes()
+            )
+            if isinstance(part, pd.DataFrame):
+                sha1.update(repr(list(part.columns)).encode())
+            else:
+                sha1.update(repr(part.name).encode())
+        elif isinstance(part, np.ndarray):
+            sha1.update(repr((part.dtype, part.shape)).encode())
+            sha1.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, dict):
+            sha1.update(repr(sorted(part.items())).encode())
+        else:
+            sha1.update(repr(part).encode())
+        # separate the parts
+        sha1.update(b"|")
+
+    return sha1.hexdigest()
+
+
+def get(key, function, *args, **kwargs):
+
+    """
+    Info
+    ----
+    Return the cached result of key. If there is none, the result is
+    calculated with function(*args, **kwargs) and cached.
+
+    The cached results are shared by all callers and must not be modified.
+
+    Parameters
+    ----------
+    key: string
+        fingerprint of all inputs of function
+
+    function: callable
+        calculates the result, if it is not cached
+
+    Returns
+    -------
+    result: object
+        return value of function
+
+    """
+
+    if not enabled:
+        return function(*args, **kwargs)
+
+    if key not in _cache:
+
+        path = None if directory is None else cache_path(key)
+
+        if path is not None and os.path.isfile(path):
+            _cache[key] = pd.read_pickle(path)
+        else:
+            _cache[key] = function(*args, **kwargs)
+            if path is not None:
+                os.makedirs(directory, exist_ok=True)
+                pd.to_pickle(_cache[key], path)
+
+    return _cache[key]
+
+
+def cache_path(key):
+
+    """
+    Info
+    ----
+    Return the path of the pickle file of key.
+
+    """
+
+    return os.path.join(directory, key + ".pkl")
+
+
+def clear_cache(files=False):
+
+    """
+    Info
+    ----
+    Remove all results from the cache.
+
+    Parameters
+    ----------
+    files: boolean
+        also delete the pickle files in directory
+
+    """
+
+    _cache.clear()
+
+    if files and directory is not None and os.path.isdir(directory):
+        for file in os.listdir(directory):
+            if file.endswith(".pkl"):
+                os.remove(os.path.join(directory, file))
@@ -12,11 +12,23 @@ TODO: Setup data type for target data and alter the referencing accordingly!
 
 """
 
+import copy
 import math
+import os
+import numpy as np
 import pandas as pd
 import pandapower as pp
 import matplotlib.pyplot as plt
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+
+from .power_flow_engine import PowerFlowEngine
+from .result_store import ResultStore
+from .sensitivity_power_flow import SensitivityPowerFlow
+from .sweep_power_flow import SweepPowerFlow
+from .phase_timer import PhaseTimer
+from .topology_index import TopologyIndex
+from . import weather_store
 
 
 class Operator(object):
@@ -73,6 +85,23 @@ class Operator(object):
         self.net = net  # pandapower net object
         self.environment = environment
 
+        # number of solved and skipped power flows of the last scenario run
+        self.solved_steps = 0
+        self.skipped_steps = 0
+        self.last_injections = None
+
+        # estimated timesteps and estimated errors of the last approximate
+        # run
+        self.estimated_steps = 0
+        self.error_bounds = {}
+
+        # sweeps per timestep of the last run with the sweep solver
+        self.convergence = None
+
+        # times the phases of the scenario runs, if enabled, e.g.
+        # self.timer = PhaseTimer(); see vpplib.phase_timer
+        self.timer = PhaseTimer(enabled=False)
+
     def operate_virtual_power_plant(self):
         """
         Info
@@ -148,6 +177,12 @@ class Operator(object):
         ----
         Raises an error since this function needs to be implemented by child classes.
 
+        The balance of operate_virtual_power_plant is taken from the power
+        matrix of the virtual power plant. Child classes need to limit
+        components with VirtualPowerPlant.limit_component and call
+        VirtualPowerPlant.update_component for other changes, e.g. a ramp
+        of a CombinedHeatAndPower.
+
         Parameters
         ----------
 
@@ -180,7 +215,9 @@ class Operator(object):
         )
 
     # %% assign values of generation/demand over time and run powerflow
-    def run_base_scenario(self, baseload):
+    def run_base_scenario(
+        self, baseload, batch=False, index=None, tolerance=None
+    ):
         """
         Info
         ----
@@ -190,7 +227,24 @@ class Operator(object):
         Parameters
         ----------
 
-        ...
+        baseload: pandas.core.frame.DataFrame
+            baseload of the buses in W. Columns are the bus indices as string.
+
+        batch: boolean
+            False: run a separate pandapower.runpp for each timestep.
+            True: solve all timesteps with a PowerFlowEngine, which builds
+            the admittance matrix once and warm starts every power flow from
+            the previous solution.
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to simulate. Default: index of the timeseries of the
+            first component
+
+        tolerance: float
+            skip the power flow of a timestep, if no p_mw and q_mvar of the
+            loads, sgens and storages differs by more than tolerance from
+            the last solved power flow, and reuse its results, see
+            skip_power_flow. None: solve every timestep.
 
         Attributes
         ----------
@@ -210,174 +264,298 @@ class Operator(object):
         Returns
         -------
 
-        ...
+        results: vpplib.result_store.ResultStore
+            power flow results of all timesteps. Can be passed to
+            extract_results and extract_single_result.
+
+            Former versions returned a dict {timestamp: {result table:
+            DataFrame}} (net_dict). The ResultStore is no dict:
+            results[timestamp]["res_bus"] and iterating over the
+            timestamps still work, but dict methods like items() and
+            values() do not, and the tables only hold the numerical
+            columns. Use results.get_result() for whole columns.
 
         """
 
-        net_dict = {}
-        index = self.virtual_power_plant.components[
-            next(iter(self.virtual_power_plant.components))
-        ].timeseries.index
-        res_loads = pd.DataFrame(
-            columns=[self.net.bus.index[self.net.bus.type == "b"]], index=index
-        )  # maybe only take buses with storage
+        if index is None:
+            index = self.virtual_power_plant.components[
+                next(iter(self.virtual_power_plant.components))
+            ].timeseries.index
+
+        components = [
+            component
+            for component in self.virtual_power_plant.components.keys()
+            if "storage" not in component
+        ]
+        topology = TopologyIndex(self.net, components)
+
+        # baseload of all timesteps in MW in the order of the baseload rows
+        baseload_values = (
+            baseload[topology.baseload_buses].loc[index].values / 1000000
+        )
 
-        for idx in tqdm(index):
-            for component in self.virtual_power_plant.components.keys():
+        results = ResultStore(index)
+        if batch:
+            engine = PowerFlowEngine(self.net, index, results=results)
+        self.reset_power_flow_counts()
 
-                if "storage" not in component:
+        timer = self.timer
+        for step, idx in enumerate(tqdm(index)):
+            timer.step(idx)
 
-                    value_for_timestamp = self.virtual_power_plant.components[
-                        component
-                    ].value_for_timestamp(str(idx))
+            with timer.phase("component values"):
+                values = self.get_component_values(components, idx)
 
-                    if math.isnan(value_for_timestamp):
-                        raise ValueError(
-                            (
-                                "The value of ",
-                                component,
-                                "at timestep ",
-                                idx,
-                                "is NaN!",
-                            )
-                        )
-
-                if component in list(self.net.sgen.name):
-
-                    self.net.sgen.p_mw[self.net.sgen.name == component] = (
-                        value_for_timestamp / -1000
-                    )  # kW to MW; negative due to generation
-
-                    if math.isnan(
-                        self.net.sgen.p_mw[self.net.sgen.name == component]
-                    ):
-                        raise ValueError(
-                            (
-                                "The value of ",
-                                component,
-                                "at timestep ",
-                                idx,
-                                "is NaN!",
-                            )
-                        )
-
-                if component in list(self.net.load.name):
-
-                    self.net.load.p_mw[self.net.load.name == component] = (
-                        value_for_timestamp / 1000
-                    )  # kW to MW
-
-            for name in self.net.load.name:
-
-                if (
-                    self.net.load.type[self.net.load.name == name].item()
-                    == "baseload"
-                ):
-
-                    self.net.load.p_mw[self.net.load.name == name] = (
-                        baseload[
-                            str(
-                                self.net.load.bus[
-                                    self.net.load.name == name
-                                ].item()
-                            )
-                        ][str(idx)]
-                        / 1000000
-                    )
-                    self.net.load.q_mvar[self.net.load.name == name] = 0
+            with timer.phase("net assignment"):
+                topology.assign_values(values)
+                topology.assign_baseload(baseload_values[step])
 
             if len(self.virtual_power_plant.buses_with_storage) > 0:
-                for bus in self.net.bus.index[self.net.bus.type == "b"]:
+                with timer.phase("storage operation"):
+                    self.operate_storages(topology, idx, include_sgen=False)
 
-                    storage_at_bus = pp.get_connected_elements(
-                        self.net, "storage", bus
-                    )
-                    sgen_at_bus = pp.get_connected_elements(
-                        self.net, "sgen", bus
+            with timer.phase("skip check"):
+                skip = self.skip_power_flow(topology, tolerance)
+
+            if skip:
+                # the results of the net are still those of the last
+                # solved power flow
+                with timer.phase("result copy"):
+                    results.record(step, self.net)
+
+            elif batch:
+                # includes the result copy
+                with timer.phase("power flow"):
+                    engine.run(step)
+
+            else:
+                with timer.phase("power flow"):
+                    pp.runpp(self.net)
+                with timer.phase("result copy"):
+                    results.record(step, self.net)
+
+        return results
+
+    def run_base_scenario_approximate(
+        self,
+        baseload,
+        index=None,
+        voltage_margin=0.01,
+        loading_margin=10.0,
+        vm_limits=(0.9, 1.1),
+    ):
+        """
+        Info
+        ----
+        Fast approximate mode of run_base_scenario for screening studies.
+        The values of the components and the baseload are assigned to the
+        net for every timestep like in run_base_scenario, but instead of a
+        power flow per timestep the net is linearized once around the mean
+        injections (vpplib.sensitivity_power_flow.SensitivityPowerFlow).
+        The results of all timesteps are estimated with the voltage
+        sensitivities, only timesteps close to a voltage or loading limit
+        are solved with pandapower.runpp.
+
+        Parameters
+        ----------
+
+        baseload: pandas.core.frame.DataFrame
+            baseload of the buses in W. Columns are the bus indices as string.
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to simulate. Default: index of the timeseries of the
+            first component
+
+        voltage_margin, loading_margin, vm_limits:
+            limits of the estimated timesteps, see SensitivityPowerFlow
+
+        Returns
+        -------
+
+        results: vpplib.result_store.ResultStore
+            estimated and solved results of all timesteps. Can be passed to
+            extract_results and extract_single_result. The estimated
+            errors of the estimation are stored in self.error_bounds, the
+            number of solved and estimated timesteps in self.solved_steps
+            and self.estimated_steps.
+
+        """
+
+        if index is None:
+            index = self.virtual_power_plant.components[
+                next(iter(self.virtual_power_plant.components))
+            ].timeseries.index
+
+        components = [
+            component
+            for component in self.virtual_power_plant.components.keys()
+            if "storage" not in component
+        ]
+        topology = TopologyIndex(self.net, components)
+
+        # baseload of all timesteps in MW in the order of the baseload rows
+        baseload_values = (
+            baseload[topology.baseload_buses].loc[index].values / 1000000
+        )
+
+        engine = SensitivityPowerFlow(
+            self.net,
+            index,
+            voltage_margin=voltage_margin,
+            loading_margin=loading_margin,
+            vm_limits=vm_limits,
+        )
+
+        timer = self.timer
+        for step, idx in enumerate(tqdm(index)):
+            timer.step(idx)
+
+            with timer.phase("component values"):
+                values = self.get_component_values(components, idx)
+
+            with timer.phase("net assignment"):
+                topology.assign_values(values)
+                topology.assign_baseload(baseload_values[step])
+
+            if len(self.virtual_power_plant.buses_with_storage) > 0:
+                with timer.phase("storage operation"):
+                    self.operate_storages(topology, idx, include_sgen=False)
+
+            with timer.phase("result copy"):
+                engine.record_injections(step)
+
+        # the estimation of all timesteps is counted for no timestep
+        timer.step(None)
+        with timer.phase("power flow"):
+            results = engine.run()
+
+        self.solved_steps = engine.solved_steps
+        self.skipped_steps = 0
+        self.estimated_steps = engine.estimated_steps
+        self.error_bounds = engine.error_bounds
+
+        return results
+
+    def run_base_scenario_chunked(
+        self,
+        baseload,
+        directory,
+        chunk_size=2976,
+        batch=False,
+        weather_directory=None,
+        tolerance=None,
+    ):
+        """
+        Info
+        ----
+        Run the base scenario for the period of the environment in chunks
+        of chunk_size timesteps, so the memory of the results does not grow
+        with the length of the period. For every chunk, the time series of the
+        components are prepared for the period of the chunk, the power flow
+        results and the timeseries of the storages are written to disk and
+        released before the next chunk is simulated.
+
+        The components carry their state across the chunk boundaries: the
+        storages keep their state of charge and carry_state() of every
+        component is called after each chunk, e.g. to keep the battery
+        charge and the trip times of the current day of the electric
+        vehicles.
+
+        Only the power flow results, the timeseries of the components and,
+        with weather_directory, the pv and wind data are bounded per
+        chunk. Inputs, which are calculated for a whole year, stay in
+        memory for the whole period: the baseload, the COP of the heat
+        pumps (HeatPump.cop), the thermal energy demand of the user
+        profiles and HeatPump.timeseries_year. Since the thermal energy
+        demand is calculated for one year, periods with heat pumps must not
+        exceed the year of the thermal energy demand.
+
+        Parameters
+        ----------
+
+        baseload: pandas.core.frame.DataFrame
+            baseload of the buses in W. Columns are the bus indices as string.
+
+        directory: string
+            directory of the results. Chunk i is saved to the subdirectory
+            "chunk_i" (zero padded).
+
+        chunk_size: int
+            number of timesteps per chunk. Default: 31 days of 15 minutes
+
+        batch: boolean
+            solve the timesteps with a PowerFlowEngine, see
+            run_base_scenario
+
+        weather_directory: string
+            directory with the datasets of vpplib.weather_store, from which
+            the weather of each chunk is read. None: the weather data of
+            the environment is used.
+
+        tolerance: float
+            skip power flows with unchanged injections, see
+            run_base_scenario. The counts of all chunks are summed up in
+            self.solved_steps and self.skipped_steps.
+
+        Returns
+        -------
+
+        paths: list
+            directories of the chunks. A chunk can be opened with
+            ResultStore.load, all chunks can be merged with
+            ResultStore.concatenate.
+
+        """
+
+        components = self.virtual_power_plant.components
+
+        environment = self.environment
+        if environment is None:
+            environment = components[next(iter(components))].environment
+
+        paths = []
+        solved_steps = 0
+        skipped_steps = 0
+        for chunk, index in enumerate(
+            environment.iter_chunks(chunk_size, weather_directory)
+        ):
+
+            for name, component in components.items():
+                if "storage" in name:
+                    # operate_storages writes the results of the chunk
+                    component.timeseries = pd.DataFrame(
+                        columns=component.timeseries.columns,
+                        index=index,
+                        dtype=float,
                     )
-                    load_at_bus = pp.get_connected_elements(
-                        self.net, "load", bus
+                else:
+                    component.prepare_time_series()
+
+            if self.virtual_power_plant.power_matrix is not None:
+                self.virtual_power_plant.build_power_matrix(index)
+
+            results = self.run_base_scenario(
+                baseload, batch=batch, index=index, tolerance=tolerance
+            )
+            solved_steps += self.solved_steps
+            skipped_steps += self.skipped_steps
+
+            path = os.path.join(directory, "chunk_%05i" % chunk)
+            results.save(path)
+            for name, component in components.items():
+                if "storage" in name:
+                    weather_store.write_dataset(
+                        component.timeseries, os.path.join(path, name)
                     )
+                component.carry_state()
+
+            paths.append(path)
+            del results
 
-                    if len(storage_at_bus) > 0:
-
-                        res_loads.loc[idx][bus] = sum(
-                            [self.net.load.loc[load].p_mw for load in load_at_bus]
-                            )
-                        + sum([self.net.sgen.loc[sgen].p_mw for sgen in sgen_at_bus])
-
-                        # set loads and sgen to 0 since they are in res_loads now
-                        # reassign values after operate_storage has been executed
-                        for l in list(load_at_bus):
-                            self.net.load.p_mw[self.net.load.index == l] = 0
-
-                        for l in list(sgen_at_bus):
-                            self.net.sgen.p_mw[self.net.sgen.index == l] = 0
-
-                        # run storage operation with residual load
-                        state_of_charge, res_load = self.virtual_power_plant.components[
-                            self.net.storage.loc[list(storage_at_bus)].name.item()
-                        ].operate_storage(
-                            res_loads.loc[idx][bus]
-                        )
-
-                        # save state of charge and residual load in timeseries
-                        self.virtual_power_plant.components[
-                            self.net.storage.loc[list(storage_at_bus)].name.item()
-                        ].timeseries["state_of_charge"][
-                            idx
-                        ] = (
-                            state_of_charge
-                        )  # state_of_charge_df[idx][bus] = state_of_charge
-                        self.virtual_power_plant.components[
-                            self.net.storage.loc[list(storage_at_bus)].name.item()
-                        ].timeseries["residual_load"][idx] = res_load
-
-                        # assign new residual load to loads and sgen depending on positive/negative values
-                        if res_load > 0:
-
-                            if len(load_at_bus) > 0:
-                                # TODO: load according to origin of demand (baseload, hp or bev)
-                                load_bus = load_at_bus.pop()
-                                self.net.load.p_mw[
-                                    self.net.load.index == load_bus
-                                ] = res_load
-
-                            else:
-                                # assign new residual load to storage
-                                storage_bus = storage_at_bus.pop()
-                                self.net.storage.p_mw[
-                                    self.net.storage.index == storage_bus
-                                ] = res_load
-
-                        else:
-
-                            if len(sgen_at_bus) > 0:
-                                # TODO: assign generation according to origin of energy (PV, wind oder CHP)
-                                gen_bus = sgen_at_bus.pop()
-                                self.net.sgen.p_mw[
-                                    self.net.sgen.index == gen_bus
-                                ] = res_load
-
-                            else:
-                                # assign new residual load to storage
-                                storage_bus = storage_at_bus.pop()
-                                self.net.storage.p_mw[
-                                    self.net.storage.index == storage_bus
-                                ] = res_load
-
-            pp.runpp(self.net)
-
-            net_dict[idx] = {}
-            net_dict[idx]["res_bus"] = self.net.res_bus
-            net_dict[idx]["res_line"] = self.net.res_line
-            net_dict[idx]["res_trafo"] = self.net.res_trafo
-            net_dict[idx]["res_load"] = self.net.res_load
-            net_dict[idx]["res_sgen"] = self.net.res_sgen
-            net_dict[idx]["res_ext_grid"] = self.net.res_ext_grid
-            net_dict[idx]["res_storage"] = self.net.res_storage
-
-        return net_dict  # , res_loads #res_loads can be returned for analyses
+        self.solved_steps = solved_steps
+        self.skipped_steps = skipped_steps
+
+        return paths
 
     # %% define a function to apply absolute values from SimBench profiles
 
@@ -394,7 +572,15 @@ class Operator(object):
     # %% assign values of generation/demand from SimBench and VPPlib
     # over time and run powerflow
 
-    def run_simbench_scenario(self, profiles):
+    def run_simbench_scenario(
+        self,
+        profiles,
+        batch=False,
+        parallel=False,
+        processes=None,
+        tolerance=None,
+        sweep=False,
+    ):
         """
         Info
         ----
@@ -404,7 +590,34 @@ class Operator(object):
         Parameters
         ----------
 
-        ...
+        profiles: dict
+            absolute SimBench profiles {(element, parameter): DataFrame}
+
+        batch: boolean
+            False: run a separate pandapower.runpp for each timestep.
+            True: solve all timesteps with a PowerFlowEngine, which builds
+            the admittance matrix once and warm starts every power flow from
+            the previous solution.
+
+        parallel: boolean
+            True: split the timesteps into chunks, which are simulated in
+            separate processes. Only possible without storages, since only
+            then the timesteps are independent of each other.
+
+        processes: int
+            number of worker processes for parallel=True.
+            Default: os.cpu_count()
+
+        tolerance: float
+            skip power flows with unchanged injections, see
+            run_base_scenario
+
+        sweep: boolean
+            True: solve all timesteps together with the backward/forward
+            sweep of a SweepPowerFlow instead of one power flow per
+            timestep. Only possible for radial nets, batch and tolerance
+            are ignored. The sweeps and the convergence of every timestep
+            are stored in self.convergence.
 
         Attributes
         ----------
@@ -414,7 +627,10 @@ class Operator(object):
         Notes
         -----
 
-        ...
+        The results of the parallel mode are identical to the serial mode.
+        Every chunk is a consecutive part of the index and is written back
+        to its positions in the ResultStore, independent of the order in
+        which the workers finish.
 
         References
         ----------
@@ -424,17 +640,22 @@ class Operator(object):
         Returns
         -------
 
-        ...
+        results: vpplib.result_store.ResultStore
+            power flow results of all timesteps. Can be passed to
+            extract_results and extract_single_result.
+
+            Former versions returned a dict {timestamp: {result table:
+            DataFrame}} (net_dict). The ResultStore is no dict:
+            results[timestamp]["res_bus"] and iterating over the
+            timestamps still work, but dict methods like items() and
+            values() do not, and the tables only hold the numerical
+            columns. Use results.get_result() for whole columns.
 
         """
 
-        net_dict = {}
         index = self.virtual_power_plant.components[
             next(iter(self.virtual_power_plant.components))
         ].timeseries.index
-        res_loads = pd.DataFrame(
-            columns=[self.net.bus.index[self.net.bus.type == "b"]], index=index
-        )  # maybe only take buses with storage
 
         # # check that all needed profiles existent
         # assert not simbench.profiles_are_missing(self.net)
@@ -452,151 +673,452 @@ class Operator(object):
                     next(iter(self.virtual_power_plant.components))
                 ].environment.time_freq)
 
-        for idx in tqdm(index):
+        if parallel:
+            return self.run_simbench_parallel(
+                profiles,
+                index,
+                batch=batch,
+                processes=processes,
+                tolerance=tolerance,
+                sweep=sweep,
+            )
 
-            # assign loadprofiles to simbench components
-            self.apply_absolute_simbench_values(profiles, idx)
+        return self.run_simbench_timesteps(
+            profiles, index, batch=batch, tolerance=tolerance, sweep=sweep
+        )
+
+    def run_simbench_timesteps(
+        self, profiles, index, batch=False, tolerance=None, sweep=False
+    ):
+        """
+        Info
+        ----
+        Assign the SimBench profiles and the values of the components to the
+        net and run the power flow for every timestep in index.
+
+        Parameters
+        ----------
+
+        profiles: dict
+            absolute SimBench profiles {(element, parameter): DataFrame}
+            with a DatetimeIndex
 
-            for component in self.virtual_power_plant.components.keys():
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to simulate
 
-                if "ees" not in component:
-                    if "tes" not in component:
+        batch: boolean
+            solve the timesteps with a PowerFlowEngine
 
-                        value_for_timestamp = self.virtual_power_plant.components[
-                            component
-                        ].value_for_timestamp(str(idx))
+        tolerance: float
+            skip power flows with unchanged injections, see
+            run_base_scenario
 
-                        if math.isnan(value_for_timestamp):
-                            raise ValueError(
-                                (
-                                    "The value of ",
-                                    component,
-                                    "at timestep ",
-                                    idx,
-                                    "is NaN!",
-                                )
-                            )
+        sweep: boolean
+            solve all timesteps together with a SweepPowerFlow, see
+            run_simbench_scenario
 
-                if component in list(self.net.sgen.name):
+        Returns
+        -------
 
-                    self.net.sgen.p_mw[self.net.sgen.name == component] = (
-                        value_for_timestamp / -1000
-                    )  # kW to MW; negative due to generation
+        results: vpplib.result_store.ResultStore
 
-                    self.net.sgen.q_mvar[self.net.sgen.name == component] = 0
+        """
 
-                    if math.isnan(
-                        self.net.sgen.p_mw[self.net.sgen.name == component]
-                    ):
-                        raise ValueError(
-                            (
-                                "The value of ",
-                                component,
-                                "at timestep ",
-                                idx,
-                                "is NaN!",
-                            )
-                        )
+        components = [
+            component
+            for component in self.virtual_power_plant.components.keys()
+            if "ees" not in component and "tes" not in component
+        ]
+        topology = TopologyIndex(self.net, components)
 
-                if component in list(self.net.load.name):
+        results = ResultStore(index)
+        if sweep:
+            engine = SweepPowerFlow(self.net, index, results=results)
+        elif batch:
+            engine = PowerFlowEngine(self.net, index, results=results)
+        self.reset_power_flow_counts()
 
-                    self.net.load.p_mw[self.net.load.name == component] = (
-                        value_for_timestamp / 1000
-                    )  # kW to MW
+        timer = self.timer
+        for step, idx in enumerate(tqdm(index)):
+            timer.step(idx)
 
-                    self.net.load.q_mvar[self.net.load.name == component] = 0
+            # assign loadprofiles to simbench components
+            with timer.phase("profiles"):
+                self.apply_absolute_simbench_values(profiles, idx)
+
+            with timer.phase("component values"):
+                values = self.get_component_values(components, idx)
+
+            with timer.phase("net assignment"):
+                topology.assign_values(values, reset_q=True)
 
             if len(self.virtual_power_plant.buses_with_storage) > 0:
-                for bus in self.net.bus.index[self.net.bus.type == "b"]:
+                with timer.phase("storage operation"):
+                    self.operate_storages(topology, idx, include_sgen=True)
+
+            if sweep:
+                # all timesteps are solved together after the loop
+                with timer.phase("result copy"):
+                    engine.record_injections(step)
+                continue
+
+            with timer.phase("skip check"):
+                skip = self.skip_power_flow(topology, tolerance)
+
+            if skip:
+                # the results of the net are still those of the last
+                # solved power flow
+                with timer.phase("result copy"):
+                    results.record(step, self.net)
+
+            elif batch:
+                # includes the result copy
+                with timer.phase("power flow"):
+                    engine.run(step)
+
+            else:
+                with timer.phase("power flow"):
+                    pp.runpp(self.net)
+                with timer.phase("result copy"):
+                    results.record(step, self.net)
+
+        if sweep:
+            # the sweeps of all timesteps are counted for no timestep
+            timer.step(None)
+            with timer.phase("power flow"):
+                engine.run()
+            self.solved_steps = len(index)
+            self.convergence = pd.DataFrame(
+                {
+                    "iterations": engine.iterations,
+                    "converged": engine.converged,
+                },
+                index=index,
+            )
 
-                    storage_at_bus = pp.get_connected_elements(
-                        self.net, "storage", bus
-                    )
-                    sgen_at_bus = pp.get_connected_elements(
-                        self.net, "sgen", bus
-                    )
-                    load_at_bus = pp.get_connected_elements(
-                        self.net, "load", bus
+        return results
+
+    def skip_power_flow(self, topology, tolerance):
+        """
+        Info
+        ----
+        Decide whether the power flow of the current timestep can be
+        skipped. This is the case, if no injection of the net differs by
+        more than tolerance from the injections of the last solved power
+        flow, e.g. at night, when PV is zero and heat pumps are off. The
+        results tables of the net then still hold a valid solution.
+
+        The solved and skipped power flows are counted in
+        self.solved_steps and self.skipped_steps.
+
+        Parameters
+        ----------
+
+        topology: vpplib.topology_index.TopologyIndex
+            lookup of the net, whose injections are compared
+
+        tolerance: float
+            maximum absolute difference of p_mw and q_mvar in MW and Mvar.
+            None: never skip a power flow.
+
+        Returns
+        -------
+
+        skip: boolean
+
+        """
+
+        if tolerance is not None:
+            injections = topology.get_injections()
+
+            if self.last_injections is not None and np.all(
+                np.abs(injections - self.last_injections) <= tolerance
+            ):
+                self.skipped_steps += 1
+                return True
+
+            self.last_injections = injections
+
+        self.solved_steps += 1
+
+        return False
+
+    def reset_power_flow_counts(self):
+        """
+        Info
+        ----
+        Reset the counts of skip_power_flow at the beginning of a run.
+
+        """
+
+        self.solved_steps = 0
+        self.skipped_steps = 0
+        self.last_injections = None
+
+    def get_component_values(self, components, idx):
+        """
+        Info
+        ----
+        Return the values of the components at timestamp idx.
+
+        Parameters
+        ----------
+
+        components: list
+            names of the components
+
+        idx: pandas._libs.tslibs.timestamps.Timestamp
+            timestamp
+
+        Returns
+        -------
+
+        values: numpy.ndarray
+            values in kW in the order of components
+
+        """
+
+        if self.timer.enabled:
+            values = self.get_component_values_timed(components, idx)
+        else:
+            values = np.array(
+                [
+                    self.virtual_power_plant.components[
+                        component
+                    ].value_for_timestamp(str(idx))
+                    for component in components
+                ],
+                dtype=float,
+            )
+
+        for component, value in zip(components, values):
+            if math.isnan(value):
+                raise ValueError(
+                    (
+                        "The value of ",
+                        component,
+                        "at timestep ",
+                        idx,
+                        "is NaN!",
                     )
+                )
+
+        return values
+
+    def get_component_values_timed(self, components, idx):
+        """
+        Info
+        ----
+        get_component_values with one phase "component: <class name>" of
+        self.timer per component type.
+
+        """
+
+        values = np.empty(len(components))
+        for i, component in enumerate(components):
+            component = self.virtual_power_plant.components[component]
+            with self.timer.phase(
+                "component: " + type(component).__name__
+            ):
+                values[i] = component.value_for_timestamp(str(idx))
+
+        return values
+
+    def operate_storages(self, topology, idx, include_sgen=True):
+        """
+        Info
+        ----
+        Operate the storages of the net with the residual load of their bus
+        and assign the new residual load to the elements of the bus. The
+        residual loads of all buses are one sparse matrix product with the
+        incidence matrices of the virtual power plant.
+
+        Parameters
+        ----------
+
+        topology: vpplib.topology_index.TopologyIndex
+            lookup of the elements connected to the buses
+
+        idx: pandas._libs.tslibs.timestamps.Timestamp
+            timestamp
+
+        include_sgen: boolean
+            add the generation of the sgens at the bus to the residual load.
+            run_base_scenario only takes the loads into account.
+
+        """
+
+        load = self.net.load
+        sgen = self.net.sgen
+        storage = self.net.storage
+
+        vpp = self.virtual_power_plant
+        if vpp.incidence_net is not self.net:
+            vpp.build_incidence_matrix(self.net)
+
+        # residual load of all buses
+        residual_loads = vpp.element_incidence["load"] @ load.p_mw.values
+        if include_sgen:
+            residual_loads += vpp.element_incidence["sgen"] @ sgen.p_mw.values
+        buses = self.net.bus.index
+
+        for (
+            bus,
+            storage_name,
+            storage_row,
+            load_rows,
+            sgen_rows,
+        ) in topology.storage_buses:
+
+            residual_load = residual_loads[buses.get_loc(bus)]
+
+            # set loads and sgen to 0 since they are in the residual load now
+            # reassign values after operate_storage has been executed
+            if len(load_rows) > 0:
+                load.iloc[load_rows, topology.load_p] = 0
+
+            if len(sgen_rows) > 0:
+                sgen.iloc[sgen_rows, topology.sgen_p] = 0
+
+            # run storage operation with residual load
+            component = self.virtual_power_plant.components[storage_name]
+            state_of_charge, res_load = component.operate_storage(
+                residual_load
+            )
+
+            # save state of charge and residual load in timeseries
+            component.timeseries.at[idx, "state_of_charge"] = state_of_charge
+            component.timeseries.at[idx, "residual_load"] = res_load
+            if vpp.power_matrix is not None:
+                vpp.update_component(storage_name, idx)
+
+            # assign new residual load to loads and sgen depending on positive/negative values
+            if res_load > 0:
+
+                if len(load_rows) > 0:
+                    # TODO: load according to origin of demand (baseload, hp or bev)
+                    load.iloc[load_rows[0], topology.load_p] = res_load
+
+                else:
+                    # assign new residual load to storage
+                    storage.iloc[storage_row, topology.storage_p] = res_load
+
+            else:
+
+                if len(sgen_rows) > 0:
+                    # TODO: assign generation according to origin of energy (PV, wind oder CHP)
+                    sgen.iloc[sgen_rows[0], topology.sgen_p] = res_load
+
+                else:
+                    # assign new residual load to storage
+                    storage.iloc[storage_row, topology.storage_p] = res_load
+
+    def run_simbench_parallel(self, profiles, index, batch=False,
+                              processes=None, tolerance=None, sweep=False):
+        """
+        Info
+        ----
+        Split index into consecutive chunks and simulate each chunk with
+        run_simbench_timesteps in a separate worker process. Every worker
+        gets its own deep copy of the net. The results of the chunks are
+        merged into one ResultStore in the order of index.
+
+        Parameters
+        ----------
+
+        profiles: dict
+            absolute SimBench profiles {(element, parameter): DataFrame}
+            with a DatetimeIndex
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to simulate
+
+        batch: boolean
+            solve the timesteps of each chunk with a PowerFlowEngine
+
+        processes: int
+            number of worker processes. Default: os.cpu_count()
 
-                    if len(storage_at_bus) > 0:
-
-                        res_loads.loc[idx][bus] = sum(
-                            self.net.load.loc[load_at_bus].p_mw
-                        ) + sum(self.net.sgen.loc[sgen_at_bus].p_mw)
-
-                        # set loads and sgen to 0 since they are in res_loads now
-                        # reassign values after operate_storage has been executed
-                        for l in list(load_at_bus):
-                            self.net.load.p_mw[self.net.load.index == l] = 0
-
-                        for l in list(sgen_at_bus):
-                            self.net.sgen.p_mw[self.net.sgen.index == l] = 0
-
-                        # run storage operation with residual load
-                        state_of_charge, res_load = self.virtual_power_plant.components[
-                            self.net.storage.loc[storage_at_bus].name.item()
-                        ].operate_storage(
-                            res_loads.loc[idx][bus]
-                        )
-
-                        # save state of charge and residual load in timeseries
-                        self.virtual_power_plant.components[
-                            self.net.storage.loc[storage_at_bus].name.item()
-                        ].timeseries["state_of_charge"][
-                            idx
-                        ] = (
-                            state_of_charge
-                        )  # state_of_charge_df[idx][bus] = state_of_charge
-                        self.virtual_power_plant.components[
-                            self.net.storage.loc[storage_at_bus].name.item()
-                        ].timeseries["residual_load"][idx] = res_load
-
-                        # assign new residual load to loads and sgen depending on positive/negative values
-                        if res_load > 0:
-
-                            if len(load_at_bus) > 0:
-                                # TODO: load according to origin of demand (baseload, hp or bev)
-                                load_bus = load_at_bus.pop()
-                                self.net.load.p_mw[
-                                    self.net.load.index == load_bus
-                                ] = res_load
-
-                            else:
-                                # assign new residual load to storage
-                                storage_bus = storage_at_bus.pop()
-                                self.net.storage.p_mw[
-                                    self.net.storage.index == storage_bus
-                                ] = res_load
-
-                        else:
-
-                            if len(sgen_at_bus) > 0:
-                                # TODO: assign generation according to origin of energy (PV, wind oder CHP)
-                                gen_bus = sgen_at_bus.pop()
-                                self.net.sgen.p_mw[
-                                    self.net.sgen.index == gen_bus
-                                ] = res_load
-
-                            else:
-                                # assign new residual load to storage
-                                storage_bus = storage_at_bus.pop()
-                                self.net.storage.p_mw[
-                                    self.net.storage.index == storage_bus
-                                ] = res_load
-
-            pp.runpp(self.net)
-
-            net_dict[idx] = {}
-            net_dict[idx]["res_bus"] = self.net.res_bus
-            net_dict[idx]["res_line"] = self.net.res_line
-            net_dict[idx]["res_trafo"] = self.net.res_trafo
-            net_dict[idx]["res_load"] = self.net.res_load
-            net_dict[idx]["res_sgen"] = self.net.res_sgen
-            net_dict[idx]["res_ext_grid"] = self.net.res_ext_grid
-            net_dict[idx]["res_storage"] = self.net.res_storage
-
-        return net_dict  # , res_loads #res_loads can be returned for analyses
+        tolerance: float
+            skip power flows with unchanged injections, see
+            run_base_scenario. The counts of the chunks are summed up.
+
+        sweep: boolean
+            solve the timesteps of each chunk with a SweepPowerFlow, see
+            run_simbench_scenario
+
+        Returns
+        -------
+
+        results: vpplib.result_store.ResultStore
+
+        """
+
+        if len(self.virtual_power_plant.buses_with_storage) > 0:
+            raise ValueError(
+                "Parallel simulation is only possible without storages, "
+                + "since the operation of storages depends on the "
+                + "previous timesteps!"
+            )
+
+        if processes is None:
+            processes = os.cpu_count()
+
+        chunks = [
+            chunk
+            for chunk in np.array_split(np.arange(len(index)), processes)
+            if len(chunk) > 0
+        ]
+
+        tasks = []
+        for chunk in chunks:
+            operator = copy.copy(self)
+            operator.net = copy.deepcopy(self.net)
+            operator.timer = PhaseTimer(
+                enabled=self.timer.enabled, trace=self.timer.trace
+            )
+            # only pass the profile values of the chunk to the worker
+            chunk_profiles = {
+                elm_param: (
+                    profiles[elm_param].loc[index[chunk]]
+                    if profiles[elm_param].shape[1]
+                    else profiles[elm_param]
+                )
+                for elm_param in profiles.keys()
+            }
+            tasks.append(
+                (
+                    operator,
+                    chunk_profiles,
+                    index[chunk],
+                    batch,
+                    tolerance,
+                    sweep,
+                )
+            )
+
+        results = ResultStore(index)
+        self.reset_power_flow_counts()
+        convergence = []
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            # map returns the chunks in the order of submission
+            for chunk, (
+                chunk_results,
+                solved_steps,
+                skipped_steps,
+                chunk_convergence,
+                chunk_timer,
+            ) in zip(chunks, executor.map(_run_simbench_chunk, tasks)):
+                results.insert(chunk, chunk_results)
+                self.solved_steps += solved_steps
+                self.skipped_steps += skipped_steps
+                convergence.append(chunk_convergence)
+                self.timer.merge(chunk_timer)
+
+        if sweep:
+            self.convergence = pd.concat(convergence)
+
+        return results
 
 
 # %% extract all results from pandas powerflow
@@ -611,7 +1133,11 @@ class Operator(object):
         Parameters
         ----------
 
-        ...
+        net_dict: vpplib.result_store.ResultStore or dict
+            results of run_base_scenario or run_simbench_scenario. The
+            DataFrames of a ResultStore are views on its result arrays.
+            A dict {timestamp: {result table: DataFrame}} is still
+            supported.
 
         Attributes
         ----------
@@ -635,6 +1161,9 @@ class Operator(object):
 
         """
 
+        if isinstance(net_dict, ResultStore):
+            return net_dict.extract_results()
+
         # Create DataFrames for later export
         ext_grid = pd.DataFrame()
         line_loading_percent = pd.DataFrame()
@@ -772,6 +1301,9 @@ class Operator(object):
 
         """
 
+        if isinstance(net_dict, ResultStore):
+            return net_dict.get_result(res, value)
+
         single_result = pd.DataFrame()
 
         for idx in net_dict.keys():
@@ -912,3 +1444,28 @@ class Operator(object):
                 self.virtual_power_plant.components[comp].timeseries.plot(
                     figsize=(16, 9), title=comp
                 )
+
+
+def _run_simbench_chunk(task):
+
+    """
+    Info
+    ----
+    Worker function of Operator.run_simbench_parallel. It needs to be
+    defined on module level to be picklable.
+
+    """
+
+    operator, profiles, index, batch, tolerance, sweep = task
+
+    results = operator.run_simbench_timesteps(
+        profiles, index, batch=batch, tolerance=tolerance, sweep=sweep
+    )
+
+    return (
+        results,
+        operator.solved_steps,
+        operator.skipped_steps,
+        operator.convergence,
+        operator.timer,
+    )
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the PhaseTimer class.
+The PhaseTimer measures, where a scenario run of the Operator spends its
+time, e.g. in the value lookups of the components, the assignment of the
+values to the net, the storage operation, the power flow or the copying of
+the results. The phases are timed with the monotonic time.perf_counter()
+and summed up per phase and per timestep. Optionally, every phase is kept
+as event of a trace file, which can be opened in chrome://tracing or
+https://ui.perfetto.dev.
+
+A disabled PhaseTimer returns the same empty context manager for every
+phase, so the instrumented code costs one method call per phase.
+
+"""
+
+import contextlib
+import json
+import time
+import pandas as pd
+
+
+# context manager of the phases of a disabled PhaseTimer
+_no_phase = contextlib.nullcontext()
+
+
+class PhaseTimer(object):
+    def __init__(self, enabled=True, trace=False):
+        """
+        Info
+        ----
+        Create a timer. The Operator holds a disabled timer by default,
+        assign an enabled one to time its scenario runs:
+
+            operator.timer = PhaseTimer()
+            operator.run_base_scenario(baseload)
+            operator.timer.summary()
+
+        Parameters
+        ----------
+        enabled: boolean
+            False: do not time anything
+
+        trace: boolean
+            keep every phase as event for write_trace()
+
+        Attributes
+        ----------
+        totals: dict
+            {phase: [calls, seconds, maximum seconds of one call]}
+
+        step_times: dict
+            {(timestep, phase): seconds}
+
+        events: list
+            (phase, timestep, start, seconds) of every phase, if trace is
+            True
+
+        """
+
+        self.enabled = enabled
+        self.trace = trace
+        self.current_step = None
+        self.origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+
+        """
+        Info
+        ----
+        Remove all measured times.
+
+        """
+
+        self.totals = {}
+        self.step_times = {}
+        self.events = []
+
+    def step(self, timestep):
+
+        """
+        Info
+        ----
+        Set the timestep, which the following phases are counted for.
+
+        """
+
+        if self.enabled:
+            self.current_step = timestep
+
+    def phase(self, name):
+
+        """
+        Info
+        ----
+        Return a context manager, which times the code in its block as
+        phase name of the current timestep:
+
+            with timer.phase("power flow"):
+                pp.runpp(net)
+
+        """
+
+        if not self.enabled:
+            return _no_phase
+
+        return _Phase(self, name)
+
+    def add(self, name, start, seconds):
+
+        """
+        Info
+        ----
+        Count a measured phase.
+
+        Parameters
+        ----------
+        name: string
+            name of the phase
+
+        start: float
+            time.perf_counter() at the start of the phase
+
+        seconds: float
+            duration of the phase
+
+        """
+
+        total = self.totals.get(name)
+        if total is None:
+            self.totals[name] = [1, seconds, seconds]
+        else:
+            total[0] += 1
+            total[1] += seconds
+            if seconds > total[2]:
+                total[2] = seconds
+
+        key = (self.current_step, name)
+        self.step_times[key] = self.step_times.get(key, 0.0) + seconds
+
+        if self.trace:
+            self.events.append((name, self.current_step, start, seconds))
+
+    def merge(self, other):
+
+        """
+        Info
+        ----
+        Add the measured times of another PhaseTimer, e.g. of a worker
+        process of Operator.run_simbench_parallel.
+
+        """
+
+        for name, (calls, seconds, maximum) in other.totals.items():
+            total = self.totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += calls
+            total[1] += seconds
+            total[2] = max(total[2], maximum)
+
+        for key, seconds in other.step_times.items():
+            self.step_times[key] = self.step_times.get(key, 0.0) + seconds
+
+        # the events of other are relative to its own origin
+        shift = other.origin - self.origin
+        self.events.extend(
+            (name, step, start + shift, seconds)
+            for name, step, start, seconds in other.events
+        )
+
+    def summary(self):
+
+        """
+        Info
+        ----
+        Return the summary table of all phases, sorted by their total time.
+
+        Returns
+        -------
+        summary: pandas.core.frame.DataFrame
+            columns calls, total_s, mean_ms, max_ms and share_percent.
+            The share is relative to the sum of all phases except the
+            component types ("component: <class name>"), which are part of
+            the phase "component values".
+
+        """
+
+        summary = pd.DataFrame(
+            [
+                (name, calls, seconds, seconds / calls * 1000, maximum * 1000)
+                for name, (calls, seconds, maximum) in self.totals.items()
+            ],
+            columns=["phase", "calls", "total_s", "mean_ms", "max_ms"],
+        ).set_index("phase")
+
+        top_level = [name for name in summary.index if ": " not in name]
+        summary["share_percent"] = (
+            summary.total_s / summary.total_s[top_level].sum() * 100
+        )
+
+        return summary.sort_values("total_s", ascending=False)
+
+    def get_step_times(self, nested=False):
+
+        """
+        Info
+        ----
+        Return the time of every phase in every timestep. Like in
+        summary(), the component types ("component: <class name>") are
+        part of the phase "component values", so they are returned in a
+        separate table and the sum of a row is the time of the timestep.
+
+        Parameters
+        ----------
+        nested: boolean
+            False: the top level phases
+            True: the component types
+
+        Returns
+        -------
+        step_times: pandas.core.frame.DataFrame
+            seconds, timesteps x phases
+
+        """
+
+        step_times = {
+            key: seconds
+            for key, seconds in self.step_times.items()
+            if (": " in key[1]) == nested
+        }
+
+        if len(step_times) == 0:
+            return pd.DataFrame()
+
+        return pd.Series(step_times).unstack(fill_value=0.0)
+
+    def write_trace(self, file):
+
+        """
+        Info
+        ----
+        Write the events of all phases to a trace file in the Trace Event
+        Format, which can be opened in chrome://tracing or
+        https://ui.perfetto.dev. The timer needs to be created with
+        trace=True.
+
+        Parameters
+        ----------
+        file: string
+            path of the json file
+
+        """
+
+        events = [
+            {
+                "name": name,
+                "cat": name.split(": ")[0],
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": seconds * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {"timestep": str(step)},
+            }
+            for name, step, start, seconds in self.events
+        ]
+
+        with open(file, "w") as f:
+            json.dump({"traceEvents": events}, f)
+
+
+class _Phase(object):
+
+    """
+    Info
+    ----
+    Context manager of one phase of an enabled PhaseTimer.
+
+    """
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.timer.add(self.name, self.start, end - self.start)
+        return False
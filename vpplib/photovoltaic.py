@@ -7,6 +7,7 @@ This file contains the basic functionalities of the Photovoltaic class.
 """
 
 from .component import Component
+from . import model_cache
 
 import pandas as pd
 import random
@@ -17,6 +18,7 @@ import pvlib
 from pvlib.pvsystem import PVSystem
 from pvlib.location import Location
 from pvlib.modelchain import ModelChain
+from pvlib.modelchain import ModelChainResult
 from pvlib.temperature import TEMPERATURE_MODEL_PARAMETERS
 
 
@@ -139,14 +141,22 @@ class Photovoltaic(Component):
         if len(self.environment.pv_data) == 0:
             raise ValueError("self.environment.pv_data is empty.")
 
-        self.modelchain.run_model(
-            weather=self.environment.pv_data.loc[
-                self.environment.start: self.environment.end
-            ],
+        weather = self.environment.pv_data.loc[
+            self.environment.start: self.environment.end
+        ]
+
+        # systems with identical parameters and weather share one model run
+        self.modelchain.results = ModelChainResult()
+        ac = model_cache.get(
+            self.get_cache_key(weather), self.run_model, weather
         )
 
-        timeseries = pd.DataFrame(
-            self.modelchain.results.ac / 1000)  # convert to kW
+        if self.modelchain.results.ac is None:
+            # cached result: only the ac power is set, the other results of
+            # the ModelChain need model_cache.enabled = False
+            self.modelchain.results.ac = ac.copy()
+
+        timeseries = pd.DataFrame(ac / 1000)  # convert to kW
         timeseries.rename(columns={0: self.identifier}, inplace=True)
         timeseries.set_index(timeseries.index, inplace=True)
         timeseries.index = pd.to_datetime(timeseries.index)
@@ -155,6 +165,47 @@ class Photovoltaic(Component):
 
         return timeseries
 
+    def run_model(self, weather):
+
+        """
+        Info
+        ----
+        Run the ModelChain for the weather data and return a copy of the
+        AC power in W for the cache.
+
+        """
+
+        self.modelchain.run_model(weather=weather)
+
+        return self.modelchain.results.ac.copy()
+
+    def get_cache_key(self, weather):
+
+        """
+        Info
+        ----
+        Return the fingerprint of the system, location and weather data,
+        which determine the result of run_model.
+
+        """
+
+        return model_cache.fingerprint(
+            "Photovoltaic",
+            pvlib.__version__,
+            self.module,
+            self.inverter,
+            self.temperature_model_parameters,
+            self.surface_tilt,
+            self.surface_azimuth,
+            self.modules_per_string,
+            self.strings_per_inverter,
+            self.location.latitude,
+            self.location.longitude,
+            self.location.altitude,
+            str(self.location.tz),
+            weather,
+        )
+
     def reset_time_series(self):
 
         self.timeseries = None
@@ -186,24 +237,17 @@ class Photovoltaic(Component):
     # Balancing Functions
     # ===================================================================================
 
-    # Override balancing function from super class.
-    def value_for_timestamp(self, timestamp):
-
-        if type(timestamp) == int:
+    # Values of the balancing functions of the super class.
+    def get_value_series(self):
 
-            return (
-                self.timeseries[self.identifier].iloc[timestamp] * self.limit
-            )
-
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the AC power in kW for value_for_timestamp.
 
-            return self.timeseries[self.identifier].loc[timestamp] * self.limit
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string. "
-                + "Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries[self.identifier]
 
     def observations_for_timestamp(self, timestamp):
         """
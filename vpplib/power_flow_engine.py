@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the PowerFlowEngine class.
+The PowerFlowEngine solves the power flow of one pandapower net for a whole
+series of timesteps. The admittance matrix and the bus/element mapping are
+built in the first power flow and recycled for all following timesteps,
+which are warm started from the previous solution.
+
+"""
+
+import pandapower as pp
+
+from .result_store import ResultStore
+
+
+class PowerFlowEngine(object):
+    def __init__(self, net, index, recycle=True, results=None, **kwargs):
+        """
+        Info
+        ----
+        The engine takes the pandapower net and the time index of the
+        simulation. The loads, sgens and storages of the net are changed
+        from outside between the calls of run(). Only their p and q values
+        may change, the topology of the net must not be changed during
+        the simulation.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net object which is solved for every timestep
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the simulation
+
+        recycle: boolean
+            True: reuse the internal ppc and Ybus of the first power flow
+            and only update the bus injections.
+            False: run a complete power flow for each timestep, warm started
+            from the results of the previous timestep.
+
+        results: vpplib.result_store.ResultStore
+            store the results are written to. A new ResultStore for index is
+            created if None.
+
+        kwargs:
+            further keyword arguments, which are passed to pandapower.runpp
+
+        Attributes
+        ----------
+        results: vpplib.result_store.ResultStore
+            one array of shape (timesteps, elements) per column of the
+            result tables, allocated after the first power flow and filled
+            in place.
+
+        """
+
+        self.net = net
+        self.index = index
+        self.kwargs = kwargs
+        if recycle:
+            self.recycle = dict(bus_pq=True, trafo=False, gen=False)
+        else:
+            self.recycle = None
+
+        if results is None:
+            results = ResultStore(index)
+        self.results = results
+        self.is_initialized = False
+
+    def initialize(self):
+
+        """
+        Info
+        ----
+        Run the first power flow. This builds the internal ppc, the Ybus
+        and the lookups from net elements to ppc buses.
+
+        """
+
+        if self.recycle is not None:
+            pp.runpp(self.net, recycle=self.recycle, **self.kwargs)
+        else:
+            pp.runpp(self.net, **self.kwargs)
+
+        self.is_initialized = True
+
+    def run(self, step):
+
+        """
+        Info
+        ----
+        Solve the power flow of the current state of the net and write the
+        results to row "step" of the result arrays.
+
+        Parameters
+        ----------
+        step: int
+            position of the timestep in self.index
+
+        """
+
+        if not self.is_initialized:
+            self.initialize()
+
+        elif self.recycle is not None:
+            pp.runpp(self.net, recycle=self.recycle, **self.kwargs)
+
+        else:
+            pp.runpp(self.net, **dict(self.kwargs, init="results"))
+
+        self.results.record(step, self.net)
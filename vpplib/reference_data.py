@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains a process-wide cache for the reference data in ./input,
+e.g. weather data, temperatures and the SigLinDe parameters.
+Every file is parsed once per process. UserProfile and Environment get
+copies of the cached DataFrames, so they can be changed without changing
+the cache. This way, creating thousands of user profiles does not parse
+the csv files thousands of times.
+
+Optionally, the parsed DataFrames are stored as pickle in a cache
+directory, which is much faster to load than parsing the csv in a new
+process. This is switched off by default. Since unpickling can execute
+code, the directory has to be chosen explicitly and must not be writeable
+by others.
+
+"""
+
+import hashlib
+import os
+import pandas as pd
+
+
+# {(path, options): (mtime, DataFrame)}
+_cache = {}
+
+# default of read_csv(binary=None), e.g. reference_data.use_binary = True
+# to use the pickles for all reference data of UserProfile and Environment
+use_binary = False
+
+# directory of the pickles of read_csv(binary=True), needs to be set before
+# the pickles are used, e.g. reference_data.directory = "./cache"
+directory = None
+
+
+def read_csv(file, parse_index=False, utc=False, binary=None, **kwargs):
+
+    """
+    Info
+    ----
+    Return the content of a csv file as DataFrame. The file is only parsed
+    if it is not in the cache yet or was modified since it has been cached.
+
+    Every caller gets its own copy of the cached DataFrame, which can be
+    changed in place.
+
+    Parameters
+    ----------
+    file: string
+        path of the csv file
+
+    parse_index: boolean
+        convert the index to a DatetimeIndex
+
+    utc: boolean
+        convert the index to a DatetimeIndex in UTC
+
+    binary: boolean
+        True: store the parsed DataFrame as pickle in
+        reference_data.directory and read the pickle instead of the csv,
+        as long as the pickle is newer than the csv. The directory needs
+        to be set first.
+        None: use the module attribute reference_data.use_binary
+
+    kwargs:
+        further keyword arguments, which are passed to pandas.read_csv
+
+    Returns
+    -------
+    df: pandas.core.frame.DataFrame
+
+    """
+
+    path = os.path.abspath(file)
+    mtime = os.path.getmtime(path)
+    key = (path, parse_index, utc, repr(sorted(kwargs.items())))
+
+    if binary is None:
+        binary = use_binary
+
+    if binary and directory is None:
+        raise ValueError(
+            "Set reference_data.directory to a directory, which is only "
+            + "writeable by you, to use the pickles of the reference data!"
+        )
+
+    if key not in _cache or _cache[key][0] != mtime:
+
+        if binary:
+            df = read_binary(path, mtime, key, parse_index, utc, **kwargs)
+        else:
+            df = parse_csv(path, parse_index, utc, **kwargs)
+
+        _cache[key] = (mtime, df)
+
+    return _cache[key][1].copy()
+
+
+def parse_csv(path, parse_index=False, utc=False, **kwargs):
+
+    """
+    Info
+    ----
+    Read the csv file and convert the index if requested.
+
+    """
+
+    df = pd.read_csv(path, **kwargs)
+    if parse_index or utc:
+        df.index = pd.to_datetime(df.index, utc=utc)
+
+    return df
+
+
+def read_binary(path, mtime, key, parse_index=False, utc=False, **kwargs):
+
+    """
+    Info
+    ----
+    Read the pickle of the parsed csv file. If the pickle does not exist or
+    is older than the csv file, the csv is parsed and the pickle is
+    (re)written. The options of the parsing are stored with the DataFrame,
+    so a pickle of other options is not used. If the pickle can not be
+    written, e.g. since the directory is read-only, the parsed csv is
+    returned anyway.
+
+    """
+
+    binary_file = binary_path(path)
+
+    if (
+        os.path.isfile(binary_file)
+        and os.path.getmtime(binary_file) >= mtime
+    ):
+        stored_key, df = pd.read_pickle(binary_file)
+        if stored_key == key:
+            return df
+
+    df = parse_csv(path, parse_index, utc, **kwargs)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        pd.to_pickle((key, df), binary_file)
+    except OSError:
+        pass
+
+    return df
+
+
+def binary_path(file):
+
+    """
+    Info
+    ----
+    Return the path of the pickle of a csv file in directory. The name
+    contains a hash of the path of the csv, so csv files with the same
+    name in different directories do not share a pickle.
+
+    """
+
+    path = os.path.abspath(file)
+    name = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(path.encode()).hexdigest()[:12]
+
+    return os.path.join(directory, name + "_" + digest + ".pkl")
+
+
+def clear_cache():
+
+    """
+    Info
+    ----
+    Remove all DataFrames from the cache.
+
+    """
+
+    _cache.clear()
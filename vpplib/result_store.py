@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the ResultStore class.
+The ResultStore holds the power flow results of a scenario run. For every
+column of the pandapower result tables one numpy array of the shape
+(timesteps, elements) is allocated once and filled in place during the run.
+The results are handed out as DataFrames on top of these arrays without
+copying the data.
+
+A ResultStore can be saved to a directory with one .npy file per array and
+loaded memory-mapped, e.g. to keep only one chunk of a long simulation in
+memory (see Operator.run_base_scenario_chunked).
+
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class ResultStore(object):
+
+    # elements of the net, whose result tables are stored
+    elements = ("bus", "line", "trafo", "load", "sgen", "ext_grid", "storage")
+
+    def __init__(self, index):
+        """
+        Info
+        ----
+        The ResultStore takes the time index of the scenario. The arrays
+        are allocated with the first call of record(), since their shape
+        depends on the result tables of the net.
+
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the scenario
+
+        Attributes
+        ----------
+        arrays: dict
+            {"res_" + element: {column: numpy.ndarray}}
+
+        element_index: dict
+            {element: index of the elements in the net} to assign the
+            columns of the arrays to the elements of the net.
+
+        names: dict
+            {element: names of the elements in the net} used as column
+            names of the returned DataFrames.
+
+        """
+
+        self.index = pd.to_datetime(index)
+        self.arrays = {}
+        self.element_index = {}
+        self.names = {}
+
+    def allocate(self, net):
+
+        """
+        Info
+        ----
+        Allocate one array per column of the result tables of the net.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net after the first power flow
+
+        """
+
+        for element in self.elements:
+            table = net["res_" + element]
+            self.element_index[element] = table.index
+
+            names = net[element].name.reindex(table.index)
+            if names.isna().all():
+                self.names[element] = table.index
+            else:
+                self.names[element] = pd.Index(names)
+
+            self.arrays["res_" + element] = {
+                column: np.full((len(self.index), len(table)), np.nan)
+                for column in table.select_dtypes(include="number").columns
+            }
+
+    def record(self, step, net):
+
+        """
+        Info
+        ----
+        Copy the values of the result tables of the net to row "step" of
+        the result arrays.
+
+        Parameters
+        ----------
+        step: int
+            position of the timestep in self.index
+
+        net: pandapower.auxiliary.pandapowerNet
+            net after the power flow of the timestep
+
+        """
+
+        if len(self.arrays) == 0:
+            self.allocate(net)
+
+        for res, columns in self.arrays.items():
+            table = net[res]
+            for column, values in columns.items():
+                values[step] = table[column].values
+
+    def insert(self, positions, results):
+
+        """
+        Info
+        ----
+        Write the arrays of another ResultStore, e.g. the results of one
+        chunk of a parallel simulation, to the rows "positions".
+
+        Parameters
+        ----------
+        positions: numpy.ndarray
+            positions of the timesteps of results in self.index
+
+        results: vpplib.result_store.ResultStore
+            results of the timesteps self.index[positions]
+
+        """
+
+        if len(self.arrays) == 0:
+            self.element_index = results.element_index
+            self.names = results.names
+            self.arrays = {
+                res: {
+                    column: np.full(
+                        (len(self.index), values.shape[1]), np.nan
+                    )
+                    for column, values in columns.items()
+                }
+                for res, columns in results.arrays.items()
+            }
+
+        for res, columns in results.arrays.items():
+            for column, values in columns.items():
+                self.arrays[res][column][positions] = values
+
+    def save(self, path):
+
+        """
+        Info
+        ----
+        Write the result arrays to the directory path. The timestamps are
+        stored as int64 nanoseconds in index.npy, every array in its own
+        .npy file and the element index and names in meta.json.
+
+        Parameters
+        ----------
+        path: string
+            directory of the results. It is created if it does not exist.
+
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        index = self.index
+        timezone = None if index.tz is None else str(index.tz)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        np.save(os.path.join(path, "index.npy"), index.values.astype("int64"))
+
+        files = {}
+        for res, columns in self.arrays.items():
+            files[res] = {}
+            for i, (column, values) in enumerate(columns.items()):
+                file = "%s_%i.npy" % (res, i)
+                np.save(os.path.join(path, file), values)
+                files[res][column] = file
+
+        meta = {
+            "timezone": timezone,
+            "files": files,
+            "element_index": {
+                element: values.tolist()
+                for element, values in self.element_index.items()
+            },
+            "names": {
+                element: names.tolist()
+                for element, names in self.names.items()
+            },
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+
+        """
+        Info
+        ----
+        Return the ResultStore saved to the directory path.
+
+        Parameters
+        ----------
+        path: string
+            directory of the results
+
+        mmap_mode: string
+            mode of numpy.load. "r": the arrays are memory-mapped read-only,
+            only the requested results are read from disk.
+            None: the arrays are read into memory.
+
+        Returns
+        -------
+        results: vpplib.result_store.ResultStore
+
+        """
+
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        index = pd.DatetimeIndex(
+            np.load(os.path.join(path, "index.npy")).astype("datetime64[ns]")
+        )
+        if meta["timezone"] is not None:
+            index = index.tz_localize("UTC").tz_convert(meta["timezone"])
+
+        results = cls(index)
+        results.element_index = {
+            element: pd.Index(values)
+            for element, values in meta["element_index"].items()
+        }
+        results.names = {
+            element: pd.Index(values)
+            for element, values in meta["names"].items()
+        }
+        results.arrays = {
+            res: {
+                column: np.load(os.path.join(path, file), mmap_mode=mmap_mode)
+                for column, file in columns.items()
+            }
+            for res, columns in meta["files"].items()
+        }
+
+        return results
+
+    @classmethod
+    def concatenate(cls, stores):
+
+        """
+        Info
+        ----
+        Return one ResultStore with the results of consecutive stores, e.g.
+        the chunks of Operator.run_base_scenario_chunked.
+
+        Parameters
+        ----------
+        stores: list
+            ResultStores (or their directories) in the order of their
+            timesteps
+
+        Returns
+        -------
+        results: vpplib.result_store.ResultStore
+
+        """
+
+        stores = [
+            cls.load(store) if isinstance(store, str) else store
+            for store in stores
+        ]
+
+        results = cls(stores[0].index.append([s.index for s in stores[1:]]))
+
+        first = 0
+        for store in stores:
+            results.insert(np.arange(first, first + len(store)), store)
+            first += len(store)
+
+        return results
+
+    def get_result(self, res="load", value="p_mw"):
+
+        """
+        Info
+        ----
+        Return the results of one column of a result table as DataFrame
+        with the timestamps as index and the element names as columns.
+        The DataFrame is a view on the result array.
+
+        Parameters
+        ----------
+        res: string
+            element of the net, e.g. "bus", "line" or "ext_grid"
+
+        value: string
+            column of the result table, e.g. "p_mw" or "vm_pu"
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+
+        """
+
+        return pd.DataFrame(
+            self.arrays["res_" + res][value],
+            index=self.index,
+            columns=self.names[res],
+            copy=False,
+        )
+
+    def extract_results(self):
+
+        """
+        Info
+        ----
+        Return the results in the structure of Operator.extract_results.
+
+        Returns
+        -------
+        results: dict
+
+        """
+
+        # ext_grid results are stacked timestep by timestep like the
+        # concatenated res_ext_grid tables of the net_dict
+        ext_grid = pd.DataFrame(
+            {
+                column: values.ravel()
+                for column, values in self.arrays["res_ext_grid"].items()
+            },
+            copy=False,
+        )
+
+        results = {
+            "ext_grid": ext_grid,
+            "trafo_loading_percent": self.get_result(
+                "trafo", "loading_percent"
+            ),
+            "line_loading_percent": self.get_result("line", "loading_percent"),
+            "bus_vm_pu": self.get_result("bus", "vm_pu"),
+            "bus_p_mw": self.get_result("bus", "p_mw"),
+            "bus_q_mvr": self.get_result("bus", "q_mvar"),
+            "load_p_mw": self.get_result("load", "p_mw"),
+            "sgen_p_mw": self.get_result("sgen", "p_mw"),
+            "storage_p_mw": self.get_result("storage", "p_mw"),
+        }
+
+        return results
+
+    # =========================================================================
+    # Access by timestamp like the former net_dict
+    # =========================================================================
+
+    def keys(self):
+
+        return self.index
+
+    def __iter__(self):
+
+        return iter(self.index)
+
+    def __len__(self):
+
+        return len(self.index)
+
+    def __getitem__(self, timestamp):
+
+        """
+        Info
+        ----
+        Return the result tables of one timestamp like an entry of the
+        net_dict, e.g. store[timestamp]["res_bus"].
+
+        """
+
+        step = self.index.get_loc(pd.Timestamp(timestamp))
+
+        return {
+            res: pd.DataFrame(
+                {column: values[step] for column, values in columns.items()},
+                index=self.element_index[res[4:]],
+            )
+            for res, columns in self.arrays.items()
+        }
@@ -0,0 +1,725 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the SensitivityPowerFlow
+class. The SensitivityPowerFlow linearizes the power flow of a pandapower
+net once around a base point and estimates the bus voltages and branch
+loadings of all timesteps with one matrix multiplication. Only timesteps,
+whose estimate is close to a voltage or loading limit, are solved with a
+full pandapower.runpp. This is meant for screening studies, where a full
+AC solution of every timestep is not needed.
+
+"""
+
+import numpy as np
+import pandapower as pp
+from scipy.sparse import linalg
+
+from .result_store import ResultStore
+
+
+# columns of the ppc bus and branch tables of pandapower
+BASE_KV = 9
+F_BUS = 0
+T_BUS = 1
+
+
+class SensitivityPowerFlow(object):
+
+    # elements, whose injections are recorded and varied between timesteps
+    elements = ("load", "sgen", "storage")
+
+    def __init__(
+        self,
+        net,
+        index,
+        results=None,
+        voltage_margin=0.01,
+        loading_margin=10.0,
+        vm_limits=(0.9, 1.1),
+        **kwargs
+    ):
+        """
+        Info
+        ----
+        The engine takes the pandapower net and the time index of the
+        simulation. Like for the PowerFlowEngine, only the p and q values
+        of the loads, sgens and storages may change between the timesteps.
+        They are recorded with record_injections() for every timestep,
+        afterwards run() estimates the results of all timesteps.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net of the simulation
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the simulation
+
+        results: vpplib.result_store.ResultStore
+            store the results are written to. A new ResultStore for index is
+            created if None.
+
+        voltage_margin: float
+            timesteps with an estimated voltage closer than voltage_margin
+            (plus the estimated error) to a voltage limit are solved with
+            pandapower.runpp
+
+        loading_margin: float
+            timesteps with an estimated line or trafo loading closer than
+            loading_margin percent (plus the estimated error) to the maximum
+            loading are solved with pandapower.runpp
+
+        vm_limits: tuple
+            (min, max) voltage in pu of buses without min_vm_pu/max_vm_pu.
+            The maximum loading is max_loading_percent of the lines and
+            trafos, if available, otherwise 100 %.
+
+        kwargs:
+            further keyword arguments, which are passed to pandapower.runpp
+
+        Attributes
+        ----------
+        jacobian_lu: scipy.sparse.linalg.SuperLU
+            sparse LU decomposition of the Jacobian of the base point. The
+            changes of the voltages of all timesteps are solved with it at
+            once, the inverse of the Jacobian is never formed.
+
+        error_bounds: dict
+            {"bus_vm_pu", "line_loading_percent", "trafo_loading_percent":
+            numpy.ndarray of shape (timesteps, elements)}. The estimate is
+            improved by one Newton step with the Jacobian of the base point,
+            the size of this step is kept as estimate of the error. It is
+            no strict bound: the remaining error is usually smaller, but
+            this is not guaranteed. 0 for timesteps solved with
+            pandapower.runpp.
+
+        solved_steps, estimated_steps: int
+            number of timesteps solved with pandapower.runpp and estimated
+
+        """
+
+        self.net = net
+        self.index = index
+        self.voltage_margin = voltage_margin
+        self.loading_margin = loading_margin
+        self.vm_limits = vm_limits
+        self.kwargs = kwargs
+
+        if results is None:
+            results = ResultStore(index)
+        self.results = results
+
+        # {(element, column): numpy.ndarray of shape (timesteps, elements)}
+        self.injections = {}
+
+        self.error_bounds = {}
+        self.solved_steps = 0
+        self.estimated_steps = 0
+
+    def record_injections(self, step):
+
+        """
+        Info
+        ----
+        Copy p_mw and q_mvar of the loads, sgens and storages of the net to
+        row "step" of the injection arrays.
+
+        Parameters
+        ----------
+        step: int
+            position of the timestep in self.index
+
+        """
+
+        for element in self.elements:
+            for column in ("p_mw", "q_mvar"):
+                values = self.net[element][column].values
+                if (element, column) not in self.injections:
+                    self.injections[element, column] = np.full(
+                        (len(self.index), len(values)), np.nan
+                    )
+                self.injections[element, column][step] = values
+
+    def assign_injections(self, values):
+
+        """
+        Info
+        ----
+        Write injections to the loads, sgens and storages of the net.
+
+        Parameters
+        ----------
+        values: dict
+            {(element, column): numpy.ndarray of shape (elements,)}
+
+        """
+
+        for (element, column), array in values.items():
+            self.net[element][column] = array
+
+    def run(self):
+
+        """
+        Info
+        ----
+        Linearize the net around the mean injections of all timesteps,
+        estimate the results of all timesteps and solve the timesteps close
+        to a limit with pandapower.runpp. Afterwards, the injections of the
+        net are restored.
+
+        Returns
+        -------
+        results: vpplib.result_store.ResultStore
+
+        """
+
+        original = {
+            (element, column): self.net[element][column].values.copy()
+            for element in self.elements
+            for column in ("p_mw", "q_mvar")
+        }
+
+        try:
+            self.linearize()
+            critical = self.estimate()
+
+            for step in np.flatnonzero(critical):
+                self.assign_injections(
+                    {
+                        key: array[step]
+                        for key, array in self.injections.items()
+                    }
+                )
+                pp.runpp(self.net, **self.kwargs)
+                self.results.record(step, self.net)
+                for bounds in self.error_bounds.values():
+                    bounds[step] = 0
+
+        finally:
+            self.assign_injections(original)
+
+        self.solved_steps = int(critical.sum())
+        self.estimated_steps = len(self.index) - self.solved_steps
+
+        return self.results
+
+    def linearize(self):
+
+        """
+        Info
+        ----
+        Solve the power flow at the mean injections of all timesteps and
+        factorize its Jacobian with a sparse LU decomposition.
+
+        """
+
+        internal = self.solve_base_point()
+
+        # x = [Va(pv, pq), Vm(pq)] changes by J^-1 @ [P(pv, pq), Q(pq)]
+        self.jacobian_lu = linalg.splu(internal["J"].tocsc())
+
+    def solve_base_point(self):
+
+        """
+        Info
+        ----
+        Solve the power flow at the mean injections of all timesteps, keep
+        the internal bus and branch data of pandapower and build the
+        lookups of the net.
+
+        Returns
+        -------
+        internal: dict
+            internal data of the power flow, net._ppc["internal"]
+
+        """
+
+        self.assign_injections(
+            {
+                key: array.mean(axis=0)
+                for key, array in self.injections.items()
+            }
+        )
+        pp.runpp(self.net, **self.kwargs)
+
+        if len(self.results.arrays) == 0:
+            self.results.allocate(self.net)
+
+        internal = self.net._ppc["internal"]
+        self.base_mva = internal["baseMVA"]
+        self.ybus = internal["Ybus"]
+        self.yf = internal["Yf"]
+        self.yt = internal["Yt"]
+        self.v_base = internal["V"]
+        self.s_base = internal["Sbus"]
+        self.base_kv = internal["bus"][:, BASE_KV].real
+        self.branch_buses = (
+            internal["branch"][:, F_BUS].real.astype(np.int64),
+            internal["branch"][:, T_BUS].real.astype(np.int64),
+        )
+        self.pvpq = np.r_[internal["pv"], internal["pq"]].astype(np.int64)
+        self.pq = np.asarray(internal["pq"], dtype=np.int64)
+
+        self.build_lookups()
+
+        return internal
+
+    def build_lookups(self):
+
+        """
+        Info
+        ----
+        Build the mapping of the elements, lines and trafos of the net to
+        the internal buses and branches of the linearized power flow.
+
+        """
+
+        n_bus = len(self.v_base)
+
+        # buses, which are not part of the internal power flow (out of
+        # service or isolated), are sorted behind the internal buses
+        bus_lookup = self.net._pd2ppc_lookups["bus"]
+        self.bus_rows = bus_lookup[self.net.bus.index.values]
+        self.bus_in_service = self.bus_rows < n_bus
+
+        self.element_buses = {}
+        self.element_scaling = {}
+        for element in self.elements + ("ext_grid",):
+            table = self.net[element]
+            buses = bus_lookup[table.bus.values]
+            scaling = table.in_service.values.astype(float) * (buses < n_bus)
+            if "scaling" in table:
+                scaling = scaling * table.scaling.values
+            self.element_buses[element] = np.where(buses < n_bus, buses, 0)
+            self.element_scaling[element] = scaling
+
+        branch_is = self.net._ppc["internal"]["branch_is"]
+        branch_rows = np.cumsum(branch_is) - 1
+        self.branch_rows = {}
+        for branch, (first, last) in self.net._pd2ppc_lookups[
+            "branch"
+        ].items():
+            self.branch_rows[branch] = (
+                np.where(branch_is[first:last], branch_rows[first:last], -1)
+            )
+
+        # positions of the from (hv) and to (lv) bus of the lines and trafos
+        # in net.bus
+        self.branch_bus_positions = {
+            "line": (
+                self.net.bus.index.get_indexer(self.net.line.from_bus),
+                self.net.bus.index.get_indexer(self.net.line.to_bus),
+            ),
+            "trafo": (
+                self.net.bus.index.get_indexer(self.net.trafo.hv_bus),
+                self.net.bus.index.get_indexer(self.net.trafo.lv_bus),
+            ),
+        }
+
+    def get_bus_injections(self):
+
+        """
+        Info
+        ----
+        Return the injections of the loads, sgens and storages of all
+        timesteps as complex power in MVA at the internal buses, shape
+        (buses, timesteps). A positive value is a generation.
+
+        """
+
+        n_bus = len(self.v_base)
+        injections = np.zeros((n_bus, len(self.index)), dtype=complex)
+
+        for element, sign in (("load", -1), ("sgen", 1), ("storage", -1)):
+            if len(self.net[element]) == 0:
+                continue
+            power = sign * self.element_scaling[element] * (
+                self.injections[element, "p_mw"]
+                + 1j * self.injections[element, "q_mvar"]
+            )
+            for row, bus in enumerate(self.element_buses[element]):
+                injections[bus] += power[:, row]
+
+        return injections
+
+    def estimate(self):
+
+        """
+        Info
+        ----
+        Estimate the results of all timesteps and write them to the result
+        arrays.
+
+        Returns
+        -------
+        critical: numpy.ndarray
+            boolean array, True for the timesteps close to a limit
+
+        """
+
+        injections = self.get_bus_injections()
+        base = injections.mean(axis=1)[:, np.newaxis]
+        delta = np.vstack([(injections - base).real, (injections - base).imag])
+
+        # linear estimate with the Jacobian of the base point
+        va = np.tile(np.angle(self.v_base)[:, np.newaxis], (1, delta.shape[1]))
+        vm = np.tile(np.abs(self.v_base)[:, np.newaxis], (1, delta.shape[1]))
+        self.add_newton_step(va, vm, delta / self.base_mva)
+
+        # one Newton step with the Jacobian of the base point improves the
+        # estimate, its size is the estimated error
+        voltage = vm * np.exp(1j * va)
+        mismatch = (
+            self.s_base[:, np.newaxis]
+            + (injections - base) / self.base_mva
+            - voltage * np.conj(self.ybus @ voltage)
+        )
+        self.add_newton_step(
+            va, vm, np.vstack([mismatch.real, mismatch.imag])
+        )
+        corrected = vm * np.exp(1j * va)
+
+        loading = self.write_results(corrected, injections)
+        uncorrected = self.get_loading(voltage)
+
+        vm_error = np.abs(vm - np.abs(voltage))
+        self.error_bounds = {
+            "bus_vm_pu": np.where(
+                self.bus_in_service, vm_error[self.bus_rows_internal()].T, 0.0
+            ),
+            "line_loading_percent": np.abs(
+                loading["line"] - uncorrected["line"]
+            ),
+            "trafo_loading_percent": np.abs(
+                loading["trafo"] - uncorrected["trafo"]
+            ),
+        }
+
+        return self.get_critical_steps(loading)
+
+    def add_newton_step(self, va, vm, mismatch):
+
+        """
+        Info
+        ----
+        Add the Newton step of the Jacobian of the base point for the power
+        mismatches of all timesteps to the voltages in place.
+
+        Parameters
+        ----------
+        va, vm: numpy.ndarray
+            voltage angles in rad and magnitudes in pu at the internal
+            buses, shape (buses, timesteps)
+
+        mismatch: numpy.ndarray
+            active (first half of the rows) and reactive (second half) power
+            mismatch in pu at the internal buses, shape
+            (2 * buses, timesteps)
+
+        """
+
+        n_bus = len(self.v_base)
+        step = self.jacobian_lu.solve(
+            np.vstack([mismatch[self.pvpq], mismatch[n_bus + self.pq]])
+        )
+        va[self.pvpq] += step[: len(self.pvpq)]
+        vm[self.pq] += step[len(self.pvpq) :]
+
+    def bus_rows_internal(self):
+
+        """
+        Info
+        ----
+        Return the internal bus of every bus of the net, 0 for buses which
+        are not part of the internal power flow.
+
+        """
+
+        return np.where(self.bus_in_service, self.bus_rows, 0)
+
+    def get_branch_flows(self, voltage, branch):
+
+        """
+        Info
+        ----
+        Return the flows of the lines or trafos of the net for the voltages
+        of all timesteps. Branches out of service have no flow.
+
+        Parameters
+        ----------
+        voltage: numpy.ndarray
+            complex voltages in pu at the internal buses,
+            shape (buses, timesteps)
+
+        branch: string
+            "line" or "trafo"
+
+        Returns
+        -------
+        s_from, s_to: numpy.ndarray
+            complex power in MVA flowing into the branch at the from (hv)
+            and to (lv) bus, shape (timesteps, branches)
+
+        i_from, i_to: numpy.ndarray
+            current in kA at the from (hv) and to (lv) bus
+
+        rows: numpy.ndarray
+            row of each branch in the internal branch table,
+            -1: out of service
+
+        """
+
+        rows = self.branch_rows.get(branch, np.array([], dtype=np.int64))
+        in_service = rows >= 0
+        used = rows[in_service]
+
+        flows = []
+        for admittance, buses, positions in zip(
+            (self.yf, self.yt),
+            self.branch_buses,
+            self.branch_bus_positions[branch],
+        ):
+            power = np.zeros((len(self.index), len(rows)), dtype=complex)
+            # like pandapower: no current at a branch out of service, no
+            # result if its bus is out of service as well
+            current = np.tile(
+                np.where(self.bus_in_service[positions], 0.0, np.nan),
+                (len(self.index), 1),
+            )
+            if len(used) > 0:
+                branch_current = admittance[used] @ voltage
+                power[:, in_service] = (
+                    voltage[buses[used]] * np.conj(branch_current)
+                ).T * self.base_mva
+                current[:, in_service] = (
+                    np.abs(branch_current).T
+                    * self.base_mva
+                    / (np.sqrt(3) * self.base_kv[buses[used]])
+                )
+            flows.append((power, current))
+
+        (s_from, i_from), (s_to, i_to) = flows
+
+        return s_from, s_to, i_from, i_to, rows
+
+    def get_loading(self, voltage):
+
+        """
+        Info
+        ----
+        Return the loading in percent of the lines and trafos for the
+        voltages of all timesteps like pandapower calculates it.
+
+        Returns
+        -------
+        loading: dict
+            {"line", "trafo": numpy.ndarray of shape (timesteps, branches)}
+
+        """
+
+        loading = {}
+
+        _, _, i_from, i_to, _ = self.get_branch_flows(voltage, "line")
+        line = self.net.line
+        i_max = line.max_i_ka.values * line.df.values * line.parallel.values
+        loading["line"] = np.maximum(i_from, i_to) / i_max * 100
+
+        s_hv, s_lv, i_hv, i_lv, _ = self.get_branch_flows(voltage, "trafo")
+        trafo = self.net.trafo
+        if self.net._options["trafo_loading"] == "power":
+            # loading with the rated power
+            loading["trafo"] = (
+                np.maximum(np.abs(s_hv), np.abs(s_lv))
+                / trafo.sn_mva.values
+                * 100
+            )
+        else:
+            # loading with the rated current
+            loading["trafo"] = (
+                np.maximum(
+                    i_hv * trafo.vn_hv_kv.values, i_lv * trafo.vn_lv_kv.values
+                )
+                * np.sqrt(3)
+                / trafo.sn_mva.values
+                * 100
+            )
+        loading["trafo"] = (
+            loading["trafo"] / trafo.parallel.values / trafo.df.values
+        )
+
+        return loading
+
+    def write_results(self, voltage, injections):
+
+        """
+        Info
+        ----
+        Write the results of the voltages of all timesteps to the result
+        arrays like pandapower writes the result tables.
+
+        Parameters
+        ----------
+        voltage: numpy.ndarray
+            complex voltages in pu at the internal buses,
+            shape (buses, timesteps)
+
+        injections: numpy.ndarray
+            complex power of the loads, sgens and storages in MVA at the
+            internal buses, shape (buses, timesteps)
+
+        Returns
+        -------
+        loading: dict
+            {"line", "trafo": loading in percent, shape (timesteps, branches)}
+
+        """
+
+        arrays = self.results.arrays
+        rows = self.bus_rows_internal()
+
+        def write(res, column, values):
+            if res in arrays and column in arrays[res]:
+                arrays[res][column][:] = values
+
+        # buses
+        vm = np.where(self.bus_in_service, np.abs(voltage).T[:, rows], np.nan)
+        va = np.where(
+            self.bus_in_service,
+            np.degrees(np.angle(voltage)).T[:, rows],
+            np.nan,
+        )
+        write("res_bus", "vm_pu", vm)
+        write("res_bus", "va_degree", va)
+
+        # loads, sgens and storages keep their injections
+        bus_p = np.zeros((len(self.index), len(self.net.bus)))
+        bus_q = np.zeros((len(self.index), len(self.net.bus)))
+        bus_position = {bus: i for i, bus in enumerate(self.net.bus.index)}
+        for element, sign in (("load", 1), ("sgen", -1), ("storage", 1)):
+            if len(self.net[element]) == 0:
+                continue
+            scaling = self.element_scaling[element]
+            p = self.injections[element, "p_mw"] * scaling
+            q = self.injections[element, "q_mvar"] * scaling
+            write("res_" + element, "p_mw", p)
+            write("res_" + element, "q_mvar", q)
+            for row, bus in enumerate(self.net[element].bus.values):
+                bus_p[:, bus_position[bus]] += sign * p[:, row]
+                bus_q[:, bus_position[bus]] += sign * q[:, row]
+
+        # shunts consume their rated power at rated voltage
+        shunt = self.net.shunt
+        for row in np.flatnonzero(shunt.in_service.values):
+            position = bus_position[shunt.bus.values[row]]
+            vn_kv = self.net.bus.vn_kv.values[position]
+            factor = (
+                shunt.step.values[row]
+                * (vm[:, position] * vn_kv / shunt.vn_kv.values[row]) ** 2
+            )
+            bus_p[:, position] += shunt.p_mw.values[row] * factor
+            bus_q[:, position] += shunt.q_mvar.values[row] * factor
+
+        # the external grids supply the power of their bus, which is not
+        # covered by the loads, sgens and storages at the bus
+        s_bus = voltage * np.conj(self.ybus @ voltage) * self.base_mva
+        ext_grid = self.net.ext_grid
+        ext_p = np.zeros((len(self.index), len(ext_grid)))
+        ext_q = np.zeros((len(self.index), len(ext_grid)))
+        buses = self.element_buses["ext_grid"]
+        for row, bus in enumerate(buses):
+            if self.element_scaling["ext_grid"][row] == 0:
+                continue
+            share = 1 / np.sum(
+                (buses == bus) & (self.element_scaling["ext_grid"] > 0)
+            )
+            supply = (s_bus[bus] - injections[bus]) * share
+            ext_p[:, row] = supply.real
+            ext_q[:, row] = supply.imag
+            bus_p[:, bus_position[ext_grid.bus.values[row]]] -= supply.real
+            bus_q[:, bus_position[ext_grid.bus.values[row]]] -= supply.imag
+        write("res_ext_grid", "p_mw", ext_p)
+        write("res_ext_grid", "q_mvar", ext_q)
+        write("res_bus", "p_mw", bus_p)
+        write("res_bus", "q_mvar", bus_q)
+
+        # lines and trafos
+        for branch, (f, t) in (
+            ("line", ("from", "to")),
+            ("trafo", ("hv", "lv")),
+        ):
+            res = "res_" + branch
+            if res not in arrays or len(self.net[branch]) == 0:
+                continue
+
+            s_from, s_to, i_from, i_to, _ = self.get_branch_flows(
+                voltage, branch
+            )
+
+            write(res, "p_%s_mw" % f, s_from.real)
+            write(res, "q_%s_mvar" % f, s_from.imag)
+            write(res, "p_%s_mw" % t, s_to.real)
+            write(res, "q_%s_mvar" % t, s_to.imag)
+            write(res, "pl_mw", s_from.real + s_to.real)
+            write(res, "ql_mvar", s_from.imag + s_to.imag)
+            write(res, "i_%s_ka" % f, i_from)
+            write(res, "i_%s_ka" % t, i_to)
+            write(res, "i_ka", np.maximum(i_from, i_to))
+            for side, positions in zip(
+                (f, t), self.branch_bus_positions[branch]
+            ):
+                write(res, "vm_%s_pu" % side, vm[:, positions])
+                write(res, "va_%s_degree" % side, va[:, positions])
+
+        loading = self.get_loading(voltage)
+        write("res_line", "loading_percent", loading["line"])
+        write("res_trafo", "loading_percent", loading["trafo"])
+
+        return loading
+
+    def get_critical_steps(self, loading):
+
+        """
+        Info
+        ----
+        Return a boolean array, which is True for the timesteps, whose
+        estimated voltages or loadings are close to a limit.
+
+        """
+
+        vm = self.results.arrays["res_bus"]["vm_pu"]
+        error = self.error_bounds["bus_vm_pu"]
+
+        bus = self.net.bus
+        min_vm = np.full(len(bus), self.vm_limits[0], dtype=float)
+        max_vm = np.full(len(bus), self.vm_limits[1], dtype=float)
+        if "min_vm_pu" in bus:
+            min_vm = np.where(bus.min_vm_pu.isna(), min_vm, bus.min_vm_pu)
+        if "max_vm_pu" in bus:
+            max_vm = np.where(bus.max_vm_pu.isna(), max_vm, bus.max_vm_pu)
+
+        with np.errstate(invalid="ignore"):
+            critical = np.any(
+                (vm - error < min_vm + self.voltage_margin)
+                | (vm + error > max_vm - self.voltage_margin),
+                axis=1,
+            )
+
+            for branch in ("line", "trafo"):
+                table = self.net[branch]
+                max_loading = np.full(len(table), 100.0)
+                if "max_loading_percent" in table:
+                    max_loading = np.where(
+                        table.max_loading_percent.isna(),
+                        max_loading,
+                        table.max_loading_percent,
+                    )
+                critical |= np.any(
+                    loading[branch]
+                    + self.error_bounds[branch + "_loading_percent"]
+                    > max_loading - self.loading_margin,
+                    axis=1,
+                )
+
+        return critical
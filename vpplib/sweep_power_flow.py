@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the SweepPowerFlow class.
+The SweepPowerFlow solves the power flow of a radial pandapower net with a
+backward/forward sweep. The tree of the net is built once, the injections
+of all timesteps are treated as one (buses x timesteps) matrix, so every
+sweep solves all timesteps at once with NumPy instead of one
+pandapower.runpp per timestep.
+
+"""
+
+import numpy as np
+import pandapower as pp
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from .sensitivity_power_flow import SensitivityPowerFlow
+
+
+# columns of the ppc bus table of pandapower
+GS = 4
+BS = 5
+
+
+class SweepPowerFlow(SensitivityPowerFlow):
+    def __init__(
+        self,
+        net,
+        index,
+        results=None,
+        tolerance_mva=1e-8,
+        max_iteration=100,
+        **kwargs
+    ):
+        """
+        Info
+        ----
+        The engine takes the pandapower net and the time index of the
+        simulation. Like for the SensitivityPowerFlow, the p and q values
+        of the loads, sgens and storages are recorded with
+        record_injections() for every timestep, afterwards run() solves all
+        timesteps together.
+
+        The net needs to be radial with one external grid and without
+        generators (pv buses). Out of service buses and branches are
+        ignored, branches may be lines or trafos with any tap position.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net of the simulation
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timestamps of the simulation
+
+        results: vpplib.result_store.ResultStore
+            store the results are written to. A new ResultStore for index is
+            created if None.
+
+        tolerance_mva: float
+            a timestep is converged, if the power mismatch of all buses is
+            below tolerance_mva, like in pandapower.runpp
+
+        max_iteration: int
+            maximum number of sweeps. Timesteps, which are not converged
+            then, are solved with pandapower.runpp.
+
+        kwargs:
+            further keyword arguments, which are passed to pandapower.runpp
+
+        Attributes
+        ----------
+        iterations: numpy.ndarray
+            number of sweeps of every timestep
+
+        converged: numpy.ndarray
+            boolean array, True for the timesteps, which converged in the
+            sweeps. The other timesteps are solved with pandapower.runpp.
+
+        solved_steps: int
+            number of timesteps solved with pandapower.runpp
+
+        """
+
+        SensitivityPowerFlow.__init__(
+            self, net, index, results=results, **kwargs
+        )
+
+        self.tolerance_mva = tolerance_mva
+        self.max_iteration = max_iteration
+
+        self.iterations = np.zeros(len(index), dtype=np.int64)
+        self.converged = np.zeros(len(index), dtype=bool)
+
+    def run(self):
+
+        """
+        Info
+        ----
+        Solve the power flow of all timesteps with the backward/forward
+        sweep and write the results to the result arrays. Timesteps, which
+        do not converge, are solved with pandapower.runpp.
+
+        Returns
+        -------
+        results: vpplib.result_store.ResultStore
+
+        """
+
+        internal = self.solve_base_point()
+        self.build_tree(internal)
+
+        injections = self.get_bus_injections()
+        voltage = self.sweep(injections)
+        self.write_results(voltage, injections)
+
+        for step in np.flatnonzero(~self.converged):
+            self.assign_injections(
+                {key: array[step] for key, array in self.injections.items()}
+            )
+            pp.runpp(self.net, **self.kwargs)
+            self.results.record(step, self.net)
+
+        self.solved_steps = int((~self.converged).sum())
+
+        return self.results
+
+    def build_tree(self, internal):
+
+        """
+        Info
+        ----
+        Orient the internal branches from the external grid to the ends of
+        the feeders and group them by their depth in the tree. For every
+        branch the two-port equations are rearranged, so the current at its
+        parent bus and the voltage at its child bus follow from the current
+        at its child bus and the voltage at its parent bus.
+
+        Parameters
+        ----------
+        internal: dict
+            internal data of the power flow, net._ppc["internal"]
+
+        """
+
+        n_bus = len(self.v_base)
+        from_bus, to_bus = self.branch_buses
+        n_branch = len(from_bus)
+
+        if len(internal["ref"]) != 1 or len(internal["pv"]) > 0:
+            raise ValueError(
+                "The backward/forward sweep needs a net with one external "
+                + "grid and without generators!"
+            )
+
+        graph = sparse.csr_matrix(
+            (np.arange(1, n_branch + 1), (from_bus, to_bus)),
+            shape=(n_bus, n_bus),
+        )
+        root = int(internal["ref"][0])
+        order, parent = csgraph.breadth_first_order(
+            graph, root, directed=False, return_predecessors=True
+        )
+        if n_branch != n_bus - 1 or len(order) != n_bus:
+            raise ValueError(
+                "The backward/forward sweep needs a radial net!"
+            )
+
+        # branch of every bus to its parent bus
+        branch_of = np.zeros(n_bus, dtype=np.int64)
+        graph = graph + graph.T
+        for bus in order[1:]:
+            branch_of[bus] = graph[bus, parent[bus]] - 1
+
+        depth = np.zeros(n_bus, dtype=np.int64)
+        for bus in order[1:]:
+            depth[bus] = depth[parent[bus]] + 1
+
+        branches = np.arange(n_branch)
+        y_ff = np.asarray(self.yf[branches, from_bus]).ravel()
+        y_ft = np.asarray(self.yf[branches, to_bus]).ravel()
+        y_tf = np.asarray(self.yt[branches, from_bus]).ravel()
+        y_tt = np.asarray(self.yt[branches, to_bus]).ravel()
+
+        # [(children, parents, transfer, shunt, y_cp, y_cc, aggregate)]
+        self.levels = []
+        for level in range(1, depth.max() + 1):
+            children = np.flatnonzero(depth == level)
+            parents = parent[children]
+            branch = branch_of[children]
+            forward = from_bus[branch] == parents
+
+            # admittances of the parent (p) and child (c) side
+            y_pp = np.where(forward, y_ff[branch], y_tt[branch])
+            y_pc = np.where(forward, y_ft[branch], y_tf[branch])
+            y_cp = np.where(forward, y_tf[branch], y_ft[branch])
+            y_cc = np.where(forward, y_tt[branch], y_ff[branch])
+
+            # I_p = transfer * I_c + shunt * V_p
+            transfer = y_pc / y_cc
+            shunt = y_pp - y_pc * y_cp / y_cc
+
+            # sums the currents of the branches at their parent bus
+            aggregate = sparse.csr_matrix(
+                (np.ones(len(children)), (parents, np.arange(len(children)))),
+                shape=(n_bus, len(children)),
+            )
+
+            self.levels.append(
+                (
+                    children,
+                    parents,
+                    transfer[:, np.newaxis],
+                    shunt[:, np.newaxis],
+                    y_cp[:, np.newaxis],
+                    y_cc[:, np.newaxis],
+                    aggregate,
+                )
+            )
+
+        bus = internal["bus"]
+        self.y_shunt = (
+            (bus[:, GS].real + 1j * bus[:, BS].real) / self.base_mva
+        )[:, np.newaxis]
+        self.root = root
+
+    def sweep(self, injections):
+
+        """
+        Info
+        ----
+        Solve all timesteps with backward/forward sweeps, starting from the
+        voltages of the base point. After every sweep the power mismatch of
+        each timestep is checked, converged timesteps are not swept again.
+
+        Parameters
+        ----------
+        injections: numpy.ndarray
+            complex power of the loads, sgens and storages in MVA at the
+            internal buses, shape (buses, timesteps)
+
+        Returns
+        -------
+        voltage: numpy.ndarray
+            complex voltages in pu at the internal buses,
+            shape (buses, timesteps)
+
+        """
+
+        n_step = injections.shape[1]
+
+        # power of the buses in pu; the other elements of the net, e.g.
+        # wards, keep their power of the base point
+        s_bus = self.s_base[:, np.newaxis] + (
+            injections - injections.mean(axis=1)[:, np.newaxis]
+        ) / self.base_mva
+
+        voltage = np.tile(self.v_base[:, np.newaxis], (1, n_step))
+        self.iterations[:] = 0
+        self.converged[:] = False
+
+        not_root = np.arange(len(self.v_base)) != self.root
+        active = np.arange(n_step)
+
+        with np.errstate(all="ignore"):
+            for iteration in range(1, self.max_iteration + 1):
+
+                v = voltage[:, active]
+                s = s_bus[:, active]
+
+                # backward sweep: currents from the ends of the feeders to
+                # the external grid
+                current = np.conj(s / v) - self.y_shunt * v
+                for (
+                    children,
+                    parents,
+                    transfer,
+                    shunt,
+                    _,
+                    _,
+                    aggregate,
+                ) in reversed(self.levels):
+                    current -= aggregate @ (
+                        transfer * current[children] + shunt * v[parents]
+                    )
+
+                # forward sweep: voltages from the external grid to the
+                # ends of the feeders
+                for children, parents, _, _, y_cp, y_cc, _ in self.levels:
+                    v[children] = (
+                        current[children] - y_cp * v[parents]
+                    ) / y_cc
+
+                voltage[:, active] = v
+
+                mismatch = np.abs(v * np.conj(self.ybus @ v) - s)[not_root]
+                done = mismatch.max(axis=0, initial=0) * self.base_mva < (
+                    self.tolerance_mva
+                )
+
+                self.iterations[active] = iteration
+                self.converged[active[done]] = True
+                active = active[~done]
+
+                if len(active) == 0:
+                    break
+
+        return voltage
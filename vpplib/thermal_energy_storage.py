@@ -6,8 +6,172 @@ This file contains the basic functionalities of the ThermalEnergyStorage class.
 
 """
 
+import numpy as np
 import pandas as pd
 from .component import Component
+from .kernels import get_kernel
+
+
+def operate_storage_kernel(
+    thermal_energy_demand,
+    thermal_output_running,
+    thermal_output_stopped,
+    can_ramp_up,
+    can_ramp_down,
+    state_of_charge,
+    current_temperature,
+    needs_loading,
+    is_running,
+    target_temperature,
+    hysteresis,
+    min_temperature,
+    mass,
+    cp,
+    efficiency_per_timestep,
+    timesteps_per_hour,
+):
+
+    """
+    Info
+    ----
+    State machine of ThermalEnergyStorage.operate_storage for a whole
+    horizon. Only works on numpy arrays and scalars, so it can be compiled
+    with numba.njit.
+
+    Parameters
+    ----------
+    thermal_energy_demand: numpy.ndarray
+        thermal energy demand of each timestep
+
+    thermal_output_running, thermal_output_stopped: numpy.ndarray
+        thermal output of the generator if it is running/stopped
+
+    can_ramp_up, can_ramp_down: numpy.ndarray
+        boolean arrays, if the ramp constraints (min_stop_time,
+        min_runtime) allow a ramp up/down of the generator
+
+    state_of_charge, current_temperature: float
+        state of the storage before the first timestep
+
+    needs_loading: int
+        1: True, 0: False, -1: None
+
+    is_running: boolean
+        state of the generator before the first timestep
+
+    Returns
+    -------
+    temperature: numpy.ndarray
+        storage temperature after each timestep
+
+    running: numpy.ndarray
+        state of the generator in each timestep
+
+    steps: int
+        number of simulated timesteps. Less than the length of the horizon,
+        if the temperature fell below min_temperature.
+
+    state_of_charge, current_temperature, needs_loading, is_running:
+        state after the last simulated timestep
+
+    """
+
+    n = len(thermal_energy_demand)
+    temperature = np.empty(n)
+    running = np.zeros(n, dtype=np.bool_)
+
+    for t in range(n):
+
+        # get_needs_loading
+        if current_temperature <= (target_temperature - hysteresis):
+            needs_loading = 1
+
+        if current_temperature >= (target_temperature + hysteresis):
+            needs_loading = 0
+
+        if current_temperature < min_temperature:
+            return (
+                temperature,
+                running,
+                t,
+                state_of_charge,
+                current_temperature,
+                needs_loading,
+                is_running,
+            )
+
+        # ramp_up/ramp_down of the generator
+        if needs_loading == 1:
+            if not is_running:
+                is_running = can_ramp_up[t]
+        else:
+            if is_running:
+                is_running = not can_ramp_down[t]
+
+        if is_running:
+            thermal_production = thermal_output_running[t]
+        else:
+            thermal_production = thermal_output_stopped[t]
+
+        state_of_charge -= (
+            (thermal_energy_demand[t] - thermal_production)
+            * 1000
+            / timesteps_per_hour
+        )
+        state_of_charge *= efficiency_per_timestep
+        current_temperature = (state_of_charge / (mass * cp)) - 273.15
+
+        temperature[t] = current_temperature
+        running[t] = is_running
+
+    return (
+        temperature,
+        running,
+        n,
+        state_of_charge,
+        current_temperature,
+        needs_loading,
+        is_running,
+    )
+
+
+def get_ramp_masks(thermal_energy_generator, index):
+
+    """
+    Info
+    ----
+    Evaluate is_valid_ramp_up and is_valid_ramp_down of a HeatPump or
+    CombinedHeatAndPower for all timestamps of index at once.
+
+    Parameters
+    ----------
+    thermal_energy_generator: vpplib.heat_pump.HeatPump or
+        vpplib.combined_heat_and_power.CombinedHeatAndPower
+        generator with the attributes last_ramp_up, last_ramp_down,
+        min_runtime and min_stop_time
+
+    index: pandas.core.indexes.datetimes.DatetimeIndex
+        timestamps of the horizon
+
+    Returns
+    -------
+    can_ramp_up, can_ramp_down: numpy.ndarray
+        boolean arrays
+
+    """
+
+    can_ramp_up = (
+        thermal_energy_generator.last_ramp_down
+        + thermal_energy_generator.min_stop_time * pd.Timedelta(minutes=15)
+        < index
+    )
+    can_ramp_down = (
+        thermal_energy_generator.last_ramp_up
+        + thermal_energy_generator.min_runtime * pd.Timedelta(minutes=15)
+        < index
+    )
+
+    return np.asarray(can_ramp_up), np.asarray(can_ramp_down)
 
 
 class ThermalEnergyStorage(Component):
@@ -133,6 +297,121 @@ class ThermalEnergyStorage(Component):
 
         return self.current_temperature, el_load
 
+    def operate_storage_horizon(
+        self, index, thermal_energy_generator, jit=False
+    ):
+
+        """
+        Info
+        ----
+        Operate the storage with the thermal_energy_generator for all
+        timestamps of index at once. The results are identical to calling
+        operate_storage for every timestamp of index, but the state machine
+        runs on numpy arrays.
+
+        The generator needs the attributes of get_ramp_masks and the
+        functions get_observations_for_horizon and
+        log_observations_for_horizon, e.g. HeatPump or
+        CombinedHeatAndPower.
+
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            consecutive timestamps to simulate
+
+        thermal_energy_generator: vpplib.heat_pump.HeatPump or
+            vpplib.combined_heat_and_power.CombinedHeatAndPower
+            generator, which loads the storage
+
+        jit: boolean
+            compile the state machine with numba
+
+        Returns
+        -------
+        temperature: numpy.ndarray
+            storage temperature of each timestamp
+
+        el_load: numpy.ndarray
+            electrical load of the generator of each timestamp
+
+        """
+
+        thermal_energy_demand = (
+            self.user_profile.thermal_energy_demand.thermal_energy_demand.loc[
+                index
+            ].values.astype(float)
+        )
+        can_ramp_up, can_ramp_down = get_ramp_masks(
+            thermal_energy_generator, index
+        )
+        (
+            observations_running,
+            observations_stopped,
+        ) = thermal_energy_generator.get_observations_for_horizon(index)
+
+        if self.needs_loading is None:
+            needs_loading = -1
+        else:
+            needs_loading = int(self.needs_loading)
+
+        (
+            temperature,
+            running,
+            steps,
+            self.state_of_charge,
+            self.current_temperature,
+            needs_loading,
+            is_running,
+        ) = get_kernel(operate_storage_kernel, jit)(
+            thermal_energy_demand,
+            observations_running["thermal_energy_output"],
+            observations_stopped["thermal_energy_output"],
+            can_ramp_up,
+            can_ramp_down,
+            float(self.state_of_charge),
+            float(self.current_temperature),
+            needs_loading,
+            bool(thermal_energy_generator.is_running),
+            self.target_temperature,
+            self.hysteresis,
+            self.min_temperature,
+            self.mass,
+            self.cp,
+            self.efficiency_per_timestep,
+            60 / self.environment.timebase,
+        )
+
+        if needs_loading != -1:
+            self.needs_loading = bool(needs_loading)
+        thermal_energy_generator.is_running = bool(is_running)
+
+        temperature = temperature[:steps]
+        running = running[:steps]
+        observations = {
+            key: np.where(
+                running,
+                observations_running[key][:steps],
+                observations_stopped[key][:steps],
+            )
+            for key in observations_running.keys()
+        }
+        el_load = np.where(running, observations["el_demand"], 0.0)
+
+        self.timeseries.loc[index[:steps], "temperature"] = temperature
+
+        # log timeseries of thermal_energy_generator_class:
+        thermal_energy_generator.log_observations_for_horizon(
+            observations, index[:steps]
+        )
+
+        if steps < len(index):
+            raise ValueError(
+                "Thermal energy production to low to maintain "
+                + "heat storage temperature!"
+            )
+
+        return temperature, el_load
+
     def get_needs_loading(self):
 
         if self.current_temperature <= (
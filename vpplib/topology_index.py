@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains the basic functionalities of the TopologyIndex class.
+The TopologyIndex is built once per scenario and maps the components of
+the virtual power plant to the row positions of their elements in the
+pandapower net, as well as the buses to their connected elements. This
+replaces the search by name and pandapower.get_connected_elements in
+every timestep of the Operator.
+
+"""
+
+import numpy as np
+
+
+class TopologyIndex(object):
+    def __init__(self, net, components):
+        """
+        Info
+        ----
+        Build the lookup tables for the given net and components.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net of the scenario. Elements must not be added or removed
+            after the TopologyIndex is built.
+
+        components: list
+            names of the components, whose values are assigned to the net.
+            The order defines the order of the value array passed to
+            assign_values().
+
+        Attributes
+        ----------
+        sgen_rows, load_rows: numpy.ndarray
+            row positions in net.sgen/net.load of elements named like one of
+            the components
+
+        sgen_components, load_components: numpy.ndarray
+            position of the corresponding component in components
+
+        baseload_rows: numpy.ndarray
+            row positions of the loads of type "baseload"
+
+        baseload_buses: list
+            bus index (as string) of each baseload
+
+        storage_buses: list
+            tuples (bus, storage name, storage row, load rows, sgen rows)
+            for every bus of type "b" with a connected storage
+
+        """
+
+        self.net = net
+        self.components = list(components)
+
+        position = {name: i for i, name in enumerate(self.components)}
+
+        self.sgen_rows, self.sgen_components = self.get_rows(
+            net.sgen, position
+        )
+        self.load_rows, self.load_components = self.get_rows(
+            net.load, position
+        )
+
+        self.baseload_rows = np.flatnonzero(
+            (net.load.type == "baseload").values
+        )
+        self.baseload_buses = [
+            str(bus) for bus in net.load.bus.values[self.baseload_rows]
+        ]
+
+        self.loads_at_bus = self.get_rows_at_bus(net.load)
+        self.sgens_at_bus = self.get_rows_at_bus(net.sgen)
+        self.storages_at_bus = self.get_rows_at_bus(net.storage)
+
+        self.storage_buses = []
+        for bus in net.bus.index[net.bus.type == "b"]:
+            if bus in self.storages_at_bus:
+                storage_row = self.storages_at_bus[bus][0]
+                self.storage_buses.append(
+                    (
+                        bus,
+                        net.storage.name.iloc[storage_row],
+                        storage_row,
+                        self.loads_at_bus.get(bus, np.array([], dtype=int)),
+                        self.sgens_at_bus.get(bus, np.array([], dtype=int)),
+                    )
+                )
+
+        # column positions for iloc assignments
+        self.sgen_p = net.sgen.columns.get_loc("p_mw")
+        self.sgen_q = net.sgen.columns.get_loc("q_mvar")
+        self.load_p = net.load.columns.get_loc("p_mw")
+        self.load_q = net.load.columns.get_loc("q_mvar")
+        self.storage_p = net.storage.columns.get_loc("p_mw")
+
+    @staticmethod
+    def get_rows(table, position):
+
+        """
+        Info
+        ----
+        Return the row positions of all elements of table, whose name
+        belongs to a component, and the position of that component.
+
+        """
+
+        rows = []
+        components = []
+        for row, name in enumerate(table.name.values):
+            if name in position:
+                rows.append(row)
+                components.append(position[name])
+
+        return np.array(rows, dtype=int), np.array(components, dtype=int)
+
+    @staticmethod
+    def get_rows_at_bus(table):
+
+        """
+        Info
+        ----
+        Return a dict {bus: row positions of the elements at the bus}.
+
+        """
+
+        rows_at_bus = {}
+        for row, bus in enumerate(table.bus.values):
+            rows_at_bus.setdefault(bus, []).append(row)
+
+        return {
+            bus: np.array(rows, dtype=int) for bus, rows in rows_at_bus.items()
+        }
+
+    def assign_values(self, values, reset_q=False):
+
+        """
+        Info
+        ----
+        Write the values of the components to the sgens and loads of the
+        net with one array assignment per table.
+
+        Parameters
+        ----------
+        values: numpy.ndarray
+            values of the components in kW in the order of self.components.
+            A positive value represents a load.
+
+        reset_q: boolean
+            set q_mvar of the assigned elements to 0
+
+        """
+
+        if len(self.sgen_rows) > 0:
+            # kW to MW; negative due to generation
+            self.net.sgen.iloc[self.sgen_rows, self.sgen_p] = (
+                values[self.sgen_components] / -1000
+            )
+            if reset_q:
+                self.net.sgen.iloc[self.sgen_rows, self.sgen_q] = 0
+
+        if len(self.load_rows) > 0:
+            # kW to MW
+            self.net.load.iloc[self.load_rows, self.load_p] = (
+                values[self.load_components] / 1000
+            )
+            if reset_q:
+                self.net.load.iloc[self.load_rows, self.load_q] = 0
+
+    def assign_baseload(self, baseload):
+
+        """
+        Info
+        ----
+        Write the baseload of one timestep to the loads of type "baseload".
+
+        Parameters
+        ----------
+        baseload: numpy.ndarray
+            baseload in MW in the order of self.baseload_rows
+
+        """
+
+        if len(self.baseload_rows) > 0:
+            self.net.load.iloc[self.baseload_rows, self.load_p] = baseload
+            self.net.load.iloc[self.baseload_rows, self.load_q] = 0
+
+    def get_injections(self):
+
+        """
+        Info
+        ----
+        Return p_mw and q_mvar of all loads, sgens and storages of the net
+        as one array, e.g. to compare the injections of two timesteps.
+
+        """
+
+        return np.concatenate(
+            [
+                self.net[element][column].values.astype(float)
+                for element in ("load", "sgen", "storage")
+                for column in ("p_mw", "q_mvar")
+            ]
+        )
@@ -8,11 +8,32 @@ electric vehicles.
 
 """
 
-import traceback
+import numpy as np
 import pandas as pd
 import os
 
+from . import reference_data
+
 class UserProfile(object):
+
+    # upper bound of the temperature ranges of demand_daily.csv in °C
+    temperature_bins = [-15, -10, -5, 0, 5, 10, 15, 20, 25]
+    temperature_bin_columns = [
+        "Temp. <= -15 °C",
+        "-15 °C < Temp. <= -10 °C",
+        "-10 °C < Temp. <= -5 °C",
+        "-5 °C < Temp. <= 0 °C",
+        "0 °C < Temp. <= 5 °C",
+        "5 °C < Temp. <= 10 °C",
+        "10 °C < Temp. <= 15 °C",
+        "15 °C < Temp. <= 20 °C",
+        "20 °C < Temp. <= 25 °C",
+        "Temp > 25 °C",
+    ]
+    building_parameter_columns = [
+        "A", "B", "C", "D", "m_H", "b_H", "m_W", "b_W"
+    ]
+
     def __init__(
         self,
         identifier=None,
@@ -79,11 +100,15 @@ class UserProfile(object):
         # Define the maximal connection power for a certain user
         self.max_connection_power = max_connection_power
 
-        self.mean_temp_days = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)),
-                                                       'input/thermal/dwd_temp_days_2015.csv').replace('\\', '/'),
-                                          index_col='time')
+        input_path = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), "input/thermal"
+        ).replace("\\", "/")
 
-        self.mean_temp_days.index = pd.to_datetime(self.mean_temp_days.index)
+        self.mean_temp_days = reference_data.read_csv(
+            os.path.join(input_path, "dwd_temp_days_2015.csv"),
+            index_col="time",
+            parse_index=True,
+        )
         self.year = str(next(iter(self.mean_temp_days.index)))[:4]
 
         self.thermal_energy_demand = None
@@ -91,25 +116,26 @@ class UserProfile(object):
         # 'DE_HEF33', 'DE_HEF34', 'DE_HMF33', 'DE_HMF34', 'DE_GKO34'
         self.building_type = building_type
         # for cop
-        self.mean_temp_hours = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)).replace('\\', '/'),
-            "input/thermal/dwd_temp_hours_2015.csv"), index_col="time"
+        self.mean_temp_hours = reference_data.read_csv(
+            os.path.join(input_path, "dwd_temp_hours_2015.csv"),
+            index_col="time",
+            parse_index=True,
         )
-        self.mean_temp_hours.index = pd.to_datetime(self.mean_temp_hours.index)
 
-        self.mean_temp_quarter_hours = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)).replace('\\', '/'),
-            "input/thermal/dwd_temp_15min_2015.csv"), index_col="time"
-        )
-        self.mean_temp_quarter_hours.index = pd.to_datetime(
-            self.mean_temp_quarter_hours.index
+        self.mean_temp_quarter_hours = reference_data.read_csv(
+            os.path.join(input_path, "dwd_temp_15min_2015.csv"),
+            index_col="time",
+            parse_index=True,
         )
 
-        self.demand_daily = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)).replace('\\', '/'),
-                                                     "input/thermal/demand_daily.csv"))
+        self.demand_daily = reference_data.read_csv(
+            os.path.join(input_path, "demand_daily.csv")
+        )
         self.t_0 = t_0  # °C
 
         # for SigLinDe calculations
-        self.SigLinDe = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)).replace('\\', '/'),
-            "./input/thermal/SigLinDe.csv"), decimal=","
+        self.SigLinDe = reference_data.read_csv(
+            os.path.join(input_path, "SigLinDe.csv"), decimal=","
         )
         self.building_parameters = None
         self.h_del = None
@@ -337,21 +363,14 @@ class UserProfile(object):
         
         """
 
-        for i, Sig in self.SigLinDe.iterrows():
-            if Sig.Type == self.building_type:
-
-                self.building_parameters = (
-                    Sig.A,
-                    Sig.B,
-                    Sig.C,
-                    Sig.D,
-                    Sig.m_H,
-                    Sig.b_H,
-                    Sig.m_W,
-                    Sig.b_W,
-                )
+        Sig = self.SigLinDe[self.SigLinDe.Type == self.building_type]
+        if len(Sig) > 0:
 
-                return self.building_parameters
+            self.building_parameters = tuple(
+                Sig[self.building_parameter_columns].values[0]
+            )
+
+            return self.building_parameters
 
     # %%:
 
@@ -389,30 +408,13 @@ class UserProfile(object):
         
         """
 
-        A, B, C, D, m_H, b_H, m_W, b_W = self.building_parameters
-
         # Calculating the daily heat demand h_del for each day of the year
-        h_lst = []
-
-        for i, temp in self.mean_temp_days.iterrows():
-
-            # H and W are for linearisation in SigLinDe function below 8°C
-            H = m_H * temp.temperature + b_H
-            W = m_W * temp.temperature + b_W
-            if H > W:
-                h_del = (
-                    (A / (1 + ((B / (temp.temperature - self.t_0)) ** C))) + D
-                ) + H
-                h_lst.append(h_del)
-
-            else:
-                h_del = (
-                    (A / (1 + ((B / (temp.temperature - self.t_0)) ** C))) + D
-                ) + W
-                h_lst.append(h_del)
+        h_del = self.calculate_h_del(
+            np.array([self.building_parameters], dtype=float)
+        )[0]
 
         self.h_del = pd.DataFrame(
-            h_lst, index=self.mean_temp_days.index, columns=["h_del"]
+            h_del, index=self.mean_temp_days.index, columns=["h_del"]
         )
 
         return self.h_del
@@ -454,67 +456,12 @@ class UserProfile(object):
         
         """
 
-        demand_daily_lst = []
-        df = self.h_del.copy()
-        df["Mean_Temp"] = self.mean_temp_days.temperature
-
-        for i, d in df.iterrows():
-
-            if d.Mean_Temp <= -15:
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["Temp. <= -15 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > -15) & (d.Mean_Temp <= -10):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["-15 °C < Temp. <= -10 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > -10) & (d.Mean_Temp <= -5):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["-10 °C < Temp. <= -5 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > -5) & (d.Mean_Temp <= 0):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["-5 °C < Temp. <= 0 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > 0) & (d.Mean_Temp <= 5):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["0 °C < Temp. <= 5 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > 5) & (d.Mean_Temp <= 10):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["5 °C < Temp. <= 10 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > 10) & (d.Mean_Temp <= 15):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["10 °C < Temp. <= 15 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > 15) & (d.Mean_Temp <= 20):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["15 °C < Temp. <= 20 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif (d.Mean_Temp > 20) & (d.Mean_Temp <= 25):
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["20 °C < Temp. <= 25 °C"]
-                    demand_daily_lst.append(demand)
-
-            elif d.Mean_Temp > 25:
-                for i, x in self.demand_daily.iterrows():
-                    demand = d.h_del * x["Temp > 25 °C"]
-                    demand_daily_lst.append(demand)
-
-            else:
-                traceback.print_exc("df.mean_temp is out of bounds")
+        demand_daily = self.distribute_h_del(
+            self.h_del["h_del"].values[np.newaxis]
+        )[0]
 
         self.thermal_energy_demand_daily = pd.DataFrame(
-            demand_daily_lst,
+            demand_daily,
             index=pd.date_range(
                 self.year, periods=8760, freq="H", name="time"
             ),
@@ -649,7 +596,190 @@ class UserProfile(object):
         )
         self.thermal_energy_demand[
             "thermal_energy_demand"
-        ] = self.thermal_energy_demand_hourly
-        self.thermal_energy_demand.interpolate(inplace=True)
+        ] = self.interpolate_quarter_hours(
+            self.thermal_energy_demand_hourly.values.T
+        )[0]
 
         return self.thermal_energy_demand
+
+    # %%:
+    # =========================================================================
+    # Array Functions for many households
+    # =========================================================================
+
+    def get_thermal_energy_demand_profiles(
+        self, building_types, thermal_energy_demand_yearly, freq="15min"
+    ):
+
+        """
+        Info
+        ----
+        Calculate the thermal energy demand of many households at once with
+        the SigLinDe method of get_thermal_energy_demand. All households
+        share the temperatures of this UserProfile.
+
+        Parameters
+        ----------
+
+        building_types: list or string
+            building type of each household, e.g. 'DE_HEF33'. A single
+            string is used for all households.
+
+        thermal_energy_demand_yearly: list or numpy.ndarray
+            yearly thermal energy demand of each household
+
+        freq: string
+            "15min" or "H"
+
+        Returns
+        -------
+
+        thermal_energy_demand: numpy.ndarray
+            shape (households, 35040) for freq="15min" or
+            (households, 8760) for freq="H"
+
+        """
+
+        thermal_energy_demand_yearly = np.atleast_1d(
+            np.asarray(thermal_energy_demand_yearly, dtype=float)
+        )
+        if isinstance(building_types, str):
+            building_types = [building_types] * len(
+                thermal_energy_demand_yearly
+            )
+
+        parameters = (
+            self.SigLinDe.set_index("Type")
+            .loc[building_types, self.building_parameter_columns]
+            .values.astype(float)
+        )
+
+        h_del = self.calculate_h_del(parameters)
+
+        # consumerfactor (Kundenwert) K_w of each household
+        consumerfactor = thermal_energy_demand_yearly / h_del.sum(axis=1)
+
+        thermal_energy_demand = (
+            self.distribute_h_del(h_del) * consumerfactor[:, np.newaxis]
+        )
+
+        if freq == "H":
+            return thermal_energy_demand
+
+        return self.interpolate_quarter_hours(thermal_energy_demand)
+
+    def calculate_h_del(self, parameters):
+
+        """
+        Info
+        ----
+        Calculate the daily heat demand h_del with the SigLinDe function for
+        the daily mean temperatures of self.mean_temp_days.
+
+        Parameters
+        ----------
+
+        parameters: numpy.ndarray
+            building parameters A, B, C, D, m_H, b_H, m_W, b_W of shape
+            (households, 8)
+
+        Returns
+        -------
+
+        h_del: numpy.ndarray
+            shape (households, days)
+
+        """
+
+        temperature = self.mean_temp_days.temperature.values[np.newaxis]
+        A, B, C, D, m_H, b_H, m_W, b_W = (
+            column[:, np.newaxis] for column in parameters.T
+        )
+
+        # H and W are for linearisation in SigLinDe function below 8°C
+        H = m_H * temperature + b_H
+        W = m_W * temperature + b_W
+
+        return (
+            (A / (1 + ((B / (temperature - self.t_0)) ** C))) + D
+        ) + np.where(H > W, H, W)
+
+    def distribute_h_del(self, h_del):
+
+        """
+        Info
+        ----
+        Distribute the daily demand over 24 hours according to the factors
+        of demand_daily.csv for the daily mean temperature.
+
+        Parameters
+        ----------
+
+        h_del: numpy.ndarray
+            daily heat demand of shape (households, days)
+
+        Returns
+        -------
+
+        numpy.ndarray
+            hourly demand of shape (households, days * 24)
+
+        """
+
+        temperature = self.mean_temp_days.temperature.values
+        if np.isnan(temperature).any():
+            raise ValueError(
+                "The daily mean temperature is missing on "
+                + ", ".join(
+                    str(day)
+                    for day in self.mean_temp_days.index[np.isnan(temperature)]
+                )
+                + "!"
+            )
+
+        # bin 0: Temp. <= -15 °C, ..., bin 9: Temp > 25 °C
+        bins = np.digitize(
+            temperature,
+            self.temperature_bins,
+            right=True,
+        )
+        # factors of shape (days, 24)
+        factors = self.demand_daily[self.temperature_bin_columns].values.T[
+            bins
+        ]
+
+        return (h_del[:, :, np.newaxis] * factors[np.newaxis]).reshape(
+            len(h_del), -1
+        )
+
+    @staticmethod
+    def interpolate_quarter_hours(hourly):
+
+        """
+        Info
+        ----
+        Linear interpolation of hourly values to quarter hours. The last
+        hour is kept constant.
+
+        Parameters
+        ----------
+
+        hourly: numpy.ndarray
+            shape (households, hours)
+
+        Returns
+        -------
+
+        numpy.ndarray
+            shape (households, hours * 4)
+
+        """
+
+        quarter = np.arange(hourly.shape[1] * 4)
+        hour = quarter // 4
+        next_hour = np.minimum(hour + 1, hourly.shape[1] - 1)
+        fraction = (quarter % 4) / 4
+
+        return hourly[:, hour] + fraction * (
+            hourly[:, next_hour] - hourly[:, hour]
+        )
@@ -7,11 +7,40 @@ This is the overall aggregator of the technologies used.
 
 """
 
+import logging
+import os
 import random
+import numpy as np
 import pandas as pd
 import sqlite3
+from scipy import sparse
+from scipy.sparse import csgraph
 from tqdm import tqdm
 
+
+logger = logging.getLogger(__name__)
+
+# columns and types of the tables of export_components_to_sql
+component_value_columns = (
+    ("name", "TEXT"),
+    ("technology", "TEXT"),
+    ("bus", "TEXT"),
+    ("arrival_soc", "REAL"),
+    ("capacity_kWh", "REAL"),
+    ("power_kW", "REAL"),
+    ("th_power_kW", "REAL"),
+    ("efficiency_el", "REAL"),
+    ("efficiency_th", "REAL"),
+)
+
+timeseries_columns = (
+    ("time", "TEXT"),
+    ("name", "TEXT"),
+    ("cop", "REAL"),
+    ("feed_in", "REAL"),
+    ("th_energy", "REAL"),
+)
+
 class VirtualPowerPlant(object):
     def __init__(self, name):
 
@@ -58,6 +87,19 @@ class VirtualPowerPlant(object):
         self.buses_with_wind = []
         self.buses_with_storage = []
 
+        # (components x timesteps) values of the components, see
+        # build_power_matrix()
+        self.power_matrix = None
+        self.power_index = None
+        self.power_rows = {}
+
+        # (buses x components) incidence matrix of the components and
+        # {element: (buses x elements)} incidence matrices of the loads,
+        # sgens and storages of the net, see build_incidence_matrix()
+        self.incidence_matrix = None
+        self.element_incidence = {}
+        self.incidence_net = None
+
     def add_component(self, component):
 
         """
@@ -99,6 +141,12 @@ class VirtualPowerPlant(object):
         # self.components.append(component)
         self.components[component.identifier] = component
 
+        if self.power_matrix is not None:
+            self.update_component(component.identifier)
+
+        if self.incidence_net is not None:
+            self.build_incidence_matrix(self.incidence_net)
+
     def remove_component(self, component):
 
         """
@@ -137,6 +185,18 @@ class VirtualPowerPlant(object):
         # Remove component
         self.components.pop(component)
 
+        if component in self.power_rows:
+            self.power_matrix = np.delete(
+                self.power_matrix, self.power_rows.pop(component), axis=0
+            )
+            self.power_rows = {
+                identifier: row
+                for row, identifier in enumerate(self.power_rows.keys())
+            }
+
+        if self.incidence_net is not None:
+            self.build_incidence_matrix(self.incidence_net)
+
     def export_components(self, environment):
 
         """
@@ -182,7 +242,7 @@ class VirtualPowerPlant(object):
 
         df_component_values = pd.DataFrame(index=[0])
 
-        print("Exporting components:")
+        logger.info("Exporting components")
         for component in tqdm(self.components.keys()):
             if '_pv' in component:
                 df_component_values[self.components[component].identifier + "_kWp"] = (
@@ -315,8 +375,8 @@ class VirtualPowerPlant(object):
         """
         Info
         ----
-        This function returns two DataFrames with the component values and
-        the timeseries of the components of the virtual power plant.
+        This function returns a DataFrame with the component values of the
+        components of the virtual power plant.
         
         Parameters
         ----------
@@ -341,28 +401,33 @@ class VirtualPowerPlant(object):
         Returns
         -------
         
-        ...
+        df_component_values: pandas.core.frame.DataFrame
+            one row per component with the columns of component_value_columns
         
         """
 
-        # dataframe for exporting component values
+        logger.info("Exporting component values")
 
-        df_component_values = pd.DataFrame(
-            columns=("name",
-                     "technology",
-                     "bus",
-                     "arrival_soc",
-                     "capacity_kWh",
-                     "power_kW",
-                     "th_power_kW",
-                     "efficiency_el",
-                     "efficiency_th"))
+        return pd.DataFrame(
+            self.get_component_value_rows(),
+            columns=[column for column, _ in component_value_columns],
+        )
 
-        print("Exporting component values:")
-        
+    def get_component_value_rows(self):
+
+        """
+        Info
+        ----
+        Return the values of the components as one dict per component. The
+        keys are the columns of component_value_columns, values which do
+        not apply to the technology of a component are missing.
+
+        """
+
+        rows = []
         for component in tqdm(self.components.keys()):
             if '_pv' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "pv",
                      "bus": self.components[component].user_profile.bus,
@@ -370,32 +435,27 @@ class VirtualPowerPlant(object):
                      * self.components[component].module.Vmpo
                      / 1000
                      * self.components[component].system.modules_per_string
-                     * self.components[component].system.strings_per_inverter)},
-                    ignore_index=True)
+                     * self.components[component].system.strings_per_inverter)})
 
             elif '_ees' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "ees",
                      "bus": self.components[component].user_profile.bus,
                      "capacity_kWh": self.components[component].capacity,
                      "power_kW": self.components[component].max_power,
-                     "efficiency_el": self.components[component].charge_efficiency},
-                    ignore_index=True)
-
+                     "efficiency_el": self.components[component].charge_efficiency})
 
             elif '_wea' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "wea",
                      "bus": self.components[component].user_profile.bus,
                      "power_kW": self.components[component].ModelChain.power_plant.nominal_power
-                    / 1000},
-                    ignore_index=True)
-
+                    / 1000})
 
             elif '_bev' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "bev",
                      "bus": self.components[component].user_profile.bus,
@@ -405,20 +465,18 @@ class VirtualPowerPlant(object):
                          ),
                      "capacity_kWh": self.components[component].battery_max,
                      "power_kW": self.components[component].charging_power,
-                     "efficiency_el": self.components[component].charge_efficiency},
-                    ignore_index=True)
+                     "efficiency_el": self.components[component].charge_efficiency})
 
             elif '_hp' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "hp",
                      "bus": self.components[component].user_profile.bus,
-                     "power_kW": self.components[component].el_power},
-                    ignore_index=True)
+                     "power_kW": self.components[component].el_power})
 
             elif '_tes' in component:
                 # Formula: E = m * cp * dT
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "tes",
                      "bus": self.components[component].user_profile.bus,
@@ -426,142 +484,273 @@ class VirtualPowerPlant(object):
                             * self.components[component].cp
                             * (self.components[component].hysteresis * 2)  #dT
                             / 3600),  # convert KJ to kW,
-                     "efficiency_th": self.components[component].efficiency_th},
-                    ignore_index=True)
+                     "efficiency_th": self.components[component].efficiency_th})
 
             elif '_chp' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "chp",
                      "bus": self.components[component].user_profile.bus,
                      "power_kW": self.components[component].el_power,
                      "th_power_kW": self.components[component].th_power,
                      "efficiency_el": self.components[component].efficiency_el,
-                     "efficiency_th": self.components[component].efficiency_th},
-                    ignore_index=True)
+                     "efficiency_th": self.components[component].efficiency_th})
 
             elif '_hr' in component:
-                df_component_values = df_component_values.append(
+                rows.append(
                     {"name": component,
                      "technology": "hr",
                      "bus": self.components[component].user_profile.bus,
                      "th_power_kW": self.components[component].el_power, #TODO: change to power_kW after the Project
-                     "efficiency_th": self.components[component].efficiency}, #TODO: Change to el_efficiency after the Project
-                    ignore_index=True)
+                     "efficiency_th": self.components[component].efficiency}) #TODO: Change to el_efficiency after the Project
 
+        return rows
 
-        return df_component_values
+    def export_component_timeseries(self, wide=False, index=None):
 
-    def export_component_timeseries(self):
+        """
+        Info
+        ----
+        This function returns the timeseries of the components of the
+        virtual power plant. The whole series of every component is taken
+        at once, the COP is calculated once for all heat pumps.
 
-        df_timeseries = pd.DataFrame(
-            columns=("time",
-                     "name",
-                     "cop",
-                     "feed_in",
-                     "th_energy")
+        Parameters
+        ----------
+        wide: boolean
+            False: long format with one row per timestep and component and
+            the columns of timeseries_columns.
+            True: one row per timestep with the index "time" and the
+            columns name + "_" + column, e.g. "bus1_pv_feed_in".
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to export. Default: index of the timeseries of the
+            first component
+
+        Returns
+        -------
+        df_timeseries: pandas.core.frame.DataFrame
+
+        no_timeseries_lst: list
+            names of the components without timeseries, usually only tes
+
+        """
+
+        time, columns, no_timeseries_lst = (
+            self.get_component_timeseries_columns(index)
         )
-        
-        rows_list = list()
 
-        #List to catch components without timeseries. Usually only tes
-        no_timeseries_lst = list()
+        if wide:
+            df_timeseries = pd.DataFrame(
+                {
+                    component + "_" + column: values[column]
+                    for component, values in columns
+                    for column, _ in timeseries_columns[2:]
+                    if column in values
+                },
+                index=pd.DatetimeIndex(pd.to_datetime(time), name="time"),
+            )
 
-        print("Export component timeseries:")
-        for idx in tqdm(self.components[next(iter(self.components.keys()))].timeseries.index):
-            for component in self.components.keys():
-
-                if '_pv' in component:
-
-                    #df_timeseries = df_timeseries
-                    rows_list.append(
-                    {"time": str(idx),
-                     "name": component,
-                     "feed_in": (self.components[component].value_for_timestamp(str(idx)) * -1)
-                     })#,
-                     #ignore_index=True)
-
-                elif '_wea' in component:
-
-                    #df_timeseries = df_timeseries
-                    rows_list.append(
-                    {"time": str(idx),
-                     "name": component,
-                     "feed_in": (self.components[component].value_for_timestamp(str(idx)) * -1)
-                     })#,
-                     #ignore_index=True
-                     #)
-
-                elif '_bev' in component:
-
-                    #df_timeseries = df_timeseries
-                    rows_list.append(
-                        {"time": str(idx),
-                         "name": component,
-                         "feed_in": float(self.components[component].timeseries["at_home"][str(idx)])
-                         })#,
-                     #ignore_index=True
-                     #)
-
-                elif '_hp' in component:
-
-                    # Check if the variable cop exists.
-                    # COP is the same for all heat pumps!
-                    if 'cop' not in locals():
-                        cop = pd.DataFrame(
-                            index = self.components[
-                                next(iter(self.components.keys()))
-                                ].timeseries.index,
-                            columns=["cop"])
-
-                        cop.cop = self.components[component].get_cop().cop
-                        cop.interpolate(inplace=True)
-                        
-                    #df_timeseries = df_timeseries
-                    rows_list.append(
-                        {"time": str(idx),
-                         "name": component,
-                         "cop": cop.cop[str(idx)],
-                         "th_energy": self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[str(idx)].item() #TODO: used to be HeatDemand
-                         })#,
-                     #ignore_index=True
-                     #)
-
-                elif '_chp' in component:
-
-                    #df_timeseries = df_timeseries
-                    rows_list.append(
-                        {"time": str(idx),
-                         "name": component,
-                         "th_energy": self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[str(idx)].item() #TODO: used to be HeatDemand
-                         })#,
-                     #ignore_index=True
-                     #)
-
-                elif '_tes' in component:
-                    # Thermal energy storage has no timeseries
-                    no_timeseries_lst.append(component)
+            return df_timeseries, no_timeseries_lst
 
-                else:
-                    no_timeseries_lst.append(component)
+        # (timesteps, components) arrays, which are flattened row by row,
+        # so the rows are sorted by time and then by component
+        names = [component for component, _ in columns]
+        data = {
+            "time": np.repeat(time, len(names)),
+            "name": np.tile(names, len(time)),
+        }
+        for column, _ in timeseries_columns[2:]:
+            array = np.full((len(time), len(names)), np.nan)
+            for i, (_, values) in enumerate(columns):
+                if column in values:
+                    array[:, i] = values[column]
+            data[column] = array.ravel()
 
-        df_timeseries = pd.DataFrame(rows_list)
+        df_timeseries = pd.DataFrame(data)
 
         return df_timeseries, no_timeseries_lst
 
+    def export_component_timeseries_to_csv(
+        self, file, wide=False, chunk_size=2976
+    ):
+
+        """
+        Info
+        ----
+        Write the timeseries of export_component_timeseries to a csv file
+        in chunks of chunk_size timesteps, so only the rows of one chunk
+        are held in memory.
+
+        Parameters
+        ----------
+        file: string
+            path of the csv file. An existing file is overwritten.
+
+        wide: boolean
+            format of the rows, see export_component_timeseries
+
+        chunk_size: int
+            number of timesteps per chunk. Default: 31 days of 15 minutes
+
+        Returns
+        -------
+        no_timeseries_lst: list
+            names of the components without timeseries
+
+        """
+
+        index = self.components[
+            next(iter(self.components.keys()))
+        ].timeseries.index
+
+        no_timeseries_lst = list()
+        for first in range(0, len(index), chunk_size):
+            df_timeseries, no_timeseries_lst = (
+                self.export_component_timeseries(
+                    wide=wide, index=index[first : first + chunk_size]
+                )
+            )
+            df_timeseries.to_csv(
+                file,
+                mode="w" if first == 0 else "a",
+                header=first == 0,
+                index=wide,
+            )
+
+        return no_timeseries_lst
 
-    def export_components_to_sql(self, name = "export"):
+    def get_component_timeseries_columns(self, index=None):
+
+        """
+        Info
+        ----
+        Return the timeseries of the components for the columns of
+        timeseries_columns. The values of every component are taken from
+        its timeseries at once for all timesteps of index.
+
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps to export. Default: index of the timeseries of the
+            first component
+
+        Returns
+        -------
+        time: list
+            timesteps as strings
+
+        columns: list
+            tuples (name, {column: numpy.ndarray}) for every component with
+            a timeseries. Columns, which do not apply to the technology of
+            the component, are missing.
+
+        no_timeseries_lst: list
+            names of the components without timeseries, usually only tes
+
+        """
+
+        full_index = self.components[
+            next(iter(self.components.keys()))
+        ].timeseries.index
+        if index is None:
+            index = full_index
+
+        columns = list()
+        no_timeseries_lst = list()
+        cop = None
+
+        for component in self.components.keys():
+
+            if '_pv' in component or '_wea' in component:
+                values = {
+                    "feed_in": self.get_component_values(
+                        self.components[component], index
+                    ) * -1
+                }
+
+            elif '_bev' in component:
+                values = {
+                    "feed_in": self.components[component].timeseries[
+                        "at_home"
+                    ].loc[index].values.astype(float)
+                }
+
+            elif '_hp' in component:
+                # COP is the same for all heat pumps!
+                # It is interpolated on the whole index, so a part of the
+                # index gets the same values as in the whole export.
+                if cop is None:
+                    cop = (
+                        self.components[component].get_cop().cop
+                        .reindex(full_index).interpolate()
+                        .loc[index].values
+                    )
+
+                values = {
+                    "cop": cop,
+                    "th_energy": self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[index].values #TODO: used to be HeatDemand
+                }
+
+            elif '_chp' in component:
+                values = {
+                    "th_energy": self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[index].values #TODO: used to be HeatDemand
+                }
+
+            else:
+                # e.g. thermal energy storage has no timeseries
+                no_timeseries_lst.append(component)
+                continue
+
+            columns.append((component, values))
+
+        return index.astype(str).tolist(), columns, no_timeseries_lst
+
+    def export_components_to_sql(
+        self,
+        name="export",
+        directory="./Results",
+        append=False,
+        index=None,
+        replace=False,
+    ):
 
         """
         Info
         ----
         This function exports the component values and the timeseries of the
         components of the virtual power plant to a sql database.
+
+        All rows are written with executemany in one transaction. The tables
+        have typed columns (component_value_columns, timeseries_columns)
+        and are indexed by name and (name, time). The names in
+        component_values are unique, every component is written once.
         
         Parameters
         ----------
         
-        ...
+        name: string
+            name of the database file without the extension .sqlite
+
+        directory: string
+            directory of the database file. It is created if it does not
+            exist.
+
+        append: boolean
+            False: create the tables. An sqlite3.OperationalError is raised
+            if they already exist, unless replace is True.
+            True: append the timeseries of index to the existing tables,
+            e.g. to export the chunks of a long simulation one after
+            another. Components, which are already in component_values,
+            keep their row.
+
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps of the timeseries to export. Default: index of the
+            timeseries of the first component
+
+        replace: boolean
+            True: drop existing tables before they are created. All data in
+            them is lost.
         	
         Attributes
         ----------
@@ -581,307 +770,88 @@ class VirtualPowerPlant(object):
         Returns
         -------
         
-        ...
+        no_timeseries_lst: list
+            names of the components without timeseries
         
         """
 
-        # create connection
-        conn = sqlite3.connect((r'./Results/' + name + '.sqlite'))
-
-        # create curser object
-        c = conn.cursor()
-
-        # Create table
-        c.execute("CREATE TABLE component_values ("
-                  +"name, "
-                  +"technology, "
-                  +"bus, "
-                  +"arrival_soc, "
-                  +"capacity_kWh, "
-                  +"power_kW, "
-                  +"th_power_kW, "
-                  +"efficiency_el ,"
-                  +"efficiency_th)")
-
-        # Create table
-        c.execute("CREATE TABLE timeseries ("
-                  +"time, "
-                  +"name, "
-                  +"cop, "
-                  +"feed_in, "
-                  +"th_energy)")
-
-        # Insert data of the components into the component_values table
-        print("Exporting components to sql:")
-        for component in tqdm(self.components.keys()):
-
-            if '_pv' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"power_kW) "
-                          +"VALUES (?, ?, ?, ?)",
-                          (component,
-                           "pv",
-                           self.components[component].user_profile.bus,
-                           (self.components[component].module.Impo
-                            * self.components[component].module.Vmpo
-                            / 1000
-                            * self.components[component].system.modules_per_string
-                            * self.components[component].system.strings_per_inverter
-                            )
-                           )
-                          )
-
-                conn.commit()
-
-            elif '_ees' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"capacity_kWh, "
-                          +"power_kW, "
-                          +"efficiency_el) "
-                          +"VALUES (?, ?, ?, ?, ?, ?)",
-                          (component,
-                           "ees",
-                           self.components[component].user_profile.bus,
-                           self.components[component].capacity,
-                           self.components[component].max_power,
-                           self.components[component].charge_efficiency)
-                          )
-
-                conn.commit()
-
-            elif '_wea' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"power_kW) "
-                          +"VALUES (?, ?, ?, ?)",
-                          (component,
-                           "wea",
-                           self.components[component].user_profile.bus, # used to be: component[:-4],
-                           (self.components[
-                               component].ModelChain.power_plant.nominal_power
-                               / 1000)
-                           )
-                          )
-
-                conn.commit()
-
-            elif '_bev' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"power_kW, "
-                          +"capacity_kWh, "
-                          +"efficiency_el, "
-                          +"arrival_soc) "
-                          +"VALUES (?, ?, ?, ?, ?, ?, ?)",
-                          (component,
-                           "bev",
-                           self.components[component].user_profile.bus,
-                           self.components[component].charging_power,
-                           self.components[component].battery_max,
-                           self.components[component].charge_efficiency,
-                           random.uniform(self.components[component].battery_min,
-                                        self.components[component].battery_max)
-                           )
-                          )
-
-                conn.commit()
-
-            elif '_hp' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"power_kW) "
-                          +"VALUES (?, ?, ?, ?)",
-                          (component,
-                           "hp",
-                           self.components[component].user_profile.bus,
-                           self.components[component].el_power
-                           )
-                          )
-
-                conn.commit()
-
-            elif '_chp' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"power_kW, "
-                          +"th_power_kW, "
-                          +"efficiency_el, "
-                          +"efficiency_th) "
-                          +"VALUES (?, ?, ?, ?, ?, ?, ?)",
-                          (component,
-                           "chp",
-                           self.components[component].user_profile.bus,
-                           self.components[component].el_power,
-                           self.components[component].th_power,
-                           self.components[component].efficiency_el,
-                           self.components[component].efficiency_th
-                           )
-                          )
-
-                conn.commit()
-
-            elif '_hr' in component:
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"th_power_kW, "
-                          +"efficiency_th) "
-                          +"VALUES (?, ?, ?, ?, ?)",
-                          (component,
-                           "hr",
-                           self.components[component].user_profile.bus,
-                           self.components[component].el_power,
-                           self.components[component].efficiency
-                           )
-                          )
-    
-                conn.commit()
-
-            elif '_tes' in component:
-                # Formula: E = m * cp * dT
-                c.execute("INSERT INTO component_values "
-                          +"(name, "
-                          +"technology, "
-                          +"bus, "
-                          +"capacity_kWh, "
-                          +"efficiency_th) "
-                          +"VALUES (?, ?, ?, ?, ?)",
-                          (component,
-                           "tes",
-                           self.components[component].user_profile.bus,
-                           (self.components[component].mass
-                            * self.components[component].cp
-                            * (self.components[component].hysteresis * 2)  #dT
-                            / 3600),  # convert KJ to kW
-                           self.components[component].efficiency_th
-                           )
-                          )
-
-                conn.commit()
-
-        # Save (commit) the changes
-        conn.commit()
+        os.makedirs(directory, exist_ok=True)
 
-        # Save timeseries of each component for each timestep to the table timeseries
-        # Log components which do not have a timeseries
-        no_timeseries_lst = list()
+        # create connection
+        conn = sqlite3.connect(os.path.join(directory, name + ".sqlite"))
+
+        try:
+            # one transaction, which is committed at the end of the block
+            with conn:
+                for table, columns in (
+                    ("component_values", component_value_columns),
+                    ("timeseries", timeseries_columns),
+                ):
+                    if replace:
+                        conn.execute("DROP TABLE IF EXISTS " + table)
+                    conn.execute(
+                        "CREATE TABLE "
+                        + ("IF NOT EXISTS " if append else "")
+                        + table
+                        + " ("
+                        + ", ".join(
+                            column + " " + sql_type
+                            for column, sql_type in columns
+                        )
+                        + ")"
+                    )
+
+                # unique names, so components are only inserted once
+                conn.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS "
+                    + "component_values_unique_name "
+                    + "ON component_values (name)"
+                )
 
-        for idx in self.components[next(iter(self.components.keys()))].timeseries.index:
-            for component in self.components.keys():
-
-                if '_pv' in component:
-
-                    c.execute("INSERT INTO timeseries "
-                              +"(time, "
-                              +"name, "
-                              +"feed_in) "
-                              +"VALUES (?, ?, ?)",
-                              (str(idx),
-                               component,
-                               (self.components[component].value_for_timestamp(str(idx)) * -1)
-                               )
-                              )
-
-                    conn.commit()
-
-                elif '_wea' in component:
-                    c.execute("INSERT INTO timeseries "
-                              +"(time, "
-                              +"name, "
-                              +"feed_in) "
-                              +"VALUES (?, ?, ?)",
-                              (str(idx),
-                               component,
-                               (self.components[component].value_for_timestamp(str(idx)) * -1)
-                               )
-                              )
-
-                    conn.commit()
-
-
-                elif '_bev' in component:
-                    c.execute("INSERT INTO timeseries "
-                              +"(time, "
-                              +"name, "
-                              +"feed_in) "
-                              +"VALUES (?, ?, ?)",
-                              (str(idx),
-                               component,
-                               float(self.components[component].timeseries["at_home"][str(idx)])
-                               )
-                              )
-
-                    conn.commit()
-
-
-                elif '_hp' in component:
-
-                    # Check if the variable cop exists.
-                    # COP is the same for all heat pumps!
-                    if 'cop' not in locals():
-                        cop = pd.DataFrame(
-                            index = self.components[
-                                next(iter(self.components.keys()))
-                                ].timeseries.index,
-                            columns=["cop"])
-
-                        cop.cop = self.components[component].get_cop().cop
-                        cop.interpolate(inplace=True)
-
-                    c.execute("INSERT INTO timeseries "
-                              +"(time, "
-                              +"name, "
-                              +"cop, "
-                              +"th_energy) "
-                              +"VALUES (?, ?, ?, ?)",
-                              (str(idx),
-                               component,
-                               cop.cop[str(idx)],
-                               self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[str(idx)].item() #TODO: used to be HeatDemand
-                               )
-                              )
-
-                    conn.commit()
-
-                elif '_chp' in component:
-                    c.execute("INSERT INTO timeseries "
-                              +"(time, "
-                              +"name, "
-                              +"th_energy) "
-                              +"VALUES (?, ?, ?)",
-                              (str(idx),
-                               component,
-                               self.components[component].user_profile.thermal_energy_demand.Heat_load_kWh.loc[str(idx)].item() #TODO: used to be HeatDemand
-                               )
-                              )
-
-                    conn.commit()
-
-                elif '_tes' in component:
-                    # Thermal energy storage has no timeseries
-                    no_timeseries_lst.append(component)
+                # Insert data of the components into the component_values table
+                logger.info("Exporting components to sql")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO component_values VALUES ("
+                    + ", ".join("?" * len(component_value_columns))
+                    + ")",
+                    [
+                        tuple(
+                            row.get(column)
+                            for column, _ in component_value_columns
+                        )
+                        for row in self.get_component_value_rows()
+                    ],
+                )
 
-                else:
-                    no_timeseries_lst.append(component)
+                # Save timeseries of each component to the table timeseries
+                time, columns, no_timeseries_lst = (
+                    self.get_component_timeseries_columns(index)
+                )
+                for component, values in columns:
+                    # missing values are stored as NULL
+                    value_columns = [
+                        values[column].tolist()
+                        if column in values
+                        else [None] * len(time)
+                        for column, _ in timeseries_columns[2:]
+                    ]
+                    conn.executemany(
+                        "INSERT INTO timeseries VALUES ("
+                        + ", ".join("?" * len(timeseries_columns))
+                        + ")",
+                        zip(time, [component] * len(time), *value_columns),
+                    )
+
+                # create the index after the inserts, which is faster
+                # than updating it with every row
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS timeseries_name_time "
+                    + "ON timeseries (name, time)"
+                )
 
-        # Close the connection
-        c.close()
-        conn.close()
+        finally:
+            # Close the connection
+            conn.close()
 
         return no_timeseries_lst
 
@@ -1052,6 +1022,9 @@ class VirtualPowerPlant(object):
     
         This function calculates the balance of all generation and consumption at a
         given timestamp and returns the result.
+
+        The balance is the sum of the column of the timestamp in the power
+        matrix, which is built on the first call (see build_power_matrix).
         
         Parameters
         ----------
@@ -1080,17 +1053,406 @@ class VirtualPowerPlant(object):
         
         """
 
-        # Create result variable
-        result = 0
+        if len(self.components) == 0:
+            return 0
+
+        if self.power_matrix is None:
+            self.build_power_matrix()
+
+        # sum of the column of the timestamp in the power matrix
+        return self.power_matrix[:, self.get_position(timestamp)].sum()
+
+    # =========================================================================
+    # Power matrix of the components
+    # =========================================================================
+
+    def build_power_matrix(self, index=None):
+
+        """
+        Info
+        ----
+        Build the (components x timesteps) matrix of the values of all
+        components. Afterwards, balance_for_range, balance_by_bus and
+        balance_by_feeder are sums over the matrix instead of one
+        value_for_timestamp call per component and timestep.
+
+        The matrix is a snapshot of the values. It is updated by
+        add_component, remove_component and limit_component, and the
+        Operator updates it in operate_storages and after
+        prepare_time_series. If a component is changed otherwise, e.g. by a
+        direct limit_power_to, a new prepare_time_series or a ramp of a
+        CombinedHeatAndPower, its row needs to be updated with
+        update_component.
+
+        Parameters
+        ----------
+        index: pandas.core.indexes.datetimes.DatetimeIndex
+            timesteps of the matrix. Default: the simulation period of the
+            environment of the first component
+
+        Returns
+        -------
+        power_matrix: numpy.ndarray
+
+        """
+
+        if index is None:
+            environment = next(iter(self.components.values())).environment
+            index = pd.date_range(
+                start=environment.start,
+                end=environment.end,
+                freq=environment.time_freq,
+            )
 
-        # Iterate through all components
-        for i in range(0, len(self.components)):
+        self.power_index = pd.DatetimeIndex(index)
+        self.power_rows = {
+            identifier: row
+            for row, identifier in enumerate(self.components.keys())
+        }
+        self.power_matrix = np.empty(
+            (len(self.power_rows), len(self.power_index))
+        )
+        for identifier, row in self.power_rows.items():
+            self.power_matrix[row] = self.get_component_values(
+                self.components[identifier]
+            )
+
+        return self.power_matrix
 
-            # Get balance for component at timestamp
-            balance = self.components[i].value_for_timestamp(timestamp)
+    def get_component_values(self, component, index=None):
+
+        """
+        Info
+        ----
+        Return the values of a component for all timesteps of index.
+        Default: the timesteps of the power matrix.
+
+        """
 
-            # Add balance to result
-            result += balance
+        if index is None:
+            index = self.power_index
+
+        values = component.values_for_range(index[0], index[-1])
+        if len(values) != len(index):
+            raise ValueError(
+                "The timeseries of "
+                + str(component.identifier)
+                + " does not match the index!"
+            )
+
+        return values
+
+    def update_component(self, identifier, timestamp=None):
+
+        """
+        Info
+        ----
+        Recalculate the row of a component in the power matrix or append a
+        row for a new component.
+
+        Parameters
+        ----------
+        identifier: string
+            identifier of the component
+
+        timestamp: string, pandas.Timestamp or int
+            only recalculate the value of this timestep, e.g. after the
+            operation of a storage at this timestep. Timesteps outside of
+            the power matrix are ignored. None: the whole row
+
+        """
+
+        if timestamp is not None and identifier in self.power_rows:
+            try:
+                position = self.get_position(timestamp)
+            except KeyError:
+                return
+            self.power_matrix[
+                self.power_rows[identifier], position
+            ] = self.components[identifier].value_for_timestamp(timestamp)
+            return
+
+        values = self.get_component_values(self.components[identifier])
+
+        if identifier in self.power_rows:
+            self.power_matrix[self.power_rows[identifier]] = values
+        else:
+            self.power_rows[identifier] = len(self.power_matrix)
+            self.power_matrix = np.vstack((self.power_matrix, values))
+
+    def limit_component(self, identifier, limit):
+
+        """
+        Info
+        ----
+        Limit the power of a component and update its row in the power
+        matrix.
+
+        """
+
+        component = self.components[identifier]
+        if hasattr(component, "limit_power_to"):
+            component.limit_power_to(limit)
+        else:
+            component.limitPowerTo(limit)
+
+        if self.power_matrix is not None:
+            self.update_component(identifier)
+
+    def get_position(self, timestamp):
+
+        """
+        Info
+        ----
+        Return the position of a timestamp (string, Timestamp or integer
+        position) in the power matrix.
+
+        """
+
+        if isinstance(timestamp, (int, np.integer)):
+            return timestamp
+
+        return self.power_index.get_loc(pd.Timestamp(timestamp))
+
+    def balance_for_range(self, start=None, end=None):
+
+        """
+        Info
+        ----
+        Return the balance of all components for every timestep from start
+        to end (both included) as column sums of the power matrix. The
+        power matrix needs to be built first and to be up to date, see
+        build_power_matrix.
+
+        Parameters
+        ----------
+        start, end: string, pandas.Timestamp or int
+            first and last timestep. None: beginning/end of the power matrix
+
+        Returns
+        -------
+        balance: pandas.core.series.Series
+
+        """
+
+        first = 0 if start is None else self.get_position(start)
+        last = (
+            len(self.power_index) - 1 if end is None
+            else self.get_position(end)
+        )
+
+        return pd.Series(
+            self.power_matrix[:, first:last + 1].sum(axis=0),
+            index=self.power_index[first:last + 1],
+            name="balance",
+        )
 
-        # Return result
-        return result
+    # =========================================================================
+    # Incidence matrix of the components and buses
+    # =========================================================================
+
+    def build_incidence_matrix(self, net):
+
+        """
+        Info
+        ----
+        Build the sparse incidence matrices, which map the components and
+        the loads, sgens and storages of the net to the buses of the net.
+        Bus-level values of all timesteps are then one sparse matrix
+        product, e.g. the balance of the components per bus with
+        balance_by_bus() or the residual load per bus in
+        Operator.operate_storages().
+
+        The bus of a component is the bus of the element of the net, which
+        is named like the component, otherwise the bus of its user
+        profile. Components without a bus have an empty column.
+
+        The matrices are rebuilt by add_component and remove_component.
+        Elements must not be added to or removed from the net afterwards.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            net of the scenario
+
+        Returns
+        -------
+        incidence_matrix: scipy.sparse.csr_matrix
+            (buses x components) matrix in the order of net.bus.index and
+            self.components
+
+        """
+
+        self.incidence_net = net
+        buses = net.bus.index
+
+        self.element_incidence = {}
+        component_bus = {}
+        for element in ("load", "sgen", "storage"):
+            table = net[element]
+            self.element_incidence[element] = sparse.csr_matrix(
+                (
+                    np.ones(len(table)),
+                    (buses.get_indexer(table.bus), np.arange(len(table))),
+                ),
+                shape=(len(buses), len(table)),
+            )
+            for name, bus in zip(table.name.values, table.bus.values):
+                component_bus.setdefault(name, bus)
+
+        rows = []
+        columns = []
+        for column, identifier in enumerate(self.components.keys()):
+            bus = component_bus.get(identifier)
+            if bus is None:
+                user_profile = self.components[identifier].user_profile
+                bus = getattr(user_profile, "bus", None)
+            if bus is not None and bus in buses:
+                rows.append(buses.get_loc(bus))
+                columns.append(column)
+
+        self.incidence_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)),
+            shape=(len(buses), len(self.components)),
+        )
+
+        return self.incidence_matrix
+
+    def balance_by_bus(self, start=None, end=None):
+
+        """
+        Info
+        ----
+        Return the balance of the components at every bus for every
+        timestep from start to end (both included). The power matrix and
+        the incidence matrix need to be built first.
+
+        Parameters
+        ----------
+        start, end: string, pandas.Timestamp or int
+            first and last timestep. None: beginning/end of the power matrix
+
+        Returns
+        -------
+        balance: pandas.core.frame.DataFrame
+            timesteps x buses of the net. A positive value represents a
+            load.
+
+        """
+
+        first = 0 if start is None else self.get_position(start)
+        last = (
+            len(self.power_index) - 1 if end is None
+            else self.get_position(end)
+        )
+
+        return pd.DataFrame(
+            (
+                self.incidence_matrix @ self.power_matrix[:, first:last + 1]
+            ).T,
+            index=self.power_index[first:last + 1],
+            columns=self.incidence_net.bus.index,
+        )
+
+    def get_feeders(self, net=None):
+
+        """
+        Info
+        ----
+        Return the feeder of every bus of the net. A feeder is the part of
+        the net, which is supplied by one line leaving the low voltage
+        busbar of a trafo (or the bus of the external grid, if the net has
+        no trafos). It is named by the index of this line.
+
+        Parameters
+        ----------
+        net: pandapower.auxiliary.pandapowerNet
+            Default: the net of the incidence matrix
+
+        Returns
+        -------
+        feeders: pandas.core.series.Series
+            feeder of every bus, NaN for the busbars and buses outside of
+            the feeders
+
+        """
+
+        if net is None:
+            net = self.incidence_net
+
+        buses = net.bus.index
+        line = net.line[net.line.in_service]
+        from_bus = buses.get_indexer(line.from_bus)
+        to_bus = buses.get_indexer(line.to_bus)
+
+        if len(net.trafo) > 0:
+            busbars = buses.get_indexer(net.trafo.lv_bus)
+        else:
+            busbars = buses.get_indexer(net.ext_grid.bus)
+        at_busbar = np.isin(from_bus, busbars) | np.isin(to_bus, busbars)
+
+        # buses connected without passing a busbar
+        graph = sparse.csr_matrix(
+            (
+                np.ones((~at_busbar).sum()),
+                (from_bus[~at_busbar], to_bus[~at_busbar]),
+            ),
+            shape=(len(buses), len(buses)),
+        )
+        _, labels = csgraph.connected_components(graph, directed=False)
+
+        feeders = pd.Series(np.nan, index=buses, dtype=object)
+        for name, first, second in zip(
+            line.index[at_busbar], from_bus[at_busbar], to_bus[at_busbar]
+        ):
+            bus = second if first in busbars else first
+            if bus not in busbars:
+                feeders[labels == labels[bus]] = name
+
+        return feeders
+
+    def balance_by_feeder(self, start=None, end=None):
+
+        """
+        Info
+        ----
+        Return the balance of the components of every feeder (see
+        get_feeders) for every timestep from start to end (both included).
+        The power matrix and the incidence matrix need to be built first.
+
+        Returns
+        -------
+        balance: pandas.core.frame.DataFrame
+            timesteps x feeders. A positive value represents a load.
+
+        """
+
+        feeders = self.get_feeders().dropna()
+        names = pd.Index(feeders.unique())
+
+        # (feeders x buses) matrix to sum up the buses of each feeder
+        aggregation = sparse.csr_matrix(
+            (
+                np.ones(len(feeders)),
+                (
+                    names.get_indexer(feeders.values),
+                    self.incidence_net.bus.index.get_indexer(feeders.index),
+                ),
+            ),
+            shape=(len(names), len(self.incidence_net.bus)),
+        )
+
+        first = 0 if start is None else self.get_position(start)
+        last = (
+            len(self.power_index) - 1 if end is None
+            else self.get_position(end)
+        )
+
+        return pd.DataFrame(
+            (
+                (aggregation @ self.incidence_matrix)
+                @ self.power_matrix[:, first:last + 1]
+            ).T,
+            index=self.power_index[first:last + 1],
+            columns=names,
+        )
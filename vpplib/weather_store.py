@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Info
+----
+This file contains a binary on-disk format for weather data.
+Every dataset is a directory with one .npy file per column, the timestamps
+as int64 nanoseconds (UTC) in index.npy and the column names and time zone
+in meta.json. The arrays are opened memory-mapped, so only the pages of the
+requested period are read from disk and the data is shared by all
+processes, which open the same dataset.
+
+convert_input() converts the csv files in ./input to this format, which can
+then be loaded with Environment.get_weather_from_store().
+
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+def write_dataset(df, path, index_format=None):
+
+    """
+    Info
+    ----
+    Write a DataFrame with a DatetimeIndex to the directory path.
+
+    Parameters
+    ----------
+    df: pandas.core.frame.DataFrame
+        numeric data with DatetimeIndex. MultiIndex columns like the
+        wind data of Environment.get_wind_data are supported.
+
+    path: string
+        directory of the dataset. It is created if it does not exist.
+
+    index_format: string
+        strftime format of a string index, e.g. "%Y-%m-%d" for the
+        mean_temp_days of Environment. read_dataset returns the index as
+        strings of this format, like the csv files are read.
+        None: the index is returned as DatetimeIndex.
+
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    timezone = None if index.tz is None else str(index.tz)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    np.save(os.path.join(path, "index.npy"), index.values.astype("int64"))
+
+    files = []
+    for i, column in enumerate(df.columns):
+        file = "column_%i.npy" % i
+        np.save(
+            os.path.join(path, file),
+            np.ascontiguousarray(df.iloc[:, i].values, dtype=float),
+        )
+        files.append(file)
+
+    meta = {
+        "columns": [
+            list(column) if isinstance(column, tuple) else column
+            for column in df.columns
+        ],
+        "multiindex": isinstance(df.columns, pd.MultiIndex),
+        "index_name": df.index.name,
+        "timezone": timezone,
+        "index_format": index_format,
+        "files": files,
+    }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def read_dataset(path, start=None, end=None):
+
+    """
+    Info
+    ----
+    Return the period start:end of a dataset. The arrays are memory-mapped,
+    only the requested period is read from disk.
+
+    Parameters
+    ----------
+    path: string
+        directory of the dataset
+
+    start, end: string or pandas.Timestamp
+        first and last timestamp (both included). None: beginning/end of
+        the dataset.
+
+    Returns
+    -------
+    df: pandas.core.frame.DataFrame
+        read-only DataFrame of the period. The index is a DatetimeIndex or
+        strings, if the dataset was written with an index_format.
+
+    """
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+
+    index = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+
+    first = 0
+    last = len(index)
+    if start is not None:
+        first = np.searchsorted(index, to_nanoseconds(start, meta), "left")
+    if end is not None:
+        last = np.searchsorted(index, to_nanoseconds(end, meta), "right")
+
+    time_index = pd.DatetimeIndex(
+        np.array(index[first:last]).astype("datetime64[ns]"),
+        name=meta["index_name"],
+    )
+    if meta["timezone"] is not None:
+        time_index = time_index.tz_localize("UTC").tz_convert(
+            meta["timezone"]
+        )
+
+    df = pd.DataFrame(
+        {
+            i: np.load(os.path.join(path, file), mmap_mode="r")[first:last]
+            for i, file in enumerate(meta["files"])
+        },
+        index=time_index,
+        copy=False,
+    )
+
+    if meta["multiindex"]:
+        df.columns = pd.MultiIndex.from_tuples(
+            [tuple(column) for column in meta["columns"]]
+        )
+    else:
+        df.columns = meta["columns"]
+
+    if meta.get("index_format") is not None:
+        df.index = pd.Index(
+            time_index.strftime(meta["index_format"]), name=meta["index_name"]
+        )
+
+    return df
+
+
+def to_nanoseconds(timestamp, meta):
+
+    """
+    Info
+    ----
+    Convert a timestamp to int64 nanoseconds in the time base of index.npy.
+    Timestamps without time zone are interpreted in the time zone of the
+    dataset.
+
+    """
+
+    timestamp = pd.Timestamp(timestamp)
+    if meta["timezone"] is not None:
+        if timestamp.tz is None:
+            timestamp = timestamp.tz_localize(meta["timezone"])
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+
+    return np.int64(timestamp.value)
+
+
+def convert_input(directory="./input/binary", environment=None):
+
+    """
+    Info
+    ----
+    Convert the weather csv files in ./input to the binary format.
+
+    Parameters
+    ----------
+    directory: string
+        target directory, relative to the working directory like the
+        other ./input paths. The datasets are written to the
+        subdirectories pv, wind, mean_temp_days and mean_temp_hours.
+
+    environment: vpplib.environment.Environment
+        environment, whose get_* functions read the csv files. The default
+        files of the functions are used, if None.
+
+    """
+
+    if environment is None:
+        from .environment import Environment
+
+        environment = Environment()
+
+    mean_temp_days = environment.get_mean_temp_days()
+    mean_temp_hours = environment.get_mean_temp_hours()
+
+    write_dataset(environment.get_pv_data(), os.path.join(directory, "pv"))
+    write_dataset(
+        environment.get_wind_data(), os.path.join(directory, "wind")
+    )
+    # the csv files of the mean temperatures are read with a string index
+    write_dataset(
+        mean_temp_days,
+        os.path.join(directory, "mean_temp_days"),
+        index_format="%Y-%m-%d",
+    )
+    write_dataset(
+        mean_temp_hours,
+        os.path.join(directory, "mean_temp_hours"),
+        index_format="%Y-%m-%d %H:%M:%S",
+    )
@@ -7,9 +7,13 @@ This file contains the basic functionalities of the WindPower class.
 """
 
 from .component import Component
+from . import model_cache
+
+import os
 
 
 # windpowerlib imports
+import windpowerlib
 from windpowerlib import ModelChain
 from windpowerlib import WindTurbine
 
@@ -101,10 +105,57 @@ class WindPower(Component):
         self.density_correction = density_correction  # False (default) or True
         self.obstacle_height = obstacle_height  # default: 0
         self.hellman_exp = hellman_exp  # None (default)
-        self.ModelChain = None
+        self._wind_turbine = None
+        self._model_chain = None
+        # cached power output in W, see prepare_time_series
+        self._power_output = None
 
         self.timeseries = None
 
+    @property
+    def wind_turbine(self):
+
+        """
+        Info
+        ----
+        The WindTurbine of the component. It is only built (see
+        get_wind_turbine) when it is accessed, so a cached power output
+        does not need the turbine data.
+
+        """
+
+        if self._wind_turbine is None:
+            self.get_wind_turbine()
+
+        return self._wind_turbine
+
+    @wind_turbine.setter
+    def wind_turbine(self, wind_turbine):
+
+        self._wind_turbine = wind_turbine
+
+    @property
+    def ModelChain(self):
+
+        """
+        Info
+        ----
+        The ModelChain of the component. If the power output has been
+        taken from the cache, the ModelChain is only built when it is
+        accessed and gets the cached power output instead of being run.
+
+        """
+
+        if self._model_chain is None and self._power_output is not None:
+            self.get_model_chain().power_output = self._power_output.copy()
+
+        return self._model_chain
+
+    @ModelChain.setter
+    def ModelChain(self, model_chain):
+
+        self._model_chain = model_chain
+
     def get_wind_turbine(self):
         r"""
         fetch power and/or power coefficient curve data from the OpenEnergy 
@@ -134,22 +185,20 @@ class WindPower(Component):
 
         return self.wind_turbine
 
-    def calculate_power_output(self):
-        r"""
-        Calculates power output of wind turbines using the
-        :class:`~.modelchain.ModelChain`.
-    
-        The :class:`~.modelchain.ModelChain` is a class that provides all necessary
-        steps to calculate the power output of a wind turbine. You can either use
-        the default methods for the calculation steps, or choose different methods, 
-        as done for the 'e126'. Of course, you can also use the default methods 
-        while only changing one or two of them.
-    
-        Parameters
-        ----------
+    def get_model_chain(self):
+
+        """
+        Info
+        ----
+        Initialize the ModelChain of the wind turbine with the
+        specifications of the component, without running it.
+
+        Returns
+        -------
+        ModelChain
 
-    
         """
+
         # power output calculation for e126
         # own specifications for ModelChain setup
         modelchain_data = {
@@ -167,21 +216,30 @@ class WindPower(Component):
             "hellman_exp": self.hellman_exp,
         }  # None (default) or None
 
+        self.ModelChain = ModelChain(self.wind_turbine, **modelchain_data)
+
+        return self.ModelChain
+
+    def calculate_power_output(self):
+        r"""
+        Calculates power output of wind turbines using the
+        :class:`~.modelchain.ModelChain`.
+    
+        The :class:`~.modelchain.ModelChain` is a class that provides all necessary
+        steps to calculate the power output of a wind turbine. You can either use
+        the default methods for the calculation steps, or choose different methods, 
+        as done for the 'e126'. Of course, you can also use the default methods 
+        while only changing one or two of them.
+    
+        Parameters
+        ----------
+
+    
+        """
+
         # initialize ModelChain with own specifications and use run_model method
         # to calculate power output
-        if self.environment.start == None or self.environment.end == None:
-            self.ModelChain = ModelChain(
-                self.wind_turbine, **modelchain_data
-            ).run_model(self.environment.wind_data)
-
-        else:
-            self.ModelChain = ModelChain(
-                self.wind_turbine, **modelchain_data
-            ).run_model(
-                self.environment.wind_data[
-                    self.environment.start : self.environment.end
-                ]
-            )
+        self.get_model_chain().run_model(self.get_weather_data())
 
         # write power output time series to WindPower.timeseries
         self.timeseries = self.ModelChain.power_output / 1000  # convert to kW
@@ -193,10 +251,86 @@ class WindPower(Component):
         if len(self.environment.wind_data) == 0:
             raise ValueError("self.environment.wind_data is empty.")
 
+        # turbines with identical parameters and weather share one model run
+        self._wind_turbine = None
+        self._model_chain = None
+        self._power_output = None
+        power_output = model_cache.get(self.get_cache_key(), self.run_model)
+
+        if self._model_chain is None:
+            # cached result: the WindTurbine and ModelChain are only built
+            # when they are accessed
+            self._power_output = power_output
+
+        self.timeseries = power_output / 1000  # convert to kW
+
+        return self.timeseries
+
+    def run_model(self):
+
+        """
+        Info
+        ----
+        Build the WindTurbine, run the ModelChain and return a copy of the
+        power output in W for the cache.
+
+        """
+
         self.get_wind_turbine()
         self.calculate_power_output()
 
-        return self.timeseries
+        return self.ModelChain.power_output.copy()
+
+    def get_weather_data(self):
+
+        """
+        Info
+        ----
+        Return the wind data of the simulation period.
+
+        """
+
+        if self.environment.start == None or self.environment.end == None:
+            return self.environment.wind_data
+
+        return self.environment.wind_data[
+            self.environment.start : self.environment.end
+        ]
+
+    def get_cache_key(self):
+
+        """
+        Info
+        ----
+        Return the fingerprint of the turbine, the ModelChain
+        specifications and the weather data, which determine the result of
+        run_model. If data_source is a file, its modification time is part
+        of the fingerprint.
+
+        """
+
+        data_source_mtime = None
+        if os.path.isfile(str(self.data_source)):
+            data_source_mtime = os.path.getmtime(self.data_source)
+
+        return model_cache.fingerprint(
+            "WindPower power_output",
+            windpowerlib.__version__,
+            self.turbine_type,
+            self.hub_height,
+            self.rotor_diameter,
+            self.fetch_curve,
+            self.data_source,
+            data_source_mtime,
+            self.wind_speed_model,
+            self.density_model,
+            self.temperature_model,
+            self.power_output_model,
+            self.density_correction,
+            self.obstacle_height,
+            self.hellman_exp,
+            self.get_weather_data(),
+        )
 
     def reset_time_series(self):
 
@@ -229,21 +363,17 @@ class WindPower(Component):
     # Balancing Functions
     # ===================================================================================
 
-    # Override balancing function from super class.
-    def value_for_timestamp(self, timestamp):
-
-        if type(timestamp) == int:
-
-            return self.timeseries.iloc[timestamp].item() * self.limit
+    # Values of the balancing functions of the super class.
+    def get_value_series(self):
 
-        elif type(timestamp) == str:
+        """
+        Info
+        ----
+        Return the power output in kW for value_for_timestamp.
 
-            return self.timeseries.loc[timestamp].item() * self.limit
+        """
 
-        else:
-            raise ValueError(
-                "timestamp needs to be of type int or string. Stringformat: YYYY-MM-DD hh:mm:ss"
-            )
+        return self.timeseries
 
     def observations_for_timestamp(self, timestamp):
 